@@ -0,0 +1,25 @@
+"""Add question_embedding to qa_history for the semantic answer cache.
+
+Revision ID: 008
+Revises: 007
+"""
+
+from alembic import op
+
+
+revision = "008"
+down_revision = "007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Nullable: only answers generated by the RAG pipeline are cacheable
+    # (rule matches, refusals and cache hits leave it empty).  Lookups are
+    # scoped by workspace_id + created_at, which qa_history_created_at_idx
+    # already covers.
+    op.execute("ALTER TABLE qa_history ADD COLUMN question_embedding vector(1536)")
+
+
+def downgrade() -> None:
+    op.drop_column("qa_history", "question_embedding")
@@ -0,0 +1,64 @@
+"""Add conversation_threads: registry of LangGraph checkpoint threads.
+
+Lets checkpoint GC find a workspace's threads (and idle threads) through an
+index and delete checkpoint rows by exact thread_id, instead of scanning
+the checkpoint tables with ``thread_id LIKE 'workspace:%'``.
+
+Revision ID: 009
+Revises: 008
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+revision = "009"
+down_revision = "008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "conversation_threads",
+        sa.Column("thread_id", sa.String(80), primary_key=True),
+        sa.Column(
+            "workspace_id",
+            UUID(as_uuid=True),
+            sa.ForeignKey("workspaces.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("asker_user_id", sa.String(20), nullable=False),
+        sa.Column("last_active_at", sa.DateTime, server_default=sa.func.now(), nullable=False),
+        sa.Column("compacted_at", sa.DateTime, nullable=True),
+    )
+    op.create_index(
+        "conversation_threads_workspace_idx", "conversation_threads", ["workspace_id"],
+    )
+    op.create_index(
+        "conversation_threads_last_active_idx", "conversation_threads", ["last_active_at"],
+    )
+
+    # Register threads that already have checkpoints (the checkpoint tables
+    # are created by AsyncPostgresSaver.setup(), so they may not exist yet).
+    op.execute(
+        """
+        DO $$
+        BEGIN
+            IF to_regclass('checkpoints') IS NOT NULL THEN
+                INSERT INTO conversation_threads (thread_id, workspace_id, asker_user_id)
+                SELECT DISTINCT c.thread_id, w.id, split_part(c.thread_id, ':', 2)
+                FROM checkpoints c
+                JOIN workspaces w ON w.id::text = split_part(c.thread_id, ':', 1)
+                ON CONFLICT (thread_id) DO NOTHING;
+            END IF;
+        END $$;
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("conversation_threads_last_active_idx", table_name="conversation_threads")
+    op.drop_index("conversation_threads_workspace_idx", table_name="conversation_threads")
+    op.drop_table("conversation_threads")
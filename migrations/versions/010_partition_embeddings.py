@@ -0,0 +1,141 @@
+"""Partition embeddings by workspace, with an ANN index per partition.
+
+One global IVFFlat index over every tenant's vectors degrades as tenants
+are added: the probed lists fill up with other workspaces' rows, which the
+``workspace_id`` filter then throws away.  ``embeddings`` becomes
+
+    embeddings                 PARTITION BY LIST (workspace_id)
+    ├── embeddings_ws_<hex>    FOR VALUES IN (<workspace>)   -- large tenants
+    └── embeddings_shared      DEFAULT, PARTITION BY HASH (workspace_id)
+        └── embeddings_shared_p0 .. p15
+
+and every leaf partition gets its own ANN index, so a search (``WHERE
+workspace_id = :ws_id``, pruned to one partition) only probes lists built
+from that tenant's (or its hash bucket's) vectors.  The indexes are not
+built here: most hash partitions start empty, and IVFFlat lists trained on
+no rows stay untrained.  The ANN index manager (``maintain_ann_indexes``,
+hourly and after each ingestion job) builds each one once the partition
+has rows; until then searches scan the pruned partition exactly.
+
+Workspaces with at least ``_DEDICATED_MIN_ROWS`` rows get a dedicated
+partition here; later ones are moved with
+``src.services.db.embedding_partitions.dedicate_workspace_partition``.
+
+The primary key becomes (id, workspace_id) — a partitioned table's keys
+must include the partition key; ids still come from the same sequence.
+The ``workspace_id`` foreign key keeps migration 005's semantics (no
+cascade).
+
+Revision ID: 010
+Revises: 009
+"""
+
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "010"
+down_revision = "009"
+branch_labels = None
+depends_on = None
+
+_HASH_PARTITIONS = 16
+_DEDICATED_MIN_ROWS = 50_000
+# The table's columns as of this revision (frozen: later schema changes
+# must not change what this migration copies)
+_COLUMNS = "id, workspace_id, content, embedding, channel_id, message_ts, thread_ts, created_at"
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+
+    # Keep the old table (and its id sequence) around until the copy is done
+    conn.execute(sa.text("ALTER SEQUENCE embeddings_id_seq OWNED BY NONE"))
+    conn.execute(sa.text("ALTER TABLE embeddings RENAME TO embeddings_unpartitioned"))
+    conn.execute(sa.text("DROP INDEX IF EXISTS ix_embeddings_cosine"))
+    conn.execute(sa.text("DROP INDEX IF EXISTS ix_embeddings_workspace_id"))
+    conn.execute(sa.text(
+        "ALTER TABLE embeddings_unpartitioned "
+        "RENAME CONSTRAINT embeddings_pkey TO embeddings_unpartitioned_pkey"
+    ))
+
+    conn.execute(sa.text("""
+        CREATE TABLE embeddings (
+            id INTEGER NOT NULL DEFAULT nextval('embeddings_id_seq'),
+            workspace_id UUID NOT NULL REFERENCES workspaces(id),
+            content TEXT NOT NULL,
+            embedding vector(1536) NOT NULL,
+            channel_id VARCHAR(64),
+            message_ts VARCHAR(64),
+            thread_ts VARCHAR(64),
+            created_at TIMESTAMP DEFAULT NOW(),
+            PRIMARY KEY (id, workspace_id)
+        ) PARTITION BY LIST (workspace_id)
+    """))
+
+    large = conn.execute(sa.text("""
+        SELECT workspace_id FROM embeddings_unpartitioned
+        GROUP BY workspace_id HAVING count(*) >= :min_rows
+    """), {"min_rows": _DEDICATED_MIN_ROWS}).scalars().all()
+    for workspace_id in large:
+        name = f"embeddings_ws_{uuid.UUID(str(workspace_id)).hex}"
+        conn.execute(sa.text(
+            f"CREATE TABLE {name} PARTITION OF embeddings FOR VALUES IN ('{workspace_id}')"
+        ))
+
+    conn.execute(sa.text("""
+        CREATE TABLE embeddings_shared PARTITION OF embeddings DEFAULT
+        PARTITION BY HASH (workspace_id)
+    """))
+    for remainder in range(_HASH_PARTITIONS):
+        conn.execute(sa.text(f"""
+            CREATE TABLE embeddings_shared_p{remainder} PARTITION OF embeddings_shared
+            FOR VALUES WITH (MODULUS {_HASH_PARTITIONS}, REMAINDER {remainder})
+        """))
+    # Only the shared partitions hold several workspaces; for a small tenant
+    # there an exact scan of its own rows can beat the ANN index
+    conn.execute(sa.text(
+        "CREATE INDEX ix_embeddings_shared_workspace_id ON embeddings_shared (workspace_id)"
+    ))
+
+    conn.execute(sa.text(
+        f"INSERT INTO embeddings ({_COLUMNS}) SELECT {_COLUMNS} FROM embeddings_unpartitioned"
+    ))
+    conn.execute(sa.text("DROP TABLE embeddings_unpartitioned"))
+    conn.execute(sa.text("ALTER SEQUENCE embeddings_id_seq OWNED BY embeddings.id"))
+    conn.execute(sa.text("ANALYZE embeddings"))
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+
+    conn.execute(sa.text("ALTER SEQUENCE embeddings_id_seq OWNED BY NONE"))
+    conn.execute(sa.text("ALTER TABLE embeddings RENAME TO embeddings_partitioned"))
+    conn.execute(sa.text(
+        "ALTER TABLE embeddings_partitioned "
+        "RENAME CONSTRAINT embeddings_pkey TO embeddings_partitioned_pkey"
+    ))
+    conn.execute(sa.text("""
+        CREATE TABLE embeddings (
+            id INTEGER PRIMARY KEY DEFAULT nextval('embeddings_id_seq'),
+            workspace_id UUID NOT NULL REFERENCES workspaces(id),
+            content TEXT NOT NULL,
+            embedding vector(1536) NOT NULL,
+            channel_id VARCHAR(64),
+            message_ts VARCHAR(64),
+            thread_ts VARCHAR(64),
+            created_at TIMESTAMP DEFAULT NOW()
+        )
+    """))
+    conn.execute(sa.text(
+        f"INSERT INTO embeddings ({_COLUMNS}) SELECT {_COLUMNS} FROM embeddings_partitioned"
+    ))
+    conn.execute(sa.text("DROP TABLE embeddings_partitioned CASCADE"))
+    conn.execute(sa.text("ALTER SEQUENCE embeddings_id_seq OWNED BY embeddings.id"))
+    conn.execute(sa.text("CREATE INDEX ix_embeddings_workspace_id ON embeddings (workspace_id)"))
+    conn.execute(sa.text("""
+        CREATE INDEX ix_embeddings_cosine ON embeddings
+        USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100)
+    """))
@@ -0,0 +1,64 @@
+"""Add embedding_counts and embedding_indexes for the ANN index manager.
+
+``embedding_counts`` tracks embeddings per workspace (and the partition
+holding them); ``embedding_indexes`` records each partition's ANN index —
+method, lists, rows at build time — and the probes / ef_search calibrated
+to reach the target recall.  See ``src.services.db.ann_index``.
+
+Existing indexes (migration 010) are adopted on the first maintenance run.
+
+Revision ID: 011
+Revises: 010
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+revision = "011"
+down_revision = "010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "embedding_counts",
+        sa.Column(
+            "workspace_id",
+            UUID(as_uuid=True),
+            sa.ForeignKey("workspaces.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("partition", sa.String(63), nullable=True),
+        sa.Column("rows", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime, server_default=sa.func.now()),
+    )
+    op.create_table(
+        "embedding_indexes",
+        sa.Column("partition", sa.String(63), primary_key=True),
+        sa.Column("method", sa.String(16), nullable=False),
+        sa.Column("lists", sa.Integer, nullable=True),
+        sa.Column("rows", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("rows_at_build", sa.BigInteger, nullable=False, server_default="0"),
+        sa.Column("probes", sa.Integer, nullable=True),
+        sa.Column("ef_search", sa.Integer, nullable=True),
+        sa.Column("recall", sa.Float, nullable=True),
+        sa.Column("built_at", sa.DateTime, server_default=sa.func.now()),
+        sa.Column("calibrated_at", sa.DateTime, nullable=True),
+    )
+
+    op.execute(
+        """
+        INSERT INTO embedding_counts (workspace_id, partition, rows)
+        SELECT workspace_id, tableoid::regclass::text, count(*)
+        FROM embeddings
+        GROUP BY workspace_id, tableoid
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("embedding_indexes")
+    op.drop_table("embedding_counts")
@@ -0,0 +1,45 @@
+"""Add (or drop) embeddings.embedding_bq for the binary search prefilter.
+
+    python scripts/add_binary_embeddings.py          # add the column, then its Hamming indexes
+    python scripts/add_binary_embeddings.py --drop   # drop it again
+
+``embedding_bq`` is ``binary_quantize(embedding)`` as a stored generated
+column (see ``src/services/db/embedding_storage.py``): adding it rewrites
+``embeddings`` under an exclusive lock, so run it in a quiet window.  Needs
+pgvector 0.7+.  Searches pick it up within
+``settings.ann_search_settings_ttl_seconds``; turn
+``settings.vector_search_binary_prefilter`` off before dropping it.
+Compare recall first with ``scripts/bench_binary_prefilter.py``.
+"""
+
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+from src.services.db.ann_index import maintain_indexes  # noqa: E402
+from src.services.db.connection import get_db  # noqa: E402
+from src.services.db.embedding_storage import (  # noqa: E402
+    add_binary_column,
+    drop_binary_column,
+)
+
+
+def main(drop: bool) -> None:
+    if drop:
+        with get_db() as db:
+            dropped = drop_binary_column(db)
+        print("✅ embedding_bq dropped" if dropped else "No embedding_bq; nothing to drop")
+        return
+
+    with get_db() as db:
+        added = add_binary_column(db)
+    print("✅ embedding_bq added" if added else "embedding_bq already exists")
+
+    # The manager builds the Hamming index of every partition that lacks one
+    maintain_indexes()
+    print("✅ binary indexes built")
+
+
+if __name__ == "__main__":
+    main("--drop" in sys.argv[1:])
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Binary prefilter 벤치마크 — 현재 검색 vs Hamming 후보 + cosine rerank.
+
+가장 큰 워크스페이스들의 실제 벡터(질문 임베딩 우선, 부족하면 문서
+임베딩)를 질의로, 같은 파이프라인(threshold + 시간 가중치, top-8)을 세 가지
+방식으로 실행해 지연 시간과 recall@8을 비교합니다.
+
+  - exact    : 인덱스 없이 정확한 cosine 후보 (정답 기준)
+  - current  : ANN 인덱스 후보 (``search_similar``의 현재 경로)
+  - binary   : ``embedding_bq`` Hamming 인덱스 후보 N개 → exact cosine rerank
+
+``embedding_bq`` (``scripts/add_binary_embeddings.py``)와 pgvector 0.7 이상이 필요합니다.
+OpenAI 호출은 하지 않습니다.
+
+사용법:
+    python scripts/bench_binary_prefilter.py
+    python scripts/bench_binary_prefilter.py --workspaces 1 --queries 100 --binary-candidates 200 400 800
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+# Ensure src is in path
+sys.path.append(os.getcwd())
+
+from sqlalchemy import text  # noqa: E402
+
+from src.config import settings  # noqa: E402
+from src.services.ai import vector_store  # noqa: E402
+from src.services.db.connection import get_db  # noqa: E402
+
+_K = 8
+_THRESHOLD = 0.3
+
+_LARGEST_WORKSPACES_SQL = text("""
+    SELECT workspace_id::text, count(*) AS rows FROM embeddings
+    GROUP BY workspace_id ORDER BY rows DESC LIMIT :n
+""")
+
+_QUERIES_SQL = text("""
+    (SELECT question_embedding::text FROM qa_history
+     WHERE workspace_id = CAST(:ws_id AS uuid) AND question_embedding IS NOT NULL
+     ORDER BY random() LIMIT :n)
+    UNION ALL
+    (SELECT embedding::text FROM embeddings
+     WHERE workspace_id = CAST(:ws_id AS uuid)
+     ORDER BY random() LIMIT :n)
+    LIMIT :n
+""")
+
+
+def _exact(workspace_id: str, vector: list[float]) -> set[str]:
+    with get_db() as db:
+        db.execute(text("SET LOCAL enable_indexscan = off"))
+        rows = db.execute(
+            vector_store._SEARCH_SQL,
+            vector_store._search_params(workspace_id, vector, _K, _THRESHOLD),
+        ).fetchall()
+    return {row[0] for row in rows}
+
+
+def _timed(fn) -> tuple[float, set[str]]:
+    start = time.perf_counter()
+    results = fn()
+    return (time.perf_counter() - start) * 1000, {content for content, _, _ in results}
+
+
+def _report(label: str, latencies: list[float], recalls: list[float]) -> None:
+    p95 = sorted(latencies)[max(int(len(latencies) * 0.95) - 1, 0)]
+    print(
+        f"  {label:<20} p50={statistics.median(latencies):8.2f} ms  p95={p95:8.2f} ms  "
+        f"recall@8={statistics.mean(recalls):.3f}  min={min(recalls):.2f}"
+    )
+
+
+def _recall(truth: set[str], found: set[str]) -> float:
+    return len(truth & found) / len(truth) if truth else 1.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workspaces", type=int, default=3, help="largest N workspaces")
+    parser.add_argument("--queries", type=int, default=50, help="queries per workspace")
+    parser.add_argument(
+        "--binary-candidates", type=int, nargs="+",
+        default=[settings.vector_search_binary_candidates],
+    )
+    args = parser.parse_args()
+
+    with get_db() as db:
+        has_column = db.execute(text("""
+            SELECT EXISTS (SELECT 1 FROM pg_attribute
+                           WHERE attrelid = 'embeddings'::regclass AND attname = 'embedding_bq')
+        """)).scalar()
+        if not has_column:
+            print("❌ embeddings.embedding_bq is missing — run scripts/add_binary_embeddings.py (pgvector 0.7+)")
+            sys.exit(1)
+        workspaces = db.execute(_LARGEST_WORKSPACES_SQL, {"n": args.workspaces}).all()
+        queries = [
+            (ws, json.loads(vector))
+            for ws, _ in workspaces
+            for vector in db.execute(_QUERIES_SQL, {"ws_id": ws, "n": args.queries}).scalars()
+        ]
+    if not queries:
+        print("❌ No embeddings to benchmark")
+        sys.exit(1)
+
+    print(f"{len(queries)} queries over workspaces of "
+          + ", ".join(f"{rows} rows" for _, rows in workspaces) + "\n")
+
+    truths = [_exact(ws, vector) for ws, vector in queries]
+    for ws, vector in queries[:3]:  # warm the search profile cache and the buffer pool
+        vector_store.search_by_vector(ws, vector, _K, _THRESHOLD, binary=False)
+
+    latencies, recalls = [], []
+    for (ws, vector), truth in zip(queries, truths):
+        ms, found = _timed(lambda: vector_store.search_by_vector(ws, vector, _K, _THRESHOLD, binary=False))
+        latencies.append(ms)
+        recalls.append(_recall(truth, found))
+    _report("current (ANN)", latencies, recalls)
+
+    for candidates in args.binary_candidates:
+        settings.vector_search_binary_candidates = candidates
+        latencies, recalls = [], []
+        for (ws, vector), truth in zip(queries, truths):
+            ms, found = _timed(lambda: vector_store.search_by_vector(ws, vector, _K, _THRESHOLD, binary=True))
+            latencies.append(ms)
+            recalls.append(_recall(truth, found))
+        _report(f"binary ({candidates})", latencies, recalls)
+
+
+if __name__ == "__main__":
+    main()
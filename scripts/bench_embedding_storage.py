@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""임베딩 저장 방식별 recall 벤치마크 (전환 전 점검용).
+
+현재 full precision(``vector(1536)``)으로 저장된 우리 데이터에서, 각 저장
+방식(halfvec, 축소 차원)으로 바꿨을 때 검색 결과가 얼마나 유지되는지
+측정합니다.  질의는 실제 질문 임베딩(``qa_history.question_embedding``)을
+우선 쓰고, 부족하면 저장된 문서 임베딩으로 채웁니다 (자기 자신은 제외).
+
+  - recall@8       : full precision top-8 중 축소 방식 top-8에 남은 비율
+  - top-8 in @50   : full precision top-8 중 축소 방식 후보 50개에 든 비율
+                     (검색은 후보 50개를 다시 점수화하므로 실제 영향에 가까움)
+
+모두 워크스페이스 내 정확 검색(인덱스 미사용)으로 비교합니다.
+pgvector 0.7 이상이 필요합니다 (halfvec, subvector, l2_normalize).
+
+사용법:
+    python scripts/bench_embedding_storage.py
+    python scripts/bench_embedding_storage.py --mode halfvec:1536 --mode vector:512 --queries 300
+"""
+
+import argparse
+import os
+import statistics
+import sys
+
+# Ensure src is in path
+sys.path.append(os.getcwd())
+
+from sqlalchemy import text  # noqa: E402
+
+from src.config import settings  # noqa: E402
+from src.services.db.connection import get_db  # noqa: E402
+from src.services.db.embedding_storage import FULL_DIMENSIONS, reduce_sql  # noqa: E402
+
+_DEFAULT_MODES = ["halfvec:1536", "vector:768", "halfvec:768", "vector:512", "halfvec:512"]
+_K = 8
+
+_QUESTION_QUERIES_SQL = text("""
+    SELECT workspace_id, question_embedding::text, NULL::int
+    FROM qa_history
+    WHERE question_embedding IS NOT NULL
+    ORDER BY random()
+    LIMIT :n
+""")
+
+_DOCUMENT_QUERIES_SQL = text("""
+    SELECT workspace_id, embedding::text, id
+    FROM embeddings TABLESAMPLE BERNOULLI (:percent)
+    LIMIT :n
+""")
+
+
+def _parse_mode(mode: str) -> tuple[str, int]:
+    storage, _, dimensions = mode.partition(":")
+    return storage, int(dimensions or FULL_DIMENSIONS)
+
+
+def _bytes_per_vector(storage: str, dimensions: int) -> int:
+    return (2 if storage == "halfvec" else 4) * dimensions + 8
+
+
+def _nearest_sql(storage: str | None, dimensions: int, limit: int):
+    column, query = "embedding", "CAST(:q AS vector)"
+    if storage is not None:
+        column = reduce_sql(column, storage, dimensions)
+        query = reduce_sql(query, storage, dimensions)
+    return text(f"""
+        SELECT id FROM embeddings
+        WHERE workspace_id = :ws_id AND id IS DISTINCT FROM :self_id
+        ORDER BY {column} <=> {query}
+        LIMIT {limit}
+    """)
+
+
+def _sample_queries(db, n: int) -> list[tuple]:
+    queries = db.execute(_QUESTION_QUERIES_SQL, {"n": n}).all()
+    if len(queries) < n:
+        rows = db.execute(text("SELECT reltuples::bigint FROM pg_class WHERE relname = 'embeddings'")).scalar()
+        percent = min(100.0, 100.0 * n * 5 / max(rows or 0, 1))
+        queries += db.execute(
+            _DOCUMENT_QUERIES_SQL, {"percent": percent, "n": n - len(queries)},
+        ).all()
+    return queries
+
+
+def _check_prerequisites(db) -> str | None:
+    version = db.execute(text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")).scalar()
+    if version is None or tuple(int(p) for p in version.split(".")[:2]) < (0, 7):
+        return f"pgvector {version} — halfvec/subvector need 0.7 or later"
+    current = db.execute(text("""
+        SELECT format_type(atttypid, atttypmod) FROM pg_attribute
+        WHERE attrelid = 'embeddings'::regclass AND attname = 'embedding'
+    """)).scalar()
+    if current != f"vector({FULL_DIMENSIONS})":
+        return f"embeddings.embedding is already {current}; benchmark against full precision only"
+    return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", action="append", help="storage:dimensions (repeatable)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--candidates", type=int, default=settings.vector_search_candidates)
+    args = parser.parse_args()
+    modes = [_parse_mode(mode) for mode in (args.mode or _DEFAULT_MODES)]
+
+    with get_db() as db:
+        problem = _check_prerequisites(db)
+        if problem:
+            print(f"❌ {problem}")
+            sys.exit(1)
+        queries = _sample_queries(db, args.queries)
+        if not queries:
+            print("❌ No embeddings to benchmark")
+            sys.exit(1)
+
+        db.execute(text("SET LOCAL enable_indexscan = off"))  # exact search on both sides
+        truth_sql = _nearest_sql(None, FULL_DIMENSIONS, _K)
+        truths = [
+            set(db.execute(truth_sql, {"ws_id": ws, "q": q, "self_id": self_id}).scalars().all())
+            for ws, q, self_id in queries
+        ]
+
+        full_bytes = _bytes_per_vector("vector", FULL_DIMENSIONS)
+        print(f"{len(queries)} queries over {len({ws for ws, _, _ in queries})} workspaces, "
+              f"full precision = {full_bytes} B/vector\n")
+        print(f"  {'mode':<14} {'B/vector':>9} {'size':>6} {'recall@8':>9} {'p5':>6} "
+              f"{'min':>6} {'top-8 in @' + str(args.candidates):>14}")
+        for storage, dimensions in modes:
+            top_sql = _nearest_sql(storage, dimensions, _K)
+            candidates_sql = _nearest_sql(storage, dimensions, args.candidates)
+            recalls, covered = [], []
+            for (ws, q, self_id), truth in zip(queries, truths):
+                if not truth:
+                    continue
+                params = {"ws_id": ws, "q": q, "self_id": self_id}
+                top = set(db.execute(top_sql, params).scalars().all())
+                candidates = set(db.execute(candidates_sql, params).scalars().all())
+                recalls.append(len(truth & top) / len(truth))
+                covered.append(len(truth & candidates) / len(truth))
+            if not recalls:
+                print(f"  {storage + ':' + str(dimensions):<14} no query with results")
+                continue
+            p5 = sorted(recalls)[max(int(len(recalls) * 0.05) - 1, 0)]
+            size = _bytes_per_vector(storage, dimensions)
+            print(
+                f"  {storage + ':' + str(dimensions):<14} {size:>9} {size / full_bytes:>6.0%} "
+                f"{statistics.mean(recalls):>9.3f} {p5:>6.2f} {min(recalls):>6.2f} "
+                f"{statistics.mean(covered):>14.3f}"
+            )
+        db.rollback()
+
+
+if __name__ == "__main__":
+    main()
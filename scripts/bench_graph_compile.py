@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""LangGraph 컴파일 오버헤드 마이크로벤치마크.
+
+요청마다 ``create_graph().compile()``을 호출하던 기존 방식과
+프로세스 단위로 캐시된 ``get_compiled_graph()``의 요청당 비용을 비교합니다.
+DB/OpenAI 연결 없이 실행됩니다 (체크포인터는 InMemorySaver 사용).
+
+사용법:
+    python scripts/bench_graph_compile.py
+    python scripts/bench_graph_compile.py --iterations 500
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# Ensure src is in path
+sys.path.append(os.getcwd())
+
+from langgraph.checkpoint.memory import InMemorySaver
+
+from src.services.ai.graph import (
+    clear_compiled_graphs,
+    create_graph,
+    get_compiled_graph,
+)
+
+
+def _measure(fn, iterations: int) -> list[float]:
+    """Run ``fn`` ``iterations`` times and return per-call latencies in ms."""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def _report(label: str, samples: list[float]) -> None:
+    p95 = sorted(samples)[int(len(samples) * 0.95) - 1]
+    print(
+        f"  {label:<28} mean={statistics.mean(samples):8.3f} ms  "
+        f"p50={statistics.median(samples):8.3f} ms  p95={p95:8.3f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    checkpointer = InMemorySaver()
+
+    # Before: compile on every request
+    before = _measure(
+        lambda: create_graph().compile(checkpointer=checkpointer),
+        args.iterations,
+    )
+
+    # After: first call compiles, the rest hit the per-checkpointer cache
+    clear_compiled_graphs()
+    after = _measure(
+        lambda: get_compiled_graph(checkpointer=checkpointer),
+        args.iterations,
+    )
+
+    print(f"--- Graph compile overhead per request ({args.iterations} runs) ---")
+    _report("before (compile per call)", before)
+    _report("after  (cached)", after)
+    saved = statistics.mean(before) - statistics.mean(after)
+    print(f"  saved per request: {saved:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Convert stored embeddings to the configured storage mode.
+
+    EMBEDDING_STORAGE=halfvec EMBEDDING_DIMENSIONS=768 python scripts/convert_embedding_storage.py
+
+Rewrites ``embeddings.embedding`` and ``qa_history.question_embedding`` to
+``settings.embedding_storage`` / ``settings.embedding_dimensions`` in place
+(no re-embedding; see ``src/services/db/embedding_storage.py``), then lets
+the ANN index manager build indexes with the new operator class.  Stop the
+web app and worker first and start them with the same settings: they refuse
+to start while the columns differ.  Measure recall first with
+``scripts/bench_embedding_storage.py``.
+"""
+
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+from src.config import settings  # noqa: E402
+from src.services.db.ann_index import maintain_indexes  # noqa: E402
+from src.services.db.connection import get_db  # noqa: E402
+from src.services.db.embedding_storage import convert_storage, sql_type  # noqa: E402
+
+
+def main() -> None:
+    with get_db() as db:  # one transaction: all columns or none
+        changes = convert_storage(db, settings.embedding_storage, settings.embedding_dimensions)
+    if not changes:
+        print(f"Already {sql_type()}; nothing to convert")
+        return
+    for change in changes:
+        print(f"✅ {change}")
+
+    for decision in maintain_indexes():
+        print(f"  {decision['partition']}: {decision['method']} ({decision['rows']} rows)")
+
+
+if __name__ == "__main__":
+    main()
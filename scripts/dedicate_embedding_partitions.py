@@ -0,0 +1,44 @@
+"""Move large workspaces' embeddings into dedicated partitions.
+
+    python scripts/dedicate_embedding_partitions.py                # every workspace over the threshold
+    python scripts/dedicate_embedding_partitions.py <workspace_id> # a specific workspace
+
+The threshold is ``settings.embedding_dedicated_partition_min_rows``.  See
+``src/services/db/embedding_partitions.py`` and migration 010.
+"""
+
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+from src.config import settings  # noqa: E402
+from src.services.db.connection import get_db  # noqa: E402
+from src.services.db.embedding_partitions import (  # noqa: E402
+    dedicate_workspace_partition,
+    get_leaf_partitions,
+    get_workspaces_to_dedicate,
+)
+
+
+def main(workspace_ids: list[str]) -> None:
+    if not workspace_ids:
+        with get_db() as db:
+            workspace_ids = get_workspaces_to_dedicate(
+                db, settings.embedding_dedicated_partition_min_rows,
+            )
+    if not workspace_ids:
+        print("No workspace over the threshold; nothing to move")
+
+    for workspace_id in workspace_ids:
+        with get_db() as db:  # one transaction per workspace
+            name = dedicate_workspace_partition(db, workspace_id)
+        print(f"✅ {workspace_id} → {name}")
+
+    with get_db() as db:
+        for name, rows in get_leaf_partitions(db):
+            print(f"  {name}: ~{rows} rows")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
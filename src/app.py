@@ -1,32 +1,32 @@
 import logging
 
 import uvicorn
-from slack_bolt import App
+from slack_bolt.app.async_app import AsyncApp
 from slack_bolt.authorization import AuthorizeResult
 
 from src.config import settings
-from src.services.db.connection import get_db
-from src.services.db.workspaces import get_workspace_by_team_id
+from src.services.slack.installations import get_bot_token
 from src.utils.logger import setup_logging
 
 setup_logging()
 logger = logging.getLogger(__name__)
 
 
-def authorize(enterprise_id, team_id, logger):
-    """Look up bot token from our DB for each incoming Slack request."""
-    with get_db() as db:
-        ws = get_workspace_by_team_id(db, team_id)
-        if ws is None:
-            raise Exception(f"No workspace found for team {team_id}")
-        return AuthorizeResult(
-            enterprise_id=enterprise_id,
-            team_id=team_id,
-            bot_token=ws.bot_token,
-        )
+async def authorize(enterprise_id, team_id, logger):
+    """Look up the bot token for each incoming Slack request (cached in-process)."""
+    bot_token = await get_bot_token(team_id)
+    if bot_token is None:
+        raise Exception(f"No workspace found for team {team_id}")
+    return AuthorizeResult(
+        enterprise_id=enterprise_id,
+        team_id=team_id,
+        bot_token=bot_token,
+    )
 
 
-app = App(
+# AsyncApp: listeners run on the server's event loop with an AsyncWebClient,
+# so concurrent (streaming) answers don't each hold a worker thread
+app = AsyncApp(
     authorize=authorize,
     signing_secret=settings.slack_signing_secret,
 )
@@ -63,15 +63,13 @@ onboarding_view_handler.register(app)
 def main():
     from src.web import create_web_app
 
-    web_app = create_web_app(app)
-
-    if settings.environment == "development" and settings.slack_app_token:
-        # Local dev: Socket Mode (no public URL needed)
-        from slack_bolt.adapter.socket_mode import SocketModeHandler
+    # Local dev: Socket Mode (no public URL needed), connected on the
+    # server loop at startup (see src.web)
+    socket_mode = settings.environment == "development" and bool(settings.slack_app_token)
+    web_app = create_web_app(app, socket_mode=socket_mode)
 
+    if socket_mode:
         logger.info("Starting Slough.ai bot (Socket Mode — dev)")
-        socket_handler = SocketModeHandler(app, settings.slack_app_token)
-        socket_handler.connect()
     else:
         # Production: HTTP mode (Slack POSTs to /slack/events)
         logger.info("Starting Slough.ai bot (HTTP Mode — prod)")
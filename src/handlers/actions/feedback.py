@@ -6,15 +6,15 @@ import logging
 import uuid as uuid_mod
 
 from src.services.ai import process_feedback
-from src.services.db import get_db
-from src.services.db.workspaces import get_workspace_by_team_id
+from src.services.db import get_async_db, get_db
+from src.services.db.workspaces import aget_workspace_by_team_id
 from src.services.db.qa_history import get_qa_record, update_feedback
 from src.utils.blocks import build_feedback_notification
 
 logger = logging.getLogger(__name__)
 
 
-def _check_is_decision_maker(body, client) -> bool:
+async def _check_is_decision_maker(body, client) -> bool:
     """Verify the user clicking is the decision-maker. Returns False and notifies if not."""
     user_id = body["user"]["id"]
     team_id = body.get("team", {}).get("id")
@@ -23,10 +23,10 @@ def _check_is_decision_maker(body, client) -> bool:
         return True  # Can't verify, allow
 
     try:
-        with get_db() as db:
-            workspace = get_workspace_by_team_id(db, team_id)
+        async with get_async_db() as db:
+            workspace = await aget_workspace_by_team_id(db, team_id)
             if workspace and workspace.decision_maker_id != user_id:
-                client.chat_postEphemeral(
+                await client.chat_postEphemeral(
                     channel=body["channel"]["id"],
                     user=user_id,
                     text="피드백은 의사결정자만 제출할 수 있습니다.",
@@ -42,31 +42,31 @@ def register(app):
     """Register all feedback action handlers."""
 
     @app.action("feedback_approved")
-    def handle_approved(ack, body, client):
-        ack()
-        if _check_is_decision_maker(body, client):
-            _handle_feedback(body, client, "approved")
+    async def handle_approved(ack, body, client):
+        await ack()
+        if await _check_is_decision_maker(body, client):
+            await _handle_feedback(body, client, "approved")
 
     @app.action("feedback_rejected")
-    def handle_rejected(ack, body, client):
-        ack()
-        if _check_is_decision_maker(body, client):
-            _handle_feedback(body, client, "rejected")
+    async def handle_rejected(ack, body, client):
+        await ack()
+        if await _check_is_decision_maker(body, client):
+            await _handle_feedback(body, client, "rejected")
 
     @app.action("feedback_caution")
-    def handle_caution(ack, body, client):
-        ack()
-        if _check_is_decision_maker(body, client):
-            _handle_feedback(body, client, "caution")
+    async def handle_caution(ack, body, client):
+        await ack()
+        if await _check_is_decision_maker(body, client):
+            await _handle_feedback(body, client, "caution")
 
     @app.action("feedback_edit")
-    def handle_edit(ack, body, client):
-        ack()
-        if _check_is_decision_maker(body, client):
-            _open_edit_modal(body, client)
+    async def handle_edit(ack, body, client):
+        await ack()
+        if await _check_is_decision_maker(body, client):
+            await _open_edit_modal(body, client)
 
 
-def _handle_feedback(body: dict, client, feedback_type: str):
+async def _handle_feedback(body: dict, client, feedback_type: str):
     """Process a simple feedback action (approved/rejected/caution)."""
     action = body["actions"][0]
 
@@ -83,19 +83,16 @@ def _handle_feedback(body: dict, client, feedback_type: str):
     # Persist feedback to DB
     try:
         qa_uuid = uuid_mod.UUID(qa_id)
-        with get_db() as db:
-            update_feedback(db, qa_uuid, feedback_type)
+        await asyncio.to_thread(_update_feedback, qa_uuid, feedback_type)
     except (ValueError, Exception):
         logger.warning("Could not update feedback in DB", extra={"qa_id": qa_id})
 
     # Call AI feedback pipeline
     try:
-        asyncio.run(
-            process_feedback(
-                workspace_id=team_id,
-                question_id=qa_id,
-                feedback_type=feedback_type,
-            )
+        await process_feedback(
+            workspace_id=team_id,
+            question_id=qa_id,
+            feedback_type=feedback_type,
         )
     except Exception:
         logger.exception("AI process_feedback failed", extra={"qa_id": qa_id})
@@ -120,7 +117,7 @@ def _handle_feedback(body: dict, client, feedback_type: str):
             "elements": [{"type": "mrkdwn", "text": f"*피드백 완료:* {label}"}],
         })
 
-        client.chat_update(
+        await client.chat_update(
             channel=channel,
             ts=message_ts,
             blocks=updated_blocks,
@@ -131,10 +128,10 @@ def _handle_feedback(body: dict, client, feedback_type: str):
 
     # Notify the employee
     if asker_id:
-        _notify_employee(client, asker_id, feedback_type)
+        await _notify_employee(client, asker_id, feedback_type)
 
 
-def _open_edit_modal(body: dict, client):
+async def _open_edit_modal(body: dict, client):
     """Open a modal for the decision-maker to edit the answer."""
     action = body["actions"][0]
     trigger_id = body["trigger_id"]
@@ -152,10 +149,7 @@ def _open_edit_modal(body: dict, client):
     current_answer = ""
     try:
         qa_uuid = uuid_mod.UUID(qa_id)
-        with get_db() as db:
-            record = get_qa_record(db, qa_uuid)
-            if record:
-                current_answer = record.answer
+        current_answer = await asyncio.to_thread(_get_answer, qa_uuid)
     except Exception:
         logger.warning("Could not fetch answer for edit modal", extra={"qa_id": qa_id})
 
@@ -168,7 +162,7 @@ def _open_edit_modal(body: dict, client):
     })
 
     try:
-        client.views_open(
+        await client.views_open(
             trigger_id=trigger_id,
             view={
                 "type": "modal",
@@ -196,17 +190,30 @@ def _open_edit_modal(body: dict, client):
         logger.exception("Failed to open edit modal")
 
 
-def _notify_employee(client, asker_id: str, feedback_type: str, corrected_answer: str | None = None):
+async def _notify_employee(client, asker_id: str, feedback_type: str, corrected_answer: str | None = None):
     """Send a feedback notification DM to the employee."""
     blocks = build_feedback_notification(feedback_type, corrected_answer)
 
     try:
-        dm = client.conversations_open(users=[asker_id])
+        dm = await client.conversations_open(users=[asker_id])
         dm_channel = dm["channel"]["id"]
-        client.chat_postMessage(
+        await client.chat_postMessage(
             channel=dm_channel,
             blocks=blocks,
             text=blocks[0]["text"]["text"],
         )
     except Exception:
         logger.exception("Failed to notify employee", extra={"asker_id": asker_id})
+
+
+# ── Blocking DB helpers (run in a worker thread) ─────────────────────
+
+def _update_feedback(qa_uuid: uuid_mod.UUID, feedback_type: str) -> None:
+    with get_db() as db:
+        update_feedback(db, qa_uuid, feedback_type)
+
+
+def _get_answer(qa_uuid: uuid_mod.UUID) -> str:
+    with get_db() as db:
+        record = get_qa_record(db, qa_uuid)
+        return record.answer if record else ""
@@ -2,8 +2,8 @@
 
 import logging
 
-from src.services.db.connection import get_db
-from src.services.db.workspaces import get_workspace_by_team_id
+from src.services.db.connection import get_async_db
+from src.services.db.workspaces import aget_workspace_by_team_id
 
 logger = logging.getLogger(__name__)
 
@@ -12,8 +12,8 @@ def register(app):
     """Register the onboarding button handler."""
 
     @app.action("start_onboarding")
-    def handle_start_onboarding(ack, body, client):
-        ack()
+    async def handle_start_onboarding(ack, body, client):
+        await ack()
 
         trigger_id = body["trigger_id"]
         team_id = body.get("team", {}).get("id")
@@ -22,11 +22,11 @@ def register(app):
         # Look up workspace and check admin permission
         current_dm_id = user_id
         if team_id:
-            with get_db() as db:
-                workspace = get_workspace_by_team_id(db, team_id)
+            async with get_async_db() as db:
+                workspace = await aget_workspace_by_team_id(db, team_id)
                 if workspace:
                     if workspace.admin_id != user_id:
-                        client.chat_postEphemeral(
+                        await client.chat_postEphemeral(
                             channel=body["channel"]["id"],
                             user=user_id,
                             text="이 설정은 앱 관리자만 변경할 수 있습니다.",
@@ -34,7 +34,7 @@ def register(app):
                         return
                     current_dm_id = workspace.decision_maker_id
 
-        client.views_open(
+        await client.views_open(
             trigger_id=trigger_id,
             view={
                 "type": "modal",
@@ -1,11 +1,12 @@
 """Handler for the '검토 요청' (review request) button click."""
 
+import asyncio
 import json
 import logging
 import uuid as uuid_mod
 
-from src.services.db import get_db
-from src.services.db.workspaces import get_workspace_by_team_id
+from src.services.db import get_async_db, get_db
+from src.services.db.workspaces import aget_workspace_by_team_id
 from src.services.db.qa_history import get_qa_record, update_review_status
 from src.utils.blocks import build_review_request_blocks
 
@@ -16,8 +17,8 @@ def register(app):
     """Register the review request action handler."""
 
     @app.action("request_review")
-    def handle_request_review(ack, body, client):
-        ack()
+    async def handle_request_review(ack, body, client):
+        await ack()
 
         user_id = body["user"]["id"]
         action = body["actions"][0]
@@ -33,11 +34,11 @@ def register(app):
         channel = body["channel"]["id"]
 
         # Look up workspace for decision_maker_id
-        with get_db() as db:
-            workspace = get_workspace_by_team_id(db, team_id)
+        async with get_async_db() as db:
+            workspace = await aget_workspace_by_team_id(db, team_id)
             if workspace is None:
                 logger.error("Workspace not found for review request", extra={"team_id": team_id})
-                client.chat_postMessage(
+                await client.chat_postMessage(
                     channel=channel,
                     text="워크스페이스 설정이 완료되지 않았습니다.",
                 )
@@ -49,12 +50,9 @@ def register(app):
         answer = ""
         try:
             qa_uuid = uuid_mod.UUID(qa_id)
-            with get_db() as db:
-                record = get_qa_record(db, qa_uuid)
-                if record:
-                    question = record.question
-                    answer = record.answer
-                    update_review_status(db, qa_uuid, "requested")
+            qa = await asyncio.to_thread(_mark_review_requested, qa_uuid)
+            if qa:
+                question, answer = qa
         except (ValueError, Exception):
             logger.warning("Could not fetch QA record", extra={"qa_id": qa_id})
             # Fall back to reading from the message
@@ -72,24 +70,34 @@ def register(app):
         )
 
         try:
-            dm = client.conversations_open(users=[decision_maker_id])
+            dm = await client.conversations_open(users=[decision_maker_id])
             dm_channel = dm["channel"]["id"]
 
-            client.chat_postMessage(
+            await client.chat_postMessage(
                 channel=dm_channel,
                 blocks=blocks,
                 text=f"검토 요청: {question[:50]}...",
             )
         except Exception:
             logger.exception("Failed to send review request to decision-maker")
-            client.chat_postMessage(
+            await client.chat_postMessage(
                 channel=channel,
                 text="검토 요청 전송에 실패했습니다. 관리자에게 문의해 주세요.",
             )
             return
 
         # Notify the employee that review was requested
-        client.chat_postMessage(
+        await client.chat_postMessage(
             channel=channel,
             text="🔍 의사결정자에게 검토 요청이 전달되었습니다. 확인 후 알려드리겠습니다.",
         )
+
+
+def _mark_review_requested(qa_uuid: uuid_mod.UUID) -> tuple[str, str] | None:
+    """Set the QA record's review status; return its (question, answer) if found."""
+    with get_db() as db:
+        record = get_qa_record(db, qa_uuid)
+        if record is None:
+            return None
+        update_review_status(db, qa_uuid, "requested")
+        return record.question, record.answer
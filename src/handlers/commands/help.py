@@ -2,8 +2,8 @@
 
 import logging
 
-from src.services.db import get_db
-from src.services.db.workspaces import get_workspace_by_team_id
+from src.services.db import get_async_db
+from src.services.db.workspaces import aget_workspace_by_team_id
 
 logger = logging.getLogger(__name__)
 
@@ -12,25 +12,25 @@ def register(app):
     """Register both help command handlers."""
 
     @app.command("/slough-help")
-    def handle_help_en(ack, command, respond):
-        ack()
-        role = _get_role(command)
-        respond(blocks=_build_en(role), text="Slough.ai Help")
+    async def handle_help_en(ack, command, respond):
+        await ack()
+        role = await _get_role(command)
+        await respond(blocks=_build_en(role), text="Slough.ai Help")
 
     @app.command("/slough-help-kr")
-    def handle_help_kr(ack, command, respond):
-        ack()
-        role = _get_role(command)
-        respond(blocks=_build_kr(role), text="Slough.ai 도움말")
+    async def handle_help_kr(ack, command, respond):
+        await ack()
+        role = await _get_role(command)
+        await respond(blocks=_build_kr(role), text="Slough.ai 도움말")
 
 
-def _get_role(command: dict) -> str:
+async def _get_role(command: dict) -> str:
     team_id = command.get("team_id", "")
     user_id = command.get("user_id", "")
     role = "employee"
     try:
-        with get_db() as db:
-            workspace = get_workspace_by_team_id(db, team_id)
+        async with get_async_db() as db:
+            workspace = await aget_workspace_by_team_id(db, team_id)
             if workspace:
                 if user_id == workspace.admin_id:
                     role = "admin"
@@ -1,9 +1,10 @@
 """Handler for /slough-ingest — incremental learning of decision-maker messages.
 
 Fetches only NEW messages since the last successful ingestion, avoiding
-duplicates. Runs ingestion in a background thread so ack() returns immediately.
+duplicates. Runs ingestion in a background thread so the handler returns immediately.
 """
 
+import asyncio
 import logging
 import threading
 from datetime import datetime
@@ -20,55 +21,27 @@ def register(app):
     """Register the /slough-ingest slash command."""
 
     @app.command("/slough-ingest")
-    def handle_ingest(ack, command, respond, client):
-        ack()
+    async def handle_ingest(ack, command, respond, client):
+        await ack()
 
         team_id = command.get("team_id", "")
         user_id = command.get("user_id", "")
         cmd_text = (command.get("text") or "").strip().lower()
         is_full = cmd_text == "full"
 
-        # Look up workspace
         try:
-            with get_db() as db:
-                workspace = get_workspace_by_team_id(db, team_id)
-                if workspace is None:
-                    respond(text="❌ 워크스페이스를 찾을 수 없습니다.")
-                    return
-
-                # Only admin or decision-maker can run ingestion
-                if user_id not in (workspace.admin_id, workspace.decision_maker_id):
-                    respond(text="❌ 관리자 또는 의사결정자만 학습을 실행할 수 있습니다.")
-                    return
-
-                workspace_id = workspace.id
-
-                # Check for running job
-                latest_job = get_latest_job(db, workspace_id)
-                if latest_job and latest_job.status == "running":
-                    respond(text="⏳ 이미 학습이 진행 중입니다. 완료될 때까지 기다려 주세요.")
-                    return
-
-                # Full re-ingest: delete existing embeddings + conversation memory
-                if is_full:
-                    from src.services.db.models import Embedding
-                    deleted = db.query(Embedding).filter(
-                        Embedding.workspace_id == workspace_id,
-                    ).delete()
-                    db.commit()
-                    logger.info("Full re-ingest: deleted %d embeddings for workspace %s", deleted, workspace_id)
-
-                    from src.services.ai.memory import clear_checkpoints
-                    cleared = clear_checkpoints(str(workspace_id))
-                    logger.info("Full re-ingest: cleared %d checkpoint rows for workspace %s", cleared, workspace_id)
-
+            error = await asyncio.to_thread(_prepare_ingestion, team_id, user_id, is_full)
         except Exception:
             logger.exception("DB error during /slough-ingest")
-            respond(text="❌ 데이터베이스 오류가 발생했습니다.")
+            await respond(text="❌ 데이터베이스 오류가 발생했습니다.")
+            return
+
+        if error:
+            await respond(text=error)
             return
 
         if is_full:
-            respond(
+            await respond(
                 text=(
                     "🔄 전체 재학습을 시작합니다!\n"
                     "기존 학습 데이터와 대화 기록을 초기화하고 모든 메시지를 다시 학습합니다.\n"
@@ -76,7 +49,7 @@ def register(app):
                 ),
             )
         else:
-            respond(
+            await respond(
                 text=(
                     "📚 증분 학습을 시작합니다!\n"
                     "이전 학습 이후 새로운 메시지만 가져옵니다.\n"
@@ -90,3 +63,41 @@ def register(app):
             kwargs={"incremental": not is_full},
             daemon=True,
         ).start()
+
+
+def _prepare_ingestion(team_id: str, user_id: str, is_full: bool) -> str | None:
+    """Check permissions / running jobs and reset data for a full re-ingest.
+
+    Blocking DB work, run in a worker thread.  Returns an error message for
+    the user, or None if ingestion may start.
+    """
+    with get_db() as db:
+        workspace = get_workspace_by_team_id(db, team_id)
+        if workspace is None:
+            return "❌ 워크스페이스를 찾을 수 없습니다."
+
+        # Only admin or decision-maker can run ingestion
+        if user_id not in (workspace.admin_id, workspace.decision_maker_id):
+            return "❌ 관리자 또는 의사결정자만 학습을 실행할 수 있습니다."
+
+        workspace_id = workspace.id
+
+        # Check for running job
+        latest_job = get_latest_job(db, workspace_id)
+        if latest_job and latest_job.status == "running":
+            return "⏳ 이미 학습이 진행 중입니다. 완료될 때까지 기다려 주세요."
+
+        # Full re-ingest: delete existing embeddings + conversation memory
+        if is_full:
+            from src.services.db.models import Embedding
+            deleted = db.query(Embedding).filter(
+                Embedding.workspace_id == workspace_id,
+            ).delete()
+            db.commit()
+            logger.info("Full re-ingest: deleted %d embeddings for workspace %s", deleted, workspace_id)
+
+            from src.services.ai.memory import clear_checkpoints
+            cleared = clear_checkpoints(str(workspace_id))
+            logger.info("Full re-ingest: cleared %d checkpoint rows for workspace %s", cleared, workspace_id)
+
+    return None
@@ -1,9 +1,10 @@
 """Handler for /stats slash command — shows real-time workspace statistics."""
 
+import asyncio
 import logging
 
-from src.services.db import get_db
-from src.services.db.workspaces import get_workspace_by_team_id
+from src.services.db import get_async_db, get_db
+from src.services.db.workspaces import aget_workspace_by_team_id
 from src.services.db.weekly_stats import get_period_stats, get_current_week_range
 
 logger = logging.getLogger(__name__)
@@ -15,42 +16,46 @@ def register(app):
     """Register the /stats command handler."""
 
     @app.command("/slough-stats")
-    def handle_stats_command(ack, command, respond):
-        ack()
+    async def handle_stats_command(ack, command, respond):
+        await ack()
 
         team_id = command.get("team_id", "")
         user_id = command.get("user_id", "")
 
         # Look up workspace
         try:
-            with get_db() as db:
-                workspace = get_workspace_by_team_id(db, team_id)
+            async with get_async_db() as db:
+                workspace = await aget_workspace_by_team_id(db, team_id)
                 if workspace is None:
-                    respond("워크스페이스 설정이 완료되지 않았습니다.")
+                    await respond("워크스페이스 설정이 완료되지 않았습니다.")
                     return
                 admin_id = workspace.admin_id
                 workspace_id = workspace.id
         except Exception:
             logger.exception("DB error during /stats")
-            respond(FALLBACK_RESPONSE)
+            await respond(FALLBACK_RESPONSE)
             return
 
         # Admin only
         if admin_id != user_id:
-            respond("이 명령어는 앱 관리자만 사용할 수 있습니다.")
+            await respond("이 명령어는 앱 관리자만 사용할 수 있습니다.")
             return
 
         # Get current week stats
         try:
             week_start, week_end = get_current_week_range()
-            with get_db() as db:
-                stats = get_period_stats(db, workspace_id, week_start, week_end)
+            stats = await asyncio.to_thread(_period_stats, workspace_id, week_start, week_end)
         except Exception:
             logger.exception("Failed to aggregate stats")
-            respond(FALLBACK_RESPONSE)
+            await respond(FALLBACK_RESPONSE)
             return
 
-        respond(blocks=_build_stats_blocks(stats, week_start, week_end), text="주간 현황")
+        await respond(blocks=_build_stats_blocks(stats, week_start, week_end), text="주간 현황")
+
+
+def _period_stats(workspace_id, week_start, week_end) -> dict:
+    with get_db() as db:
+        return get_period_stats(db, workspace_id, week_start, week_end)
 
 
 def _build_stats_blocks(stats: dict, week_start, week_end) -> list[dict]:
@@ -1,17 +1,15 @@
 """DM message handler — receives employee questions, returns AI answers."""
 
-import asyncio
 import logging
 import time
+import uuid
 
 from src.services.ai import generate_answer_streaming
-from src.services.db import get_db
-from src.services.db.workspaces import get_workspace_by_team_id
-from src.services.db.rules import get_active_rules
-from src.services.db.qa_history import create_qa_record
-from src.services.redis_client import is_duplicate_event
-from src.utils.keywords import detect_high_risk_keywords
-from src.utils.prohibited import check_prohibited
+from src.services.db import get_async_db
+from src.services.db.qa_history import acreate_qa_record
+from src.services.redis_client import ais_duplicate_event
+from src.services.workspace_context import get_workspace_context
+from src.utils.question_matcher import scan_question
 from src.utils.blocks import build_answer_blocks
 
 logger = logging.getLogger(__name__)
@@ -31,14 +29,14 @@ def register(app):
     """Register message and app_mention event handlers."""
 
     @app.event("app_mention")
-    def handle_app_mention(event, say, client):
+    async def handle_app_mention(event, say, client):
         """Handle mentions in channels (e.g. @SloughAI 질문)."""
         # Always reply in thread for mentions
         thread_ts = event.get("thread_ts") or event.get("ts")
-        _process_question(event, say, client, thread_ts=thread_ts)
+        await _process_question(event, say, client, thread_ts=thread_ts)
 
     @app.event("message")
-    def handle_dm(event, say, client):
+    async def handle_dm(event, say, client):
         """Handle direct messages (no mention needed)."""
         # Ignore bot messages and message subtypes
         if event.get("subtype") or event.get("bot_id"):
@@ -50,14 +48,14 @@ def register(app):
 
         # For DMs, reply in thread if user replied in thread, else main channel
         thread_ts = event.get("thread_ts")
-        _process_question(event, say, client, thread_ts=thread_ts)
+        await _process_question(event, say, client, thread_ts=thread_ts)
 
 
-def _process_question(event, say, client, thread_ts=None):
+async def _process_question(event, say, client, thread_ts=None):
     """Common logic for processing questions via RAG (Dedup, Rules, AI, DB)."""
     # ── Dedup check ──
     event_id = event.get("client_msg_id") or event.get("ts")
-    if event_id and is_duplicate_event(event_id):
+    if event_id and await ais_duplicate_event(event_id):
         logger.debug("Duplicate event ignored: %s", event_id)
         return
 
@@ -78,41 +76,41 @@ def _process_question(event, say, client, thread_ts=None):
 
     logger.info("Processing question", extra={"user": user_id, "channel": channel})
 
-    # Look up workspace
+    # Workspace snapshot (rules, persona, decision-maker) — loaded once per
+    # question, usually from cache, and handed to the pipeline
     try:
-        with get_db() as db:
-            workspace = get_workspace_by_team_id(db, team_id) if team_id else None
-
-            if workspace is None:
-                say(
-                    text="워크스페이스 설정이 완료되지 않았습니다. 관리자에게 문의해 주세요.",
-                    channel=channel,
-                    thread_ts=thread_ts,
-                )
-                return
-
-            workspace_id = workspace.id
-            active_rules = get_active_rules(db, workspace_id)
-            rules = [{"id": r.id, "rule_text": r.rule_text} for r in active_rules]
+        workspace = await get_workspace_context(team_id) if team_id else None
     except Exception:
         logger.exception("DB error during workspace/rules lookup")
-        say(text=FALLBACK_RESPONSE, channel=channel, thread_ts=thread_ts)
+        await say(text=FALLBACK_RESPONSE, channel=channel, thread_ts=thread_ts)
+        return
+
+    if workspace is None:
+        await say(
+            text="워크스페이스 설정이 완료되지 않았습니다. 관리자에게 문의해 주세요.",
+            channel=channel,
+            thread_ts=thread_ts,
+        )
         return
 
-    # Check prohibited content locally
-    prohibited_check = check_prohibited(text)
-    if prohibited_check["is_prohibited"]:
+    workspace_id = workspace.workspace_id
+    rules = workspace.rules
+
+    # Screen rules / prohibited / high-risk in one pass; the result is
+    # handed to the pipeline so it is not repeated there
+    screening = scan_question(workspace_id, rules, text)
+    if screening.is_prohibited:
         logger.info(
             "Prohibited domain detected",
-            extra={"matched": prohibited_check["matched"]},
+            extra={"matched": screening.prohibited},
         )
-        say(text=PROHIBITED_RESPONSE, channel=channel, thread_ts=thread_ts)
+        await say(text=PROHIBITED_RESPONSE, channel=channel, thread_ts=thread_ts)
         return
 
     # ── Send streaming indicator ──
     indicator_ts = None
     try:
-        indicator_msg = client.chat_postMessage(
+        indicator_msg = await client.chat_postMessage(
             channel=channel,
             text="💭 답변 생성 중...",
             thread_ts=thread_ts,
@@ -124,7 +122,7 @@ def _process_question(event, say, client, thread_ts=None):
     # Streaming callback — updates Slack message with partial answer
     _last_update: dict = {"t": 0.0}
 
-    def _on_streaming_chunk(text_so_far: str):
+    async def _on_streaming_chunk(text_so_far: str):
         now = time.time()
         if now - _last_update["t"] < 2.5:  # throttle: max 1 update / 2.5s
             return
@@ -132,7 +130,7 @@ def _process_question(event, say, client, thread_ts=None):
         if not indicator_ts:
             return
         try:
-            client.chat_update(
+            await client.chat_update(
                 channel=channel,
                 ts=indicator_ts,
                 text=text_so_far + " ▌",
@@ -141,57 +139,58 @@ def _process_question(event, say, client, thread_ts=None):
             pass
 
     # ── Generate answer via AI (streaming) ──
+    # Runs on the server loop, sharing its checkpointer pool and DB engine
     try:
-        result = asyncio.run(
-            generate_answer_streaming(
-                question=text,
-                workspace_id=str(workspace_id),
-                asker_id=user_id,
-                rules=rules,
-                on_chunk=_on_streaming_chunk,
-            )
+        result = await generate_answer_streaming(
+            question=text,
+            workspace_id=workspace_id,
+            asker_id=user_id,
+            rules=rules,
+            on_chunk=_on_streaming_chunk,
+            screening=screening,
+            workspace=workspace,
         )
     except Exception:
         logger.exception("AI generate_answer failed")
         if indicator_ts:
             try:
-                client.chat_update(
+                await client.chat_update(
                     channel=channel, ts=indicator_ts, text=FALLBACK_RESPONSE,
                 )
             except Exception:
-                say(text=FALLBACK_RESPONSE, channel=channel, thread_ts=thread_ts)
+                await say(text=FALLBACK_RESPONSE, channel=channel, thread_ts=thread_ts)
         else:
-            say(text=FALLBACK_RESPONSE, channel=channel, thread_ts=thread_ts)
+            await say(text=FALLBACK_RESPONSE, channel=channel, thread_ts=thread_ts)
         return
 
     if result.is_prohibited:
         if indicator_ts:
             try:
-                client.chat_update(
+                await client.chat_update(
                     channel=channel, ts=indicator_ts, text=PROHIBITED_RESPONSE,
                 )
             except Exception:
-                say(text=PROHIBITED_RESPONSE, channel=channel, thread_ts=thread_ts)
+                await say(text=PROHIBITED_RESPONSE, channel=channel, thread_ts=thread_ts)
         else:
-            say(text=PROHIBITED_RESPONSE, channel=channel, thread_ts=thread_ts)
+            await say(text=PROHIBITED_RESPONSE, channel=channel, thread_ts=thread_ts)
         return
 
-    risk_check = detect_high_risk_keywords(text)
-    is_high_risk = result.is_high_risk or risk_check["is_high_risk"]
+    is_high_risk = result.is_high_risk or screening.is_high_risk
 
     # Persist
     qa_id = ""
     try:
-        with get_db() as db:
-            record = create_qa_record(
+        async with get_async_db() as db:
+            record = await acreate_qa_record(
                 db,
-                workspace_id=workspace_id,
+                workspace_id=uuid.UUID(workspace_id),
                 asker_user_id=user_id,
                 question=text,
                 answer=result.answer,
                 message_ts=message_ts,
                 channel_id=channel,
                 is_high_risk=is_high_risk,
+                question_embedding=result.question_embedding,
             )
             qa_id = str(record.id)
     except Exception:
@@ -207,7 +206,7 @@ def _process_question(event, say, client, thread_ts=None):
 
     if indicator_ts:
         try:
-            client.chat_update(
+            await client.chat_update(
                 channel=channel,
                 ts=indicator_ts,
                 blocks=blocks,
@@ -216,17 +215,17 @@ def _process_question(event, say, client, thread_ts=None):
         except Exception:
             logger.exception("Failed to update streaming message with final answer")
             try:
-                client.chat_update(
+                await client.chat_update(
                     channel=channel, ts=indicator_ts, text=result.answer,
                 )
             except Exception:
                 pass
     else:
         try:
-            say(blocks=blocks, text=result.answer, channel=channel, thread_ts=thread_ts)
+            await say(blocks=blocks, text=result.answer, channel=channel, thread_ts=thread_ts)
         except Exception:
             logger.exception("Failed to send response")
             try:
-                say(text=result.answer, channel=channel, thread_ts=thread_ts)
+                await say(text=result.answer, channel=channel, thread_ts=thread_ts)
             except Exception:
                 pass
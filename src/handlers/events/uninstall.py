@@ -1,10 +1,12 @@
 """Handler for app_uninstalled event — marks workspace inactive."""
 
+import asyncio
 import logging
 from datetime import datetime, timedelta, timezone
 
 from src.services.db.connection import get_db
 from src.services.db.workspaces import get_workspace_by_team_id, update_workspace
+from src.services.slack.installations import invalidate_installation
 
 logger = logging.getLogger(__name__)
 
@@ -15,7 +17,7 @@ def register(app):
     """Register the app_uninstalled event handler."""
 
     @app.event("app_uninstalled")
-    def handle_app_uninstalled(event, context):
+    async def handle_app_uninstalled(event, context):
         team_id = context.get("team_id", "")
         logger.info("App uninstalled for team %s", team_id)
 
@@ -26,20 +28,10 @@ def register(app):
         deletion_date = now + timedelta(days=DATA_RETENTION_DAYS)
 
         try:
-            with get_db() as db:
-                workspace = get_workspace_by_team_id(db, team_id)
-                if workspace is None:
-                    logger.warning("Workspace not found for uninstall event: %s", team_id)
-                    return
-
-                update_workspace(
-                    db,
-                    workspace.id,
-                    bot_token="REVOKED",
-                    user_token="",
-                    uninstalled_at=now,
-                    data_deletion_at=deletion_date,
-                )
+            found = await asyncio.to_thread(_mark_uninstalled, team_id, now, deletion_date)
+            if not found:
+                logger.warning("Workspace not found for uninstall event: %s", team_id)
+                return
 
             logger.info(
                 "Workspace %s marked as uninstalled. Data deletion scheduled for %s",
@@ -48,3 +40,23 @@ def register(app):
             )
         except Exception:
             logger.exception("Failed to handle app_uninstalled for team %s", team_id)
+
+
+def _mark_uninstalled(team_id: str, now: datetime, deletion_date: datetime) -> bool:
+    """Revoke the workspace's tokens and schedule data deletion. False if unknown."""
+    with get_db() as db:
+        workspace = get_workspace_by_team_id(db, team_id)
+        if workspace is None:
+            return False
+
+        update_workspace(
+            db,
+            workspace.id,
+            bot_token="REVOKED",
+            user_token="",
+            uninstalled_at=now,
+            data_deletion_at=deletion_date,
+        )
+
+    invalidate_installation(team_id)
+    return True
@@ -6,6 +6,7 @@ import logging
 import uuid as uuid_mod
 
 from src.services.ai import process_feedback
+from src.services.ai.answer_cache import invalidate_answer_cache
 from src.services.db import get_db
 from src.services.db.qa_history import update_feedback
 from src.utils.blocks import build_feedback_notification
@@ -17,8 +18,8 @@ def register(app):
     """Register the edit answer modal submission handler."""
 
     @app.view("edit_answer_submit")
-    def handle_edit_answer_submit(ack, body, client, view):
-        ack()
+    async def handle_edit_answer_submit(ack, body, client, view):
+        await ack()
 
         # Extract corrected answer from modal input
         values = view["state"]["values"]
@@ -45,20 +46,17 @@ def register(app):
         # Persist feedback to DB
         try:
             qa_uuid = uuid_mod.UUID(qa_id)
-            with get_db() as db:
-                update_feedback(db, qa_uuid, "corrected", corrected_answer)
+            await asyncio.to_thread(_record_correction, qa_uuid, corrected_answer)
         except (ValueError, Exception):
             logger.warning("Could not update feedback in DB", extra={"qa_id": qa_id})
 
         # Call AI feedback pipeline
         try:
-            asyncio.run(
-                process_feedback(
-                    workspace_id=workspace_id,
-                    question_id=qa_id,
-                    feedback_type="corrected",
-                    corrected_answer=corrected_answer,
-                )
+            await process_feedback(
+                workspace_id=workspace_id,
+                question_id=qa_id,
+                feedback_type="corrected",
+                corrected_answer=corrected_answer,
             )
         except Exception:
             logger.exception("AI process_feedback failed", extra={"qa_id": qa_id})
@@ -66,7 +64,7 @@ def register(app):
         # Update the decision-maker's review message to show edit was applied
         if channel_id and message_ts:
             try:
-                result = client.conversations_history(
+                result = await client.conversations_history(
                     channel=channel_id,
                     latest=message_ts,
                     inclusive=True,
@@ -82,7 +80,7 @@ def register(app):
                     "elements": [{"type": "mrkdwn", "text": "*피드백 완료:* ✏️ 직접 수정"}],
                 })
 
-                client.chat_update(
+                await client.chat_update(
                     channel=channel_id,
                     ts=message_ts,
                     blocks=updated_blocks,
@@ -95,12 +93,20 @@ def register(app):
         if asker_id:
             blocks = build_feedback_notification("corrected", corrected_answer)
             try:
-                dm = client.conversations_open(users=[asker_id])
+                dm = await client.conversations_open(users=[asker_id])
                 dm_channel = dm["channel"]["id"]
-                client.chat_postMessage(
+                await client.chat_postMessage(
                     channel=dm_channel,
                     blocks=blocks,
                     text="✅ 내용을 수정하여 전달했습니다.",
                 )
             except Exception:
                 logger.exception("Failed to notify employee of edit")
+
+
+def _record_correction(qa_uuid: uuid_mod.UUID, corrected_answer: str) -> None:
+    with get_db() as db:
+        record = update_feedback(db, qa_uuid, "corrected", corrected_answer)
+        if record is not None:
+            # Answers cached from the wrong reasoning must not be reused
+            invalidate_answer_cache(str(record.workspace_id))
@@ -1,10 +1,12 @@
 """Onboarding modal submission handler — validates consent, updates workspace, starts ingestion."""
 
+import asyncio
 import json
 import logging
 
 from src.services.db.connection import get_db
 from src.services.db.workspaces import get_workspace_by_team_id, update_workspace
+from src.services.workspace_context import invalidate_workspace_context
 from src.tasks.ingestion import ingest_workspace_task
 
 logger = logging.getLogger(__name__)
@@ -14,7 +16,7 @@ def register(app):
     """Register the onboarding modal submission handler."""
 
     @app.view("onboarding_submit")
-    def handle_onboarding_submit(ack, body, client, view):
+    async def handle_onboarding_submit(ack, body, client, view):
         values = view["state"]["values"]
         user_id = body["user"]["id"]
         team_id = body["user"].get("team_id")
@@ -34,7 +36,7 @@ def register(app):
 
         # Validate consent
         if not consent:
-            ack(
+            await ack(
                 response_action="errors",
                 errors={"consent_block": "학습을 시작하려면 동의가 필요합니다."},
             )
@@ -42,27 +44,20 @@ def register(app):
 
         # Validate channels
         if not channels:
-            ack(
+            await ack(
                 response_action="errors",
                 errors={"channel_select_block": "최소 1개의 채널을 선택해 주세요."},
             )
             return
 
-        ack()
+        await ack()
 
         # Update decision-maker if changed
         if team_id and decision_maker_id:
-            with get_db() as db:
-                workspace = get_workspace_by_team_id(db, team_id)
-                if workspace and workspace.decision_maker_id != decision_maker_id:
-                    update_workspace(db, workspace.id, decision_maker_id=decision_maker_id)
-                    logger.info(
-                        "Decision-maker changed to %s for team %s",
-                        decision_maker_id, team_id,
-                    )
+            await asyncio.to_thread(_update_decision_maker, team_id, decision_maker_id)
 
-        # Queue ingestion with selected channels
-        ingest_workspace_task.delay(team_id, channel_ids=channels)
+        # Queue ingestion with selected channels (blocking broker publish)
+        await asyncio.to_thread(ingest_workspace_task.delay, team_id, channel_ids=channels)
         logger.info(
             "Queued ingestion for team %s: %d channels, decision_maker=%s",
             team_id, len(channels), decision_maker_id,
@@ -70,9 +65,9 @@ def register(app):
 
         # Notify the user that ingestion has started
         try:
-            dm = client.conversations_open(users=[user_id])
+            dm = await client.conversations_open(users=[user_id])
             channel_id = dm["channel"]["id"]
-            client.chat_postMessage(
+            await client.chat_postMessage(
                 channel=channel_id,
                 text=(
                     f"학습을 시작합니다!\n\n"
@@ -84,3 +79,15 @@ def register(app):
             )
         except Exception:
             logger.exception("Failed to send ingestion start DM")
+
+
+def _update_decision_maker(team_id: str, decision_maker_id: str) -> None:
+    with get_db() as db:
+        workspace = get_workspace_by_team_id(db, team_id)
+        if workspace and workspace.decision_maker_id != decision_maker_id:
+            update_workspace(db, workspace.id, decision_maker_id=decision_maker_id)
+            invalidate_workspace_context(str(workspace.id))
+            logger.info(
+                "Decision-maker changed to %s for team %s",
+                decision_maker_id, team_id,
+            )
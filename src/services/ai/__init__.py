@@ -11,15 +11,39 @@ for vector similarity search against the existing ``embeddings`` table.
 """
 
 import logging
+import threading
+import time
 from dataclasses import dataclass
 from typing import Optional
 
-from langchain_core.messages import HumanMessage
-
-from src.services.ai.graph import get_compiled_graph
-from src.services.ai.memory import get_checkpointer
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.services.ai.answer_cache import (
+    ainvalidate_answer_cache,
+    record_answer_latency,
+)
+from src.services.ai.checkpoint_gc import register_thread_turn
+from src.services.ai.graph import clear_compiled_graphs, get_compiled_graph
+from src.services.ai.llm import close_llm_clients
+from src.services.ai.memory import (
+    close_checkpointer,
+    drain_background_tasks,
+    get_checkpointer,
+    open_checkpointer,
+    run_in_background,
+    schedule_summary_update,
+    thread_turn_lock,
+    track_checkpoint_writes,
+)
+from src.services.ai.nodes import REFUSAL_ANSWER, rule_answer
+from src.services.ai.rate_limit import BULK, llm_priority
 from src.services.ai.state import streaming_callback
-from src.services.ai.vector_store import search_similar, store_embeddings
+from src.services.ai.vector_store import astore_embeddings
+from src.services.workspace_context import (
+    WorkspaceContext,
+    get_workspace_context_by_id,
+)
+from src.utils.question_matcher import QuestionMatch, scan_question
 
 logger = logging.getLogger(__name__)
 
@@ -32,6 +56,9 @@ class AnswerResult:
     is_high_risk: bool
     is_prohibited: bool
     sources_used: int
+    is_cached: bool = False
+    # Set when the answer is a new semantic-cache entry (store it in qa_history)
+    question_embedding: Optional[list[float]] = None
 
 
 @dataclass
@@ -40,38 +67,176 @@ class IngestResult:
     embeddings_stored: int
 
 
+# ── Process lifecycle ────────────────────────────────────────────────
+
+async def warm_up() -> None:
+    """Open the checkpointer pool and compile the graph before the first question.
+
+    Called once at process startup so the first DM does not pay for pool
+    creation, ``AsyncPostgresSaver.setup()`` or graph compilation.
+    """
+    checkpointer = await open_checkpointer()
+    get_compiled_graph(checkpointer=checkpointer)
+    logger.info("AI pipeline warmed up")
+
+
+async def shut_down() -> None:
+    """Release process-lifetime resources opened by ``warm_up``."""
+    await drain_background_tasks()
+    clear_compiled_graphs()
+    await close_checkpointer()
+    await close_llm_clients()
+
+
 # ── 1. generate_answer ────────────────────────────────────────────────
 
+# Deterministic outcomes (rule match, prohibited topic) answered without
+# touching the checkpointer pool or the graph
+_fast_path_stats = {"rule_matched": 0, "prohibited": 0}
+_fast_path_lock = threading.Lock()
+
+
+def get_fast_path_stats() -> dict:
+    """Questions answered on the fast path, by outcome."""
+    with _fast_path_lock:
+        return dict(_fast_path_stats)
+
+
+def _fast_path_answer(screening: QuestionMatch) -> Optional[AnswerResult]:
+    """Answer rule-matched / prohibited questions directly (graph order: rules first)."""
+    if screening.rule_text:
+        outcome = "rule_matched"
+        result = AnswerResult(
+            answer=rule_answer(screening.rule_text),
+            is_high_risk=screening.is_high_risk and not screening.is_prohibited,
+            is_prohibited=False,
+            sources_used=0,
+        )
+    elif screening.is_prohibited:
+        outcome = "prohibited"
+        result = AnswerResult(
+            answer=REFUSAL_ANSWER, is_high_risk=False, is_prohibited=True, sources_used=0,
+        )
+    else:
+        return None
+
+    with _fast_path_lock:
+        _fast_path_stats[outcome] += 1
+    return result
+
+
+async def _append_exchange(
+    config: dict, workspace_id: str, asker_id: str, question: str, answer: str,
+) -> None:
+    """Record a fast-path Q&A in the thread so conversation memory sees it.
+
+    Runs in the background, ordered with the thread's graph runs by the
+    turn lock, and then folds the overflow into the summary like a turn.
+    Skipped if the thread cannot be registered (see ``checkpoint_gc``).
+    """
+    thread_id = config["configurable"]["thread_id"]
+    try:
+        await register_thread_turn(thread_id, workspace_id, asker_id)
+    except Exception:
+        logger.exception("Failed to register thread %s; exchange not recorded", thread_id)
+        return
+    checkpointer = await get_checkpointer()
+    graph = get_compiled_graph(checkpointer=checkpointer)
+    async with thread_turn_lock(thread_id):
+        await graph.aupdate_state(
+            config,
+            {
+                "workspace_id": workspace_id,
+                "messages": [HumanMessage(content=question), AIMessage(content=answer)],
+                "last_turn_at": time.time(),
+            },
+            as_node="generate",
+        )
+    schedule_summary_update(graph, config)
+
+
 async def generate_answer(
     question: str,
     workspace_id: str,
     asker_id: str,
     rules: list[dict],
+    screening: Optional[QuestionMatch] = None,
+    workspace: Optional[WorkspaceContext] = None,
 ) -> AnswerResult:
     """Generate an answer using the RAG pipeline with conversation memory.
 
     Memory management (3-layer hybrid):
-      - AsyncPostgresSaver persists full state per thread_id
-      - trim_and_summarize (in generate node) compresses old messages
+      - AsyncPostgresSaver persists full state per thread_id (one shared
+        pool per process, see ``memory.get_checkpointer``)
+      - roll_summary folds older turns into ``summary`` in a background
+        task after the turn (off the answer's critical path)
       - Sliding window keeps the last 2 Q&A pairs verbatim
 
     Thread ID strategy: ``{workspace_id}:{asker_id}`` — one thread per user
     per workspace, so conversation context is maintained across DMs.
+
+    ``screening`` is the caller's ``scan_question`` result, if it already
+    screened the question; the graph then reuses it instead of re-scanning.
+    ``workspace`` is the caller's ``WorkspaceContext`` snapshot; when omitted
+    it is fetched (cached) here, so nodes only ever read it from state.
+
+    Rule-matched and prohibited questions are answered before the pool or
+    graph is touched; the exchange is appended to the thread in the
+    background.
     """
     thread_id = f"{workspace_id}:{asker_id}"
     config = {"configurable": {"thread_id": thread_id}}
 
+    if screening is None:
+        screening = scan_question(workspace_id, rules, question)
+    fast = _fast_path_answer(screening)
+    if fast is not None:
+        run_in_background(
+            _append_exchange(config, workspace_id, asker_id, question, fast.answer)
+        )
+        return fast
+
+    if workspace is None:
+        try:
+            workspace = await get_workspace_context_by_id(workspace_id)
+        except Exception:
+            logger.exception("Workspace context lookup failed for %s", workspace_id)
+
+    # Per-turn fields are reset explicitly: the checkpointer restores the
+    # previous turn's state, and nodes that are skipped this turn (e.g.
+    # check_safety after a rule match) would otherwise leak stale flags.
     inputs = {
         "question": question,
         "workspace_id": workspace_id,
         "rules": rules,
+        "persona": workspace.persona if workspace else "",
+        "decision_maker_name": workspace.decision_maker_name if workspace else "",
         "messages": [HumanMessage(content=question)],
+        "answer": "",
+        "retrieved": None,  # resets the merge reducer
+        "context": [],
+        "sources_used": 0,
+        "question_embedding": [],
+        "is_cache_hit": False,
+        "is_safe": False,
+        "is_high_risk": False,
+        "is_prohibited": False,
+        "is_rule_matched": False,
+        "matched_rule": "",
+        "safety_checked": False,
+        **screening.as_state(),
     }
 
+    start = time.perf_counter()
     try:
-        async with get_checkpointer() as checkpointer:
-            graph = get_compiled_graph(checkpointer=checkpointer)
-            result = await graph.ainvoke(inputs, config=config)
+        # Before the turn's checkpoint: GC finds threads through the registry
+        await register_thread_turn(thread_id, workspace_id, asker_id)
+        checkpointer = await get_checkpointer()
+        graph = get_compiled_graph(checkpointer=checkpointer)
+        # durability="exit": one checkpoint per question, not one per node
+        async with thread_turn_lock(thread_id):
+            with track_checkpoint_writes():
+                result = await graph.ainvoke(inputs, config=config, durability="exit")
     except Exception:
         logger.exception("RAG pipeline failed for workspace %s", workspace_id)
         return AnswerResult(
@@ -81,11 +246,24 @@ async def generate_answer(
             sources_used=0,
         )
 
+    # Fold the pair that left the window while the caller sends the answer
+    schedule_summary_update(graph, config)
+
+    is_cached = result.get("is_cache_hit", False)
+    question_embedding = result.get("question_embedding") or None
+    if is_cached or question_embedding:
+        # Only questions that reached the answer cache count towards its stats
+        record_answer_latency(
+            (time.perf_counter() - start) * 1000, cache_hit=is_cached,
+        )
+
     return AnswerResult(
-        answer=result.get("answer", "답변을 생성할 수 없습니다."),
+        answer=result.get("answer") or "답변을 생성할 수 없습니다.",
         is_high_risk=result.get("is_high_risk", False),
         is_prohibited=result.get("is_prohibited", False),
         sources_used=result.get("sources_used", 0),
+        is_cached=is_cached,
+        question_embedding=None if is_cached else question_embedding,
     )
 
 
@@ -95,15 +273,21 @@ async def generate_answer_streaming(
     asker_id: str,
     rules: list[dict],
     on_chunk: callable = None,
+    screening: Optional[QuestionMatch] = None,
+    workspace: Optional[WorkspaceContext] = None,
 ) -> AnswerResult:
     """Generate answer with streaming support.
 
     Wraps ``generate_answer`` but sets a context-local callback so that
     the ``generate`` node streams tokens via ``on_chunk(text_so_far)``.
+    ``on_chunk`` may be a coroutine function; it is awaited in that case.
     """
     token = streaming_callback.set(on_chunk)
     try:
-        return await generate_answer(question, workspace_id, asker_id, rules)
+        return await generate_answer(
+            question, workspace_id, asker_id, rules,
+            screening=screening, workspace=workspace,
+        )
     finally:
         streaming_callback.reset(token)
 
@@ -162,13 +346,18 @@ async def ingest_messages(
         return IngestResult(chunks_created=0, embeddings_stored=0)
 
     try:
-        stored = store_embeddings(workspace_id, chunks)
+        with llm_priority(BULK):
+            stored = await astore_embeddings(workspace_id, chunks)
     except Exception:
         logger.exception(
             "Failed to ingest messages for workspace %s", workspace_id
         )
         return IngestResult(chunks_created=len(chunks), embeddings_stored=0)
 
+    # New knowledge may change answers to questions asked before
+    if stored:
+        await ainvalidate_answer_cache(workspace_id)
+
     logger.info(
         "Ingested %d chunks (%d embeddings) for workspace %s",
         len(chunks),
@@ -189,12 +378,19 @@ async def process_feedback(
     """Reflect decision-maker feedback into the knowledge base.
 
     - approved:  no action needed (answer was correct)
-    - rejected:  no action needed (answer was wrong, but no correction given)
+    - rejected:  invalidate the answer cache (answer was wrong, but no
+                 correction given)
     - corrected: embed the corrected Q&A pair and store as a new embedding
     - caution:   no action needed (flagged for awareness)
 
     Only the ``corrected`` type adds new data to the knowledge base.
+    Rejected and corrected answers may have been served from the answer
+    cache, and the record carrying the feedback is then not the cache
+    entry itself, so the workspace's whole cache is invalidated.
     """
+    if feedback_type == "rejected":
+        await ainvalidate_answer_cache(workspace_id)
+
     if feedback_type != "corrected" or not corrected_answer:
         logger.info(
             "Feedback '%s' for question %s — no KB update needed",
@@ -215,7 +411,8 @@ async def process_feedback(
             "message_ts": question_id,
             "thread_ts": None,
         }
-        stored = store_embeddings(workspace_id, [chunk])
+        stored = await astore_embeddings(workspace_id, [chunk])
+        await ainvalidate_answer_cache(workspace_id)
         logger.info(
             "Feedback correction stored: question=%s, embeddings=%d",
             question_id,
@@ -0,0 +1,187 @@
+"""Semantic answer cache — reuse answers to questions already asked in a workspace.
+
+Teams ask the same things in different words.  Every RAG answer is stored in
+``qa_history`` together with the embedding of its question; before running
+retrieval + GPT-4o, the ``lookup_cache`` node looks for a previous question in
+the same workspace whose embedding is at least
+``settings.answer_cache_min_similarity`` similar and returns that answer.
+
+Invalidation is per workspace and timestamp-based: anything that changes what
+the right answer would be (new embeddings from ingestion, ``/slough-rule``
+changes, a rejected or corrected answer) calls ``invalidate_answer_cache``
+(``ainvalidate_answer_cache`` on the event loop), and lookups ignore entries created before the latest invalidation.  Entries
+also expire after ``settings.answer_cache_ttl_seconds``.  Answers served from
+the cache are stored without an embedding, so feedback on them never marks
+the entry itself — hence the invalidation.
+
+Follow-up questions (asked soon after the thread's previous turn) skip the
+cache entirely, see ``nodes.lookup_cache``.
+"""
+
+import logging
+import threading
+import time
+import uuid as uuid_mod
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import text as sa_text
+
+from src.config import settings
+from src.services.db.connection import get_async_db
+from src.services.redis_client import RedisManager
+
+logger = logging.getLogger(__name__)
+
+_RESET_KEY = "answer_cache:reset:{workspace_id}"
+
+
+@dataclass
+class CachedAnswer:
+    qa_id: str
+    answer: str
+    similarity: float
+    is_high_risk: bool
+
+
+# ── Invalidation ─────────────────────────────────────────────────────
+
+def invalidate_answer_cache(workspace_id: str) -> None:
+    """Invalidate all cached answers for a workspace (best-effort)."""
+    try:
+        cache = RedisManager.get_cache()
+        cache.set(
+            _RESET_KEY.format(workspace_id=workspace_id),
+            str(time.time()),
+            ex=settings.answer_cache_ttl_seconds,
+        )
+        logger.info("Answer cache invalidated for workspace %s", workspace_id)
+    except Exception:
+        logger.exception("Failed to invalidate answer cache for workspace %s", workspace_id)
+
+
+async def ainvalidate_answer_cache(workspace_id: str) -> None:
+    """Async ``invalidate_answer_cache`` on the async Redis client."""
+    try:
+        await RedisManager.get_async_cache().set(
+            _RESET_KEY.format(workspace_id=workspace_id),
+            str(time.time()),
+            ex=settings.answer_cache_ttl_seconds,
+        )
+        logger.info("Answer cache invalidated for workspace %s", workspace_id)
+    except Exception:
+        logger.exception("Failed to invalidate answer cache for workspace %s", workspace_id)
+
+
+async def _valid_from(workspace_id: str) -> datetime:
+    """Oldest ``created_at`` a cache entry may have to still be served."""
+    # qa_history.created_at is a naive UTC timestamp (server default NOW())
+    valid_from = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(
+        seconds=settings.answer_cache_ttl_seconds
+    )
+    reset_at = await RedisManager.get_async_cache().get(
+        _RESET_KEY.format(workspace_id=workspace_id)
+    )
+    if reset_at:
+        reset_dt = datetime.fromtimestamp(float(reset_at), tz=timezone.utc).replace(tzinfo=None)
+        valid_from = max(valid_from, reset_dt)
+    return valid_from
+
+
+# ── Lookup ───────────────────────────────────────────────────────────
+
+_LOOKUP_SQL = sa_text("""
+    SELECT id, answer, 1 - (question_embedding <=> :query_vec) AS similarity, is_high_risk
+    FROM qa_history
+    WHERE workspace_id = :ws_id
+      AND question_embedding IS NOT NULL
+      AND created_at > :valid_from
+      AND (feedback_type IS NULL OR feedback_type IN ('approved', 'caution'))
+    ORDER BY question_embedding <=> :query_vec
+    LIMIT 1
+""")
+
+
+async def lookup_cached_answer(
+    workspace_id: str,
+    question_embedding: list[float],
+) -> Optional[CachedAnswer]:
+    """Return the best cached answer above the similarity threshold, if any."""
+    if not settings.answer_cache_enabled or not workspace_id:
+        return None
+
+    try:
+        valid_from = await _valid_from(workspace_id)
+        async with get_async_db() as db:
+            row = (await db.execute(
+                _LOOKUP_SQL,
+                {
+                    "ws_id": uuid_mod.UUID(workspace_id),
+                    "query_vec": str(question_embedding),
+                    "valid_from": valid_from,
+                },
+            )).first()
+    except Exception:
+        logger.exception("Answer cache lookup failed for workspace %s", workspace_id)
+        return None
+
+    if row is None or row[2] < settings.answer_cache_min_similarity:
+        return None
+
+    return CachedAnswer(
+        qa_id=str(row[0]),
+        answer=row[1],
+        similarity=float(row[2]),
+        is_high_risk=bool(row[3]),
+    )
+
+
+# ── Stats ────────────────────────────────────────────────────────────
+
+_stats_lock = threading.Lock()
+_stats = {
+    "lookups": 0,
+    "hits": 0,
+    "saved_ms_total": 0.0,
+}
+_miss_latency_ewma_ms: float = 0.0
+_EWMA_ALPHA = 0.1
+
+
+def record_answer_latency(elapsed_ms: float, *, cache_hit: bool) -> None:
+    """Record end-to-end answer latency for hit-rate / saved-latency reporting.
+
+    Saved latency per hit is estimated as the moving average latency of
+    cache misses minus the latency of the hit itself.
+    """
+    global _miss_latency_ewma_ms
+    with _stats_lock:
+        _stats["lookups"] += 1
+        if cache_hit:
+            _stats["hits"] += 1
+            _stats["saved_ms_total"] += max(_miss_latency_ewma_ms - elapsed_ms, 0.0)
+        elif _miss_latency_ewma_ms == 0.0:
+            _miss_latency_ewma_ms = elapsed_ms
+        else:
+            _miss_latency_ewma_ms += _EWMA_ALPHA * (elapsed_ms - _miss_latency_ewma_ms)
+        lookups, hits = _stats["lookups"], _stats["hits"]
+
+    if cache_hit:
+        logger.info(
+            "Answer cache hit in %.0f ms (hit rate %.1f%%, %d/%d)",
+            elapsed_ms, 100.0 * hits / lookups, hits, lookups,
+        )
+
+
+def get_answer_cache_stats() -> dict:
+    """Return hit rate and estimated latency saved by the answer cache."""
+    with _stats_lock:
+        lookups, hits = _stats["lookups"], _stats["hits"]
+        return {
+            "lookups": lookups,
+            "hits": hits,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "saved_ms_total": round(_stats["saved_ms_total"], 1),
+            "avg_miss_ms": round(_miss_latency_ewma_ms, 1),
+        }
@@ -0,0 +1,243 @@
+"""Checkpoint compaction and idle-thread GC.
+
+LangGraph keeps every checkpoint version of a thread, so ``checkpoints``,
+``checkpoint_writes`` and ``checkpoint_blobs`` grow with every turn.  The
+``compact_checkpoints`` beat task (see ``src/tasks/checkpoint_gc.py``)
+calls two jobs here:
+
+  - ``compact_threads``: for threads that were active since their last
+    compaction, fold any window overflow into the summary, then delete
+    every checkpoint version except the latest one (plus the writes and
+    channel blobs only older versions referenced).
+  - ``purge_idle_threads``: delete threads idle for longer than
+    ``settings.checkpoint_thread_ttl_days``.
+
+Threads are found through the ``conversation_threads`` registry (migration
+009), which every turn updates before writing (``register_thread_turn``),
+and rows are deleted by exact ``thread_id``, in small batches.  Resetting a
+workspace (``clear_workspace_threads``) does not rely on the registry: it
+takes the thread ids from a primary-key range on the ``{workspace_id}:``
+prefix.
+"""
+
+import logging
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Don't compact threads with a turn possibly in flight: a running turn
+# writes channel blobs before the checkpoint row that references them.
+_COMPACT_MIN_IDLE = timedelta(minutes=5)
+_MAX_BATCHES_PER_RUN = 50
+
+_PRUNE_OLD_VERSIONS = (
+    # Keep the newest checkpoint per namespace
+    """
+    DELETE FROM checkpoints c
+    WHERE c.thread_id = :thread_id
+      AND c.checkpoint_id <> (
+          SELECT max(l.checkpoint_id) FROM checkpoints l
+          WHERE l.thread_id = c.thread_id AND l.checkpoint_ns = c.checkpoint_ns
+      )
+    """,
+    # Pending writes of deleted checkpoints
+    """
+    DELETE FROM checkpoint_writes w
+    WHERE w.thread_id = :thread_id
+      AND NOT EXISTS (
+          SELECT 1 FROM checkpoints c
+          WHERE c.thread_id = w.thread_id
+            AND c.checkpoint_ns = w.checkpoint_ns
+            AND c.checkpoint_id = w.checkpoint_id
+      )
+    """,
+    # Channel values no remaining checkpoint points to
+    """
+    DELETE FROM checkpoint_blobs b
+    WHERE b.thread_id = :thread_id
+      AND NOT EXISTS (
+          SELECT 1 FROM checkpoints c
+          WHERE c.thread_id = b.thread_id
+            AND c.checkpoint_ns = b.checkpoint_ns
+            AND c.checkpoint -> 'channel_versions' ->> b.channel = b.version
+      )
+    """,
+)
+
+# Range scans on the (thread_id, ...) primary keys, rechecked exactly
+_WORKSPACE_THREADS_SQL = """
+    SELECT thread_id FROM (
+        SELECT DISTINCT thread_id FROM checkpoints
+        WHERE thread_id >= :low AND thread_id < :high
+        UNION
+        SELECT DISTINCT thread_id FROM checkpoint_blobs
+        WHERE thread_id >= :low AND thread_id < :high
+        UNION
+        SELECT DISTINCT thread_id FROM checkpoint_writes
+        WHERE thread_id >= :low AND thread_id < :high
+    ) t
+    WHERE left(thread_id, :prefix_len) = :prefix
+    LIMIT :limit
+"""
+
+
+# ── Thread registry ──────────────────────────────────────────────────
+
+async def register_thread_turn(
+    thread_id: str, workspace_id: str, asker_id: str,
+) -> None:
+    """Register the thread / bump its last activity before a turn writes.
+
+    Awaited before every checkpoint write of a turn, so no thread has
+    checkpoints without a registry row.  Raises if the upsert fails: the
+    caller then skips the turn's write instead of leaving a thread GC can't
+    find.
+    """
+    from src.services.db.connection import get_async_db
+    from src.services.db.threads import atouch_thread
+
+    async with get_async_db() as db:
+        await atouch_thread(db, thread_id, uuid.UUID(workspace_id), asker_id)
+
+
+# ── Deletion helpers ─────────────────────────────────────────────────
+
+def delete_thread_checkpoints(db, thread_ids: list[str]) -> int:
+    """Delete all checkpoint rows of the given threads (exact thread_id match).
+
+    Also drops their copies in the Redis hot tier and tombstones them, so
+    a write-behind still pending in the web process does not restore them
+    (see ``tiered_saver``).
+    """
+    from src.services.ai.tiered_saver import mark_threads_deleted
+
+    mark_threads_deleted(thread_ids)
+
+    deleted = 0
+    for table in ("checkpoint_writes", "checkpoint_blobs", "checkpoints"):
+        result = db.execute(
+            text(f"DELETE FROM {table} WHERE thread_id = ANY(:thread_ids)"),
+            {"thread_ids": thread_ids},
+        )
+        deleted += result.rowcount
+    return deleted
+
+
+def _prune_old_versions(db, thread_id: str) -> int:
+    deleted = 0
+    for statement in _PRUNE_OLD_VERSIONS:
+        deleted += db.execute(text(statement), {"thread_id": thread_id}).rowcount
+    return deleted
+
+
+def _workspace_thread_ids(db, workspace_id: str, limit: int) -> list[str]:
+    # Thread ids are "{workspace_id}:{asker_id}".  The bounds differ only in
+    # the last hex digit of the UUID, so the range holds under any collation
+    # (punctuation may be ignored by linguistic ones); left() makes it exact.
+    last = workspace_id[-1]
+    high = workspace_id[:-1] + ("a" if last == "9" else chr(ord(last) + 1))
+    prefix = f"{workspace_id}:"
+    return list(db.execute(text(_WORKSPACE_THREADS_SQL), {
+        "low": workspace_id, "high": high,
+        "prefix": prefix, "prefix_len": len(prefix), "limit": limit,
+    }).scalars().all())
+
+
+def clear_workspace_threads(workspace_id: str) -> int:
+    """Delete every checkpoint thread of a workspace; returns rows deleted.
+
+    Threads are found in the checkpoint tables themselves (an index range
+    scan on their primary keys), so a thread missing from the registry is
+    deleted too.
+    """
+    from src.services.db.connection import get_db
+    from src.services.db.threads import delete_threads, delete_workspace_threads
+
+    batch_size = settings.checkpoint_gc_batch_size
+    deleted = 0
+    while True:
+        with get_db() as db:
+            thread_ids = _workspace_thread_ids(db, workspace_id, batch_size)
+            if not thread_ids:
+                break
+            deleted += delete_thread_checkpoints(db, thread_ids)
+            delete_threads(db, thread_ids)
+    with get_db() as db:
+        delete_workspace_threads(db, uuid.UUID(workspace_id))
+    return deleted
+
+
+# ── Jobs ─────────────────────────────────────────────────────────────
+
+async def _fold_summary(thread_id: str) -> None:
+    from src.services.ai.graph import get_compiled_graph
+    from src.services.ai.memory import flush_checkpoints, get_checkpointer, update_summary
+
+    graph = get_compiled_graph(checkpointer=await get_checkpointer())
+    await update_summary(graph, {"configurable": {"thread_id": thread_id}})
+    # The fold lands in the Redis hot tier; prune runs against Postgres
+    await flush_checkpoints(thread_id)
+
+
+def compact_threads() -> dict:
+    """Trim recently active threads to summary + window and their latest checkpoint."""
+    from src.services.db.connection import get_db
+    from src.services.db.threads import get_threads_to_compact, mark_threads_compacted
+    from src.utils.aio import run_sync
+
+    batch_size = settings.checkpoint_gc_batch_size
+    threads = rows = 0
+    for _ in range(_MAX_BATCHES_PER_RUN):
+        with get_db() as db:
+            thread_ids = get_threads_to_compact(
+                db, datetime.utcnow() - _COMPACT_MIN_IDLE, batch_size,
+            )
+        if not thread_ids:
+            break
+
+        for thread_id in thread_ids:
+            try:
+                # Normally a no-op: the post-turn fold has already run
+                run_sync(_fold_summary(thread_id))
+            except Exception:
+                logger.exception("Summary fold failed for thread %s", thread_id)
+            with get_db() as db:
+                rows += _prune_old_versions(db, thread_id)
+
+        with get_db() as db:
+            mark_threads_compacted(db, thread_ids)
+        threads += len(thread_ids)
+        if len(thread_ids) < batch_size:
+            break
+
+    logger.info("Compacted %d threads, deleted %d checkpoint rows", threads, rows)
+    return {"threads": threads, "rows_deleted": rows}
+
+
+def purge_idle_threads() -> dict:
+    """Delete threads idle for more than ``checkpoint_thread_ttl_days``."""
+    from src.services.db.connection import get_db
+    from src.services.db.threads import delete_threads, get_idle_thread_ids
+
+    cutoff = datetime.utcnow() - timedelta(days=settings.checkpoint_thread_ttl_days)
+    batch_size = settings.checkpoint_gc_batch_size
+    threads = rows = 0
+    for _ in range(_MAX_BATCHES_PER_RUN):
+        # One short transaction per batch, so GC never holds long locks
+        with get_db() as db:
+            thread_ids = get_idle_thread_ids(db, cutoff, batch_size)
+            if not thread_ids:
+                break
+            rows += delete_thread_checkpoints(db, thread_ids)
+            delete_threads(db, thread_ids)
+        threads += len(thread_ids)
+        if len(thread_ids) < batch_size:
+            break
+
+    logger.info("Purged %d idle threads (%d checkpoint rows)", threads, rows)
+    return {"threads": threads, "rows_deleted": rows}
@@ -0,0 +1,94 @@
+"""Compact checkpoint persistence for the RAG graph.
+
+``CompactPostgresSaver`` is the ``AsyncPostgresSaver`` used by
+``memory.open_checkpointer``.  Together with ``durability="exit"`` in
+``generate_answer`` (one checkpoint per invocation instead of one per
+node) it cuts checkpoint write amplification:
+
+  - Per-turn fields (``state.TRANSIENT_FIELDS`` — retrieved ``context``,
+    ``rules``, flags, ...) are dropped before a checkpoint is written;
+    every invocation sets them again from its inputs.
+  - Blobs and writes use ``CompressedSerializer``: LangGraph's msgpack
+    encoding, zlib-compressed above ``_COMPRESS_MIN_BYTES``.
+  - Rows and bytes written are counted per question (``memory.record_checkpoint_write``).
+
+Imported lazily (it pulls in psycopg), see ``memory._import_checkpoint_deps``.
+"""
+
+import zlib
+from typing import Any
+
+from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from src.services.ai.memory import record_checkpoint_write
+from src.services.ai.state import TRANSIENT_FIELDS
+
+_ZLIB_SUFFIX = "+zlib"
+_COMPRESS_MIN_BYTES = 512  # smaller payloads don't shrink enough to pay off
+_COMPRESS_LEVEL = 6
+
+
+class CompressedSerializer(JsonPlusSerializer):
+    """msgpack + zlib; reads uncompressed payloads written before it existed."""
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        type_, data = super().dumps_typed(obj)
+        if data and len(data) >= _COMPRESS_MIN_BYTES:
+            compressed = zlib.compress(data, _COMPRESS_LEVEL)
+            if len(compressed) < len(data):
+                return type_ + _ZLIB_SUFFIX, compressed
+        return type_, data
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_.endswith(_ZLIB_SUFFIX):
+            return super().loads_typed(
+                (type_[: -len(_ZLIB_SUFFIX)], zlib.decompress(payload)),
+            )
+        return super().loads_typed(data)
+
+
+def strip_transient(checkpoint: dict, new_versions: dict) -> tuple[dict, dict]:
+    """Return copies of ``checkpoint`` / ``new_versions`` without per-turn channels."""
+    stripped = checkpoint.copy()
+    stripped["channel_values"] = {
+        k: v for k, v in checkpoint["channel_values"].items()
+        if k not in TRANSIENT_FIELDS
+    }
+    versions = {k: v for k, v in new_versions.items() if k not in TRANSIENT_FIELDS}
+    return stripped, versions
+
+
+class CompactPostgresSaver(AsyncPostgresSaver):
+    """``AsyncPostgresSaver`` that persists only cross-turn state, compressed."""
+
+    def __init__(self, conn, pipe=None, serde=None) -> None:
+        super().__init__(conn, pipe=pipe, serde=serde or CompressedSerializer())
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        checkpoint, new_versions = strip_transient(checkpoint, new_versions)
+        record_checkpoint_write(rows=1, nbytes=0)
+        return await super().aput(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        writes = [(ch, v) for ch, v in writes if ch not in TRANSIENT_FIELDS]
+        if not writes:
+            return
+        await super().aput_writes(config, writes, task_id, task_path)
+
+    def _dump_blobs(self, thread_id, checkpoint_ns, values, versions):
+        rows = super()._dump_blobs(thread_id, checkpoint_ns, values, versions)
+        record_checkpoint_write(
+            rows=len(rows), nbytes=sum(len(r[-1] or b"") for r in rows),
+        )
+        return rows
+
+    def _dump_writes(self, thread_id, checkpoint_ns, checkpoint_id, task_id, task_path, writes):
+        rows = super()._dump_writes(
+            thread_id, checkpoint_ns, checkpoint_id, task_id, task_path, writes,
+        )
+        record_checkpoint_write(
+            rows=len(rows), nbytes=sum(len(r[-1] or b"") for r in rows),
+        )
+        return rows
@@ -11,9 +11,8 @@ import logging
 import re
 from datetime import datetime, timezone
 
-from langchain_openai import ChatOpenAI
-
-from src.config import settings
+from src.services.ai.llm import get_chat_model
+from src.services.ai.rate_limit import BULK, llm_priority
 
 logger = logging.getLogger(__name__)
 
@@ -205,12 +204,7 @@ async def contextualize_messages(
 
     dm_name = user_names.get(decision_maker_id, decision_maker_id)
 
-    llm = ChatOpenAI(
-        model="gpt-4o-mini",
-        temperature=0.1,
-        max_tokens=4000,
-        api_key=settings.openai_api_key,
-    )
+    llm = get_chat_model("gpt-4o-mini", temperature=0.1, max_tokens=4000)
 
     all_results: list[dict] = []
     seen_verbatim: set[str] = set()  # dedup across overlapping windows
@@ -245,7 +239,8 @@ async def contextualize_messages(
         )
 
         try:
-            response = await llm.ainvoke([{"role": "user", "content": prompt}])
+            with llm_priority(BULK):
+                response = await llm.ainvoke([{"role": "user", "content": prompt}])
             output = response.content or ""
 
             blocks = _parse_blocks(output)
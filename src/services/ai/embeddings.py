@@ -1,33 +1,91 @@
-"""OpenAI embedding helpers — lazy-loaded singleton."""
+"""OpenAI embedding helpers on the shared client (see ``llm``).
 
+Query embeddings (``embed_text`` / ``embed_query_texts`` and their async
+variants) are memoized per normalized text; document embeddings for
+ingestion (``embed_texts``) are not, since each chunk is embedded once.
+
+Vectors come back at the stored length (``settings.embedding_dimensions``,
+see ``src.services.db.embedding_storage``).
+"""
+
+import base64
 import logging
-from typing import Optional
+from array import array
 
 from langchain_openai import OpenAIEmbeddings
 
-from src.config import settings
+from src.services.ai.llm import get_embedding_model
+from src.services.ai.memo import make_memo
+from src.services.db.embedding_storage import request_dimensions
 
 logger = logging.getLogger(__name__)
 
-_embeddings: Optional[OpenAIEmbeddings] = None
+_EMBEDDING_MODEL = "text-embedding-3-small"
+
+
+def _encode_vector(vector: list[float]) -> str:
+    """Pack a vector as base64 float32 (~8 KB vs ~20 KB of JSON for 1536 dims)."""
+    return base64.b64encode(array("f", vector).tobytes()).decode("ascii")
+
+
+def _decode_vector(raw: str) -> list[float]:
+    vector = array("f")
+    vector.frombytes(base64.b64decode(raw))
+    return vector.tolist()
+
+
+_query_memo = make_memo("query_embedding", encode=_encode_vector, decode=_decode_vector)
+
+
+def _memo_model() -> str:
+    # Memoized vectors of another length must not be served after a switch
+    dimensions = request_dimensions()
+    return f"{_EMBEDDING_MODEL}:{dimensions}" if dimensions else _EMBEDDING_MODEL
 
 
 def get_embeddings() -> OpenAIEmbeddings:
-    """Return a singleton ``OpenAIEmbeddings`` instance (text-embedding-3-small)."""
-    global _embeddings
-    if _embeddings is None:
-        _embeddings = OpenAIEmbeddings(
-            model="text-embedding-3-small",
-            api_key=settings.openai_api_key,
-        )
-    return _embeddings
+    """Return the shared ``OpenAIEmbeddings`` client (text-embedding-3-small)."""
+    return get_embedding_model(_EMBEDDING_MODEL, dimensions=request_dimensions())
 
 
 def embed_text(text: str) -> list[float]:
-    """Embed a single text string and return the 1536-dim vector."""
-    return get_embeddings().embed_query(text)
+    """Embed a single query string and return its vector (memoized)."""
+    return _query_memo.get_or_compute(
+        _memo_model(), text, lambda: get_embeddings().embed_query(text),
+    )
+
+
+def embed_query_texts(texts: list[str]) -> list[list[float]]:
+    """Embed several query strings; only memo misses go to the API, in one call."""
+    return _query_memo.get_or_compute_many(
+        _memo_model(), texts, get_embeddings().embed_documents,
+    )
 
 
 def embed_texts(texts: list[str]) -> list[list[float]]:
     """Embed multiple texts in a single API call (batched)."""
     return get_embeddings().embed_documents(texts)
+
+
+async def aembed_text(text: str) -> list[float]:
+    """Async ``embed_text`` — does not block the event loop."""
+    return await _query_memo.aget_or_compute(
+        _memo_model(), text, lambda: get_embeddings().aembed_query(text),
+    )
+
+
+async def aembed_query_texts(texts: list[str]) -> list[list[float]]:
+    """Async ``embed_query_texts`` — concurrent identical misses share one call."""
+    return await _query_memo.aget_or_compute_many(
+        _memo_model(), texts, get_embeddings().aembed_documents,
+    )
+
+
+async def aembed_texts(texts: list[str]) -> list[list[float]]:
+    """Async ``embed_texts`` — single batched API call, non-blocking."""
+    return await get_embeddings().aembed_documents(texts)
+
+
+def get_query_embedding_memo_stats() -> dict:
+    """Hit ratio and size of the query embedding memo."""
+    return _query_memo.stats()
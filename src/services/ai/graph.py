@@ -1,31 +1,58 @@
 """LangGraph StateGraph definition for the RAG pipeline.
 
 Flow:
-    check_rules ──┬── (rule matched) ──→ END
-                  └── (no rule)     ──→ check_safety ──┬── (safe)       ──→ retrieve → generate → END
-                                                       └── (prohibited) ──→ refuse   → END
+    check_rules ──┬── (rule matched)       ──→ END
+                  ├── (prohibited, screened) ──→ refuse → END
+                  └── (otherwise) ──┬──→ check_safety ───────────────┐
+                                    ├──→ lookup_cache ───────────────┤
+                                    ├──→ retrieve_original ──────────┼──→ merge_context ──┬── (prohibited) ──→ refuse   → END
+                                    └──→ retrieve_rewrites ──────────┘                    ├── (cache hit)  ──→ END
+                                                                                          └── (otherwise)  ──→ generate → END
+
+The four branches run concurrently, so the rewrite LLM call no longer
+delays the search of the original question.  Retrieval is speculative:
+merge_context discards it on a refusal or a cache hit.
+
+With ``settings.query_rewrite_mode == "adaptive"``, retrieve_rewrites
+follows retrieve_original instead of running beside it, and rewrites only
+if the original search came back weak.
 """
 
+import threading
+
 from langgraph.graph import END, StateGraph
 
+from src.config import settings
 from src.services.ai.nodes import (
     check_rules,
     check_safety,
     generate,
+    lookup_cache,
+    merge_context,
     refuse_answer,
-    retrieve,
+    retrieve_original,
+    retrieve_rewrites,
 )
 from src.services.ai.state import AgentState
 
+_BRANCHES = ["check_safety", "lookup_cache", "retrieve_original", "retrieve_rewrites"]
+
 
 def create_graph() -> StateGraph:
     """Build and return the (uncompiled) RAG workflow graph."""
     workflow = StateGraph(AgentState)
+    adaptive = settings.query_rewrite_mode == "adaptive"
+    # Branches started together after check_rules, and those merge_context waits for
+    branches = _BRANCHES[:3] if adaptive else _BRANCHES
+    joined = ["check_safety", "lookup_cache", "retrieve_rewrites"] if adaptive else _BRANCHES
 
     # 1. Add nodes
     workflow.add_node("check_rules", check_rules)
     workflow.add_node("check_safety", check_safety)
-    workflow.add_node("retrieve", retrieve)
+    workflow.add_node("lookup_cache", lookup_cache)
+    workflow.add_node("retrieve_original", retrieve_original)
+    workflow.add_node("retrieve_rewrites", retrieve_rewrites)
+    workflow.add_node("merge_context", merge_context)
     workflow.add_node("generate", generate)
     workflow.add_node("refuse", refuse_answer)
 
@@ -33,41 +60,73 @@ def create_graph() -> StateGraph:
     workflow.set_entry_point("check_rules")
 
     # 3. Conditional edges
-    def route_rule(state: AgentState) -> str:
+    def route_rule(state: AgentState) -> str | list[str]:
         if state.get("is_rule_matched"):
             return "end"
-        return "check_safety"
+        if state.get("is_prohibited"):
+            return "refuse"  # already screened: don't start any retrieval
+        return branches
 
     workflow.add_conditional_edges(
         "check_rules",
         route_rule,
-        {"end": END, "check_safety": "check_safety"},
+        {"end": END, "refuse": "refuse", **{name: name for name in branches}},
     )
 
-    def route_safety(state: AgentState) -> str:
-        if state.get("is_safe"):
-            return "retrieve"
-        return "refuse"
+    # 4. Fan-in: merge_context waits for all branches
+    if adaptive:
+        workflow.add_edge("retrieve_original", "retrieve_rewrites")
+    workflow.add_edge(joined, "merge_context")
+
+    def route_merged(state: AgentState) -> str:
+        if not state.get("is_safe"):
+            return "refuse"
+        if state.get("is_cache_hit"):
+            return "end"
+        return "generate"
 
     workflow.add_conditional_edges(
-        "check_safety",
-        route_safety,
-        {"retrieve": "retrieve", "refuse": "refuse"},
+        "merge_context",
+        route_merged,
+        {"end": END, "refuse": "refuse", "generate": "generate"},
     )
 
-    # 4. Sequential edges
-    workflow.add_edge("retrieve", "generate")
+    # 5. Sequential edges
     workflow.add_edge("generate", END)
     workflow.add_edge("refuse", END)
 
     return workflow
 
 
+# Compiled graphs are immutable and safe to share between concurrent
+# invocations, so each one is built once per (process, checkpointer).
+# Keyed by id(); the entry holds a reference so the id cannot be reused.
+_compiled_graphs: dict[int, tuple[object, object]] = {}
+_compile_lock = threading.Lock()
+
+
 def get_compiled_graph(checkpointer=None):
-    """Return a compiled, ready-to-invoke graph.
+    """Return a compiled, ready-to-invoke graph (cached per checkpointer).
 
     Args:
         checkpointer: Optional LangGraph checkpointer (e.g. AsyncPostgresSaver)
                       for persisting conversation state across invocations.
     """
-    return create_graph().compile(checkpointer=checkpointer)
+    key = id(checkpointer)
+    cached = _compiled_graphs.get(key)
+    if cached is not None and cached[0] is checkpointer:
+        return cached[1]
+
+    with _compile_lock:
+        cached = _compiled_graphs.get(key)
+        if cached is not None and cached[0] is checkpointer:
+            return cached[1]
+        compiled = create_graph().compile(checkpointer=checkpointer)
+        _compiled_graphs[key] = (checkpointer, compiled)
+        return compiled
+
+
+def clear_compiled_graphs() -> None:
+    """Drop cached graphs (e.g. after the checkpointer pool was closed)."""
+    with _compile_lock:
+        _compiled_graphs.clear()
@@ -0,0 +1,298 @@
+"""Shared OpenAI clients — one pooled HTTP client, per-model concurrency limits.
+
+Every chat model and embedding model in the process comes from here:
+
+  - ``get_chat_model(model, temperature=..., max_tokens=...)``
+  - ``get_embedding_model(model, dimensions=...)``
+
+Instances are cached per configuration and all of them share one
+``httpx.Client`` / ``httpx.AsyncClient`` pair, so keep-alive connections
+and TLS sessions to the API are reused across calls and models.
+
+Timeouts (``settings.llm_timeout_seconds``) and retries are configured
+here once: the OpenAI SDK retries connection errors, 408/409/429 and 5xx
+responses ``settings.llm_max_retries`` times with exponential backoff and
+jitter.  Each call also holds a per-model slot
+(``settings.llm_model_concurrency``, default ``llm_max_concurrency``), so
+a burst of questions queues here instead of fanning out into rate-limit
+errors.  Async calls share one ``asyncio.Semaphore`` per model (bound to
+the process loop, see ``src.utils.aio``); sync calls (Celery tasks) use a
+separate ``threading.BoundedSemaphore`` per model.
+
+Before taking a slot, each call estimates its tokens and draws them from
+the org-wide RPM/TPM buckets shared by all processes (``rate_limit``).
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional
+
+import httpx
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+
+from src.config import settings
+from src.services.ai.rate_limit import aacquire, acquire, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+# ── Pooled HTTP clients ───────────────────────────────────────────────
+
+_http_client: Optional[httpx.Client] = None
+_http_async_client: Optional[httpx.AsyncClient] = None
+_http_lock = threading.Lock()
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        settings.llm_timeout_seconds, connect=settings.llm_connect_timeout_seconds,
+    )
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.llm_max_connections,
+        max_keepalive_connections=settings.llm_max_connections,
+    )
+
+
+def _get_http_client() -> httpx.Client:
+    global _http_client
+    with _http_lock:
+        if _http_client is None:
+            _http_client = httpx.Client(timeout=_timeout(), limits=_limits())
+        return _http_client
+
+
+def _get_http_async_client() -> httpx.AsyncClient:
+    global _http_async_client
+    with _http_lock:
+        if _http_async_client is None:
+            _http_async_client = httpx.AsyncClient(timeout=_timeout(), limits=_limits())
+        return _http_async_client
+
+
+# ── Per-model concurrency limits ──────────────────────────────────────
+
+_async_slots: dict[str, asyncio.Semaphore] = {}
+_sync_slots: dict[str, threading.BoundedSemaphore] = {}
+_slot_lock = threading.Lock()
+_stats: dict[str, dict] = {}
+
+
+def _concurrency(model: str) -> int:
+    return settings.llm_model_concurrency.get(model, settings.llm_max_concurrency)
+
+
+def _model_stats(model: str) -> dict:
+    stats = _stats.get(model)
+    if stats is None:
+        stats = _stats[model] = {
+            "calls": 0, "in_flight": 0, "waiting": 0, "errors": 0,
+            "wait_seconds_total": 0.0, "wait_seconds_max": 0.0,
+        }
+    return stats
+
+
+def _acquired(model: str, waited: float) -> None:
+    with _slot_lock:
+        stats = _model_stats(model)
+        stats["waiting"] -= 1
+        stats["in_flight"] += 1
+        stats["calls"] += 1
+        stats["wait_seconds_total"] += waited
+        stats["wait_seconds_max"] = max(stats["wait_seconds_max"], waited)
+    if waited > 1.0:
+        logger.info("Waited %.1fs for a %s slot", waited, model)
+
+
+def _released(model: str, failed: bool) -> None:
+    with _slot_lock:
+        stats = _model_stats(model)
+        stats["in_flight"] -= 1
+        if failed:
+            stats["errors"] += 1
+
+
+@asynccontextmanager
+async def _async_slot(model: str):
+    with _slot_lock:
+        slot = _async_slots.get(model)
+        if slot is None:
+            slot = _async_slots[model] = asyncio.Semaphore(_concurrency(model))
+        _model_stats(model)["waiting"] += 1
+    started = time.monotonic()
+    try:
+        await slot.acquire()
+    except BaseException:
+        with _slot_lock:
+            _model_stats(model)["waiting"] -= 1
+        raise
+    _acquired(model, time.monotonic() - started)
+    failed = True
+    try:
+        yield
+        failed = False
+    finally:
+        slot.release()
+        _released(model, failed)
+
+
+@contextmanager
+def _sync_slot(model: str):
+    with _slot_lock:
+        slot = _sync_slots.get(model)
+        if slot is None:
+            slot = _sync_slots[model] = threading.BoundedSemaphore(_concurrency(model))
+        _model_stats(model)["waiting"] += 1
+    started = time.monotonic()
+    slot.acquire()
+    _acquired(model, time.monotonic() - started)
+    failed = True
+    try:
+        yield
+        failed = False
+    finally:
+        slot.release()
+        _released(model, failed)
+
+
+# ── Limited client classes ────────────────────────────────────────────
+
+_DEFAULT_COMPLETION_TOKENS = 1000  # estimate when max_tokens is unset
+
+
+class _LimitedChatOpenAI(ChatOpenAI):
+    """``ChatOpenAI`` that is rate limited and holds a per-model slot per request."""
+
+    def _estimate(self, messages) -> int:
+        prompt = estimate_tokens(str(message.content) for message in messages)
+        return prompt + (self.max_tokens or _DEFAULT_COMPLETION_TOKENS)
+
+    def _generate(self, messages, *args, **kwargs):
+        acquire(self.model_name, self._estimate(messages))
+        with _sync_slot(self.model_name):
+            return super()._generate(messages, *args, **kwargs)
+
+    async def _agenerate(self, messages, *args, **kwargs):
+        await aacquire(self.model_name, self._estimate(messages))
+        async with _async_slot(self.model_name):
+            return await super()._agenerate(messages, *args, **kwargs)
+
+    def _stream(self, messages, *args, **kwargs):
+        acquire(self.model_name, self._estimate(messages))
+        with _sync_slot(self.model_name):
+            yield from super()._stream(messages, *args, **kwargs)
+
+    async def _astream(self, messages, *args, **kwargs):
+        await aacquire(self.model_name, self._estimate(messages))
+        async with _async_slot(self.model_name):
+            async for chunk in super()._astream(messages, *args, **kwargs):
+                yield chunk
+
+
+class _LimitedOpenAIEmbeddings(OpenAIEmbeddings):
+    """``OpenAIEmbeddings`` that is rate limited and holds a per-model slot per request.
+
+    A large batch is split by the client into several API requests, but
+    it is drawn from the request bucket once.
+    """
+
+    def embed_documents(self, texts, *args, **kwargs):
+        acquire(self.model, estimate_tokens(texts))
+        with _sync_slot(self.model):
+            return super().embed_documents(texts, *args, **kwargs)
+
+    async def aembed_documents(self, texts, *args, **kwargs):
+        await aacquire(self.model, estimate_tokens(texts))
+        async with _async_slot(self.model):
+            return await super().aembed_documents(texts, *args, **kwargs)
+
+
+# ── Registry ──────────────────────────────────────────────────────────
+
+_chat_models: dict[tuple, ChatOpenAI] = {}
+_embedding_models: dict[tuple, OpenAIEmbeddings] = {}
+_registry_lock = threading.Lock()
+
+
+def _client_kwargs() -> dict:
+    return {
+        "api_key": settings.openai_api_key,
+        "timeout": _timeout(),
+        "max_retries": settings.llm_max_retries,
+        "http_client": _get_http_client(),
+        "http_async_client": _get_http_async_client(),
+    }
+
+
+def get_chat_model(
+    model: str,
+    *,
+    temperature: float = 0,
+    max_tokens: Optional[int] = None,
+) -> ChatOpenAI:
+    """Return the shared chat client for this model and sampling configuration."""
+    key = (model, temperature, max_tokens)
+    llm = _chat_models.get(key)
+    if llm is not None:
+        return llm
+    with _registry_lock:
+        llm = _chat_models.get(key)
+        if llm is None:
+            llm = _chat_models[key] = _LimitedChatOpenAI(
+                model=model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **_client_kwargs(),
+            )
+        return llm
+
+
+def get_embedding_model(model: str, *, dimensions: Optional[int] = None) -> OpenAIEmbeddings:
+    """Return the shared embeddings client for this model and output length."""
+    key = (model, dimensions)
+    embeddings = _embedding_models.get(key)
+    if embeddings is not None:
+        return embeddings
+    with _registry_lock:
+        embeddings = _embedding_models.get(key)
+        if embeddings is None:
+            embeddings = _embedding_models[key] = _LimitedOpenAIEmbeddings(
+                model=model, dimensions=dimensions, **_client_kwargs(),
+            )
+        return embeddings
+
+
+async def close_llm_clients() -> None:
+    """Close the pooled HTTP clients and drop every cached model client."""
+    global _http_client, _http_async_client
+    with _registry_lock:
+        _chat_models.clear()
+        _embedding_models.clear()
+    with _http_lock:
+        sync_client, _http_client = _http_client, None
+        async_client, _http_async_client = _http_async_client, None
+    with _slot_lock:
+        _async_slots.clear()  # bound to the loop that is shutting down
+    if async_client is not None:
+        await async_client.aclose()
+    if sync_client is not None:
+        sync_client.close()
+
+
+def get_llm_stats() -> dict:
+    """Per-model call counts, in-flight/queued requests and slot wait times."""
+    with _slot_lock:
+        snapshot = {model: dict(stats) for model, stats in _stats.items()}
+    for model, stats in snapshot.items():
+        stats["limit"] = _concurrency(model)
+        stats["avg_wait_seconds"] = (
+            round(stats["wait_seconds_total"] / stats["calls"], 4) if stats["calls"] else 0.0
+        )
+        stats["wait_seconds_max"] = round(stats["wait_seconds_max"], 4)
+        del stats["wait_seconds_total"]
+    return snapshot
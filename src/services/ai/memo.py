@@ -0,0 +1,353 @@
+"""Two-tier memoization for query preprocessing (rewrites, query embeddings).
+
+Tier 1 is a bounded in-process LRU, tier 2 is the Redis cache DB (DB2) with
+a TTL so results are shared across web/worker processes and restarts.  Keys
+are the model name plus the normalized text (NFKC, case-folded, whitespace
+collapsed), hashed for Redis.
+
+Concurrent misses for the same key are coalesced: only the first caller
+computes, the others wait for its result.  Failures are never cached.
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+from src.config import settings
+from src.services.redis_client import RedisManager
+
+logger = logging.getLogger(__name__)
+
+_LOG_EVERY = 100  # log hit ratio every N lookups
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for use as a memo key."""
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+class Memo:
+    """LRU + Redis memo for one kind of value (e.g. query embeddings)."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        encode: Callable[[Any], str],
+        decode: Callable[[str], Any],
+        maxsize: int,
+        ttl_seconds: int,
+    ):
+        self.name = name
+        self._encode = encode
+        self._decode = decode
+        self._maxsize = maxsize
+        self._ttl = ttl_seconds
+        self._lru: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight_async: dict[str, asyncio.Future] = {}
+        self._inflight_sync: dict[str, threading.Event] = {}
+        self._stats = {"local_hits": 0, "redis_hits": 0, "coalesced": 0, "misses": 0}
+
+    # ── Keys & tiers ─────────────────────────────────────────────────
+
+    def _key(self, model: str, text: str) -> str:
+        digest = hashlib.sha256(normalize_text(text).encode()).hexdigest()[:32]
+        return f"memo:{self.name}:{model}:{digest}"
+
+    def _local_get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            value = self._lru.get(key)
+            if value is not None:
+                self._lru.move_to_end(key)
+            return value
+
+    def _local_put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._lru[key] = value
+            self._lru.move_to_end(key)
+            while len(self._lru) > self._maxsize:
+                self._lru.popitem(last=False)
+
+    def _redis_get(self, key: str) -> Optional[Any]:
+        return self._redis_get_many([key])[0]
+
+    def _redis_get_many(self, keys: list[str]) -> list[Optional[Any]]:
+        try:
+            raws = RedisManager.get_cache().mget(keys)
+        except Exception:
+            logger.debug("Memo %s: Redis get failed", self.name)
+            return [None] * len(keys)
+        return self._decode_many(keys, raws)
+
+    def _redis_put(self, key: str, value: Any) -> None:
+        self._redis_put_many({key: value})
+
+    def _decode_many(self, keys: list[str], raws: list[Optional[str]]) -> list[Optional[Any]]:
+        values = []
+        for key, raw in zip(keys, raws):
+            value = None
+            if raw is not None:
+                try:
+                    value = self._decode(raw)
+                except Exception:
+                    logger.debug("Memo %s: undecodable Redis value for %s", self.name, key)
+            values.append(value)
+        return values
+
+    async def _aredis_get_many(self, keys: list[str]) -> list[Optional[Any]]:
+        try:
+            raws = await RedisManager.get_async_cache().mget(keys)
+        except Exception:
+            logger.debug("Memo %s: Redis get failed", self.name)
+            return [None] * len(keys)
+        return self._decode_many(keys, raws)
+
+    async def _aredis_put_many(self, items: dict[str, Any]) -> None:
+        if not items:
+            return
+        try:
+            pipe = RedisManager.get_async_cache().pipeline(transaction=False)
+            for key, value in items.items():
+                pipe.set(key, self._encode(value), ex=self._ttl)
+            await pipe.execute()
+        except Exception:
+            logger.debug("Memo %s: Redis set failed", self.name)
+
+    def _redis_put_many(self, items: dict[str, Any]) -> None:
+        if not items:
+            return
+        try:
+            pipe = RedisManager.get_cache().pipeline(transaction=False)
+            for key, value in items.items():
+                pipe.set(key, self._encode(value), ex=self._ttl)
+            pipe.execute()
+        except Exception:
+            logger.debug("Memo %s: Redis set failed", self.name)
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self._stats[stat] += 1
+            total = sum(self._stats.values())
+        if total % _LOG_EVERY == 0:
+            stats = self.stats()
+            logger.info(
+                "Memo %s: hit ratio %.1f%% over %d lookups",
+                self.name, 100.0 * stats["hit_ratio"], stats["lookups"],
+            )
+
+    # ── Public API ───────────────────────────────────────────────────
+
+    async def aget_or_compute(
+        self, model: str, text: str, compute: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Return the memoized value, computing it (once) on a miss."""
+        key = self._key(model, text)
+
+        value = self._local_get(key)
+        if value is not None:
+            self._count("local_hits")
+            return value
+
+        inflight = self._inflight_async.get(key)
+        if inflight is not None:
+            self._count("coalesced")
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight_async[key] = future
+        try:
+            value = (await self._aredis_get_many([key]))[0]
+            if value is not None:
+                self._count("redis_hits")
+                self._local_put(key, value)
+            else:
+                self._count("misses")
+                value = await compute()
+                self._local_put(key, value)
+                await self._aredis_put_many({key: value})
+            future.set_result(value)
+            return value
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        finally:
+            self._inflight_async.pop(key, None)
+
+    def get_or_compute(self, model: str, text: str, compute: Callable[[], Any]) -> Any:
+        """Sync ``aget_or_compute`` for Celery tasks and scripts."""
+        key = self._key(model, text)
+
+        while True:
+            value = self._local_get(key)
+            if value is not None:
+                self._count("local_hits")
+                return value
+
+            with self._lock:
+                event = self._inflight_sync.get(key)
+                if event is None:
+                    event = self._inflight_sync[key] = threading.Event()
+                    owner = True
+                else:
+                    owner = False
+
+            if not owner:
+                # Another thread is computing it — wait, then re-check the LRU
+                # (if that thread failed, the loop retries the computation)
+                self._count("coalesced")
+                event.wait()
+                continue
+
+            try:
+                value = self._redis_get(key)
+                if value is not None:
+                    self._count("redis_hits")
+                else:
+                    self._count("misses")
+                    value = compute()
+                    self._redis_put(key, value)
+                self._local_put(key, value)
+                return value
+            finally:
+                with self._lock:
+                    self._inflight_sync.pop(key, None)
+                event.set()
+
+    async def aget_or_compute_many(
+        self,
+        model: str,
+        texts: list[str],
+        compute_many: Callable[[list[str]], Awaitable[list[Any]]],
+    ) -> list[Any]:
+        """Batched ``aget_or_compute``: all misses are computed in one call.
+
+        Keys already being computed by another task are awaited instead of
+        recomputed, so batches that overlap in flight still coalesce.
+        """
+        keys = [self._key(model, t) for t in texts]
+        results: dict[str, Any] = {}
+        waiting: dict[str, asyncio.Future] = {}
+        pending: dict[str, str] = {}  # key -> text, not yet resolved
+
+        for key, text in zip(keys, texts):
+            if key in results or key in waiting or key in pending:
+                continue
+            value = self._local_get(key)
+            if value is not None:
+                self._count("local_hits")
+                results[key] = value
+            elif key in self._inflight_async:
+                self._count("coalesced")
+                waiting[key] = self._inflight_async[key]
+            else:
+                pending[key] = text
+
+        if pending:
+            loop = asyncio.get_running_loop()
+            owned = {key: loop.create_future() for key in pending}
+            self._inflight_async.update(owned)
+            try:
+                cached = await self._aredis_get_many(list(pending))
+                for key, value in zip(list(pending), cached):
+                    if value is not None:
+                        self._count("redis_hits")
+                        self._local_put(key, value)
+                        results[key] = value
+                        owned[key].set_result(value)
+                        del pending[key]
+
+                if pending:
+                    for _ in pending:
+                        self._count("misses")
+                    computed = await compute_many(list(pending.values()))
+                    fresh = dict(zip(pending, computed))
+                    for key, value in fresh.items():
+                        self._local_put(key, value)
+                        results[key] = value
+                        owned[key].set_result(value)
+                    await self._aredis_put_many(fresh)
+            except BaseException as exc:
+                for future in owned.values():
+                    if not future.done():
+                        future.set_exception(exc)
+                        future.exception()
+                raise
+            finally:
+                for key in owned:
+                    self._inflight_async.pop(key, None)
+
+        for key, future in waiting.items():
+            results[key] = await asyncio.shield(future)
+
+        return [results[key] for key in keys]
+
+    def get_or_compute_many(
+        self,
+        model: str,
+        texts: list[str],
+        compute_many: Callable[[list[str]], list[Any]],
+    ) -> list[Any]:
+        """Sync batched lookup: all misses are computed in one call.
+
+        Unlike the single-key variant this does not coalesce across threads;
+        the sync callers (Celery tasks, scripts) do not overlap in practice.
+        """
+        keys = [self._key(model, t) for t in texts]
+        results: dict[str, Any] = {}
+        pending: dict[str, str] = {}
+
+        for key, text in zip(keys, texts):
+            if key in results or key in pending:
+                continue
+            value = self._local_get(key)
+            if value is not None:
+                self._count("local_hits")
+                results[key] = value
+            else:
+                pending[key] = text
+
+        if pending:
+            for key, value in zip(list(pending), self._redis_get_many(list(pending))):
+                if value is not None:
+                    self._count("redis_hits")
+                    self._local_put(key, value)
+                    results[key] = value
+                    del pending[key]
+
+        if pending:
+            for _ in pending:
+                self._count("misses")
+            fresh = dict(zip(pending, compute_many(list(pending.values()))))
+            for key, value in fresh.items():
+                self._local_put(key, value)
+            self._redis_put_many(fresh)
+            results.update(fresh)
+
+        return [results[key] for key in keys]
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._lru)
+        lookups = stats["local_hits"] + stats["redis_hits"] + stats["coalesced"] + stats["misses"]
+        hits = lookups - stats["misses"]
+        stats["lookups"] = lookups
+        stats["hit_ratio"] = round(hits / lookups, 4) if lookups else 0.0
+        return stats
+
+
+def make_memo(name: str, *, encode, decode) -> Memo:
+    """Create a ``Memo`` sized from settings."""
+    return Memo(
+        name,
+        encode=encode,
+        decode=decode,
+        maxsize=settings.query_memo_max_entries,
+        ttl_seconds=settings.query_memo_ttl_seconds,
+    )
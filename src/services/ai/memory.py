@@ -1,50 +1,57 @@
 """Conversation memory — hybrid 3-layer approach.
 
-Layer 1: AsyncPostgresSaver  — persists full LangGraph state per thread
-Layer 2: Summary Memory      — compresses old messages via GPT-4o-mini
+Layer 1: AsyncPostgresSaver  — persists cross-turn LangGraph state per thread
+Layer 2: Summary Memory      — rolling summary of older turns (GPT-4o-mini)
 Layer 3: Sliding Window       — keeps the most recent N Q&A pairs verbatim
 
-The ``trim_and_summarize`` function is the core entry point, called inside
-the ``generate`` node to ensure the LLM always receives a bounded number
-of tokens regardless of conversation length.
+The summary is maintained off the answer's critical path: after each turn
+``schedule_summary_update`` folds the pair that left the window into the
+thread's checkpoint in a background task.  The ``generate`` node only reads
+``summary`` + ``recent_window`` and never waits on the mini model; if the
+fold has not landed yet it sends a slightly longer verbatim window instead.
 """
 
+import asyncio
+import contextvars
 import logging
-from contextlib import asynccontextmanager
-
-from sqlalchemy import text
+import threading
+import weakref
+from contextlib import contextmanager
 
 from langchain_core.messages import (
     AIMessage,
     BaseMessage,
     HumanMessage,
+    RemoveMessage,
     SystemMessage,
 )
-from langchain_openai import ChatOpenAI
 
 from src.config import settings
+from src.services.ai.llm import get_chat_model
 
 logger = logging.getLogger(__name__)
 
 # ── Layer 1: AsyncPostgresSaver (checkpoint persistence) ──────────────
+#
+# One pool + saver per process, opened lazily on first use (or eagerly via
+# ``open_checkpointer()`` at startup) and shared by every request.  Both are
+# bound to the event loop they were opened on — the server loop in the web
+# process; sync callers must go through ``src.utils.aio.run_sync`` so all
+# requests share that loop.
 
-_POOL_MAX_SIZE = 5  # Kept small — checkpointing is low-concurrency
+_POOL_MIN_SIZE = 1
+_POOL_MAX_SIZE = 10  # Shared by all concurrent questions in the process
 
+_pool = None    # psycopg_pool.AsyncConnectionPool
+_saver = None   # TieredCheckpointSaver over CompactPostgresSaver (or the latter alone)
+_saver_lock: asyncio.Lock | None = None
 
-@asynccontextmanager
-async def get_checkpointer():
-    """Yield an ``AsyncPostgresSaver`` backed by an async connection pool.
 
-    Imports psycopg_pool and langgraph lazily to avoid import-time hangs
-    when the database is not available.
+def _import_checkpoint_deps():
+    """Import psycopg_pool and langgraph lazily.
 
-    Usage::
-
-        async with get_checkpointer() as checkpointer:
-            graph = get_compiled_graph(checkpointer=checkpointer)
-            result = await graph.ainvoke(inputs, config=config)
+    Avoids import-time hangs when the database is not available.
     """
-    # Lazy imports — avoid module-level import of psycopg/pool
     try:
         from psycopg_pool import AsyncConnectionPool
     except ImportError as exc:
@@ -55,84 +62,227 @@ async def get_checkpointer():
         ) from exc
 
     try:
-        from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+        from src.services.ai.compact_saver import CompactPostgresSaver
+        from src.services.ai.tiered_saver import TieredCheckpointSaver
     except ImportError as exc:
         raise ImportError(
             "langgraph-checkpoint-postgres 패키지를 찾을 수 없습니다. "
             "'pip install langgraph-checkpoint-postgres>=2.0.0'을 실행하세요."
         ) from exc
 
-    async with AsyncConnectionPool(
-        conninfo=settings.postgres_dsn,
-        max_size=_POOL_MAX_SIZE,
-        kwargs={"autocommit": True},
-    ) as pool:
-        saver = AsyncPostgresSaver(pool)
-        await saver.setup()
-        yield saver
+    return AsyncConnectionPool, CompactPostgresSaver, TieredCheckpointSaver
+
+
+async def open_checkpointer():
+    """Open the process-wide pool and run ``AsyncPostgresSaver.setup()`` once.
+
+    Safe to call repeatedly and concurrently; only the first call does work.
+    """
+    global _pool, _saver, _saver_lock
+    if _saver is not None:
+        return _saver
+
+    if _saver_lock is None:
+        _saver_lock = asyncio.Lock()
+
+    async with _saver_lock:
+        if _saver is not None:
+            return _saver
+
+        (
+            AsyncConnectionPool, CompactPostgresSaver, TieredCheckpointSaver,
+        ) = _import_checkpoint_deps()
+
+        pool = AsyncConnectionPool(
+            conninfo=settings.postgres_dsn,
+            min_size=_POOL_MIN_SIZE,
+            max_size=_POOL_MAX_SIZE,
+            kwargs={"autocommit": True},
+            check=AsyncConnectionPool.check_connection,
+            name="checkpointer",
+            open=False,
+        )
+        await pool.open(wait=True)
+        try:
+            saver = CompactPostgresSaver(pool)
+            await saver.setup()
+            if settings.checkpoint_hot_tier_enabled:
+                saver = TieredCheckpointSaver(saver)
+                await saver.recover()
+        except Exception:
+            await pool.close()
+            raise
+
+        _pool, _saver = pool, saver
+        logger.info(
+            "Checkpointer pool opened (min=%d, max=%d)",
+            _POOL_MIN_SIZE,
+            _POOL_MAX_SIZE,
+        )
+        return _saver
+
+
+async def get_checkpointer():
+    """Return the shared ``AsyncPostgresSaver``, opening it on first use.
+
+    Usage::
+
+        checkpointer = await get_checkpointer()
+        graph = get_compiled_graph(checkpointer=checkpointer)
+        result = await graph.ainvoke(inputs, config=config)
+    """
+    if _saver is not None:
+        return _saver
+    return await open_checkpointer()
+
+
+async def flush_checkpoints(thread_id: str | None = None) -> None:
+    """Write checkpoints still pending in the Redis hot tier to Postgres."""
+    flush = getattr(_saver, "aflush", None)
+    if flush is not None:
+        await flush(thread_id)
+
+
+async def close_checkpointer() -> None:
+    """Flush the hot tier and close the shared pool (call on process shutdown)."""
+    global _pool, _saver
+    try:
+        await flush_checkpoints()
+    except Exception:
+        logger.exception("Failed to flush hot checkpoints on shutdown")
+    pool = _pool
+    _pool, _saver = None, None
+    if pool is not None:
+        await pool.close()
+        logger.info("Checkpointer pool closed")
+
+
+def get_checkpointer_stats() -> dict:
+    """Return pool usage stats: connections in use, waiting requests, acquire latency."""
+    if _pool is None:
+        return {"open": False, "writes": get_checkpoint_write_stats()}
+    hot_tier = getattr(_saver, "get_stats", None)
+
+    stats = _pool.get_stats()
+    size = stats.get("pool_size", 0)
+    available = stats.get("pool_available", 0)
+    requests = stats.get("requests_num", 0)
+    wait_ms = stats.get("requests_wait_ms", 0)
+    return {
+        "open": True,
+        "size": size,
+        "max_size": stats.get("pool_max", _POOL_MAX_SIZE),
+        "in_use": size - available,
+        "waiting": stats.get("requests_waiting", 0),
+        "requests": requests,
+        "avg_acquire_ms": round(wait_ms / requests, 2) if requests else 0.0,
+        "errors": stats.get("requests_errors", 0),
+        "writes": get_checkpoint_write_stats(),
+        "hot_tier": hot_tier() if hot_tier else None,
+    }
+
+
+# ── Checkpoint write accounting ──────────────────────────────────────
+#
+# ``CompactPostgresSaver`` reports every row it writes; ``generate_answer``
+# wraps each invocation in ``track_checkpoint_writes`` so the totals can be
+# reported per question (write amplification).
+
+_question_writes: contextvars.ContextVar[dict | None] = contextvars.ContextVar(
+    "checkpoint_writes", default=None,
+)
+_write_totals = {"questions": 0, "rows": 0, "bytes": 0}
+_write_totals_lock = threading.Lock()
+
+
+def record_checkpoint_write(rows: int, nbytes: int) -> None:
+    """Count rows / payload bytes written for the current question."""
+    counts = _question_writes.get()
+    if counts is not None:
+        counts["rows"] += rows
+        counts["bytes"] += nbytes
+
+
+@contextmanager
+def track_checkpoint_writes():
+    """Collect the checkpoint rows and bytes written inside the block."""
+    counts = {"rows": 0, "bytes": 0}
+    token = _question_writes.set(counts)
+    try:
+        yield counts
+    finally:
+        _question_writes.reset(token)
+        with _write_totals_lock:
+            _write_totals["questions"] += 1
+            _write_totals["rows"] += counts["rows"]
+            _write_totals["bytes"] += counts["bytes"]
+        logger.debug(
+            "Checkpoint writes: %d rows, %d bytes", counts["rows"], counts["bytes"],
+        )
+
+
+def get_checkpoint_write_stats() -> dict:
+    """Checkpoint rows and payload bytes written, in total and per question."""
+    with _write_totals_lock:
+        questions, rows, nbytes = (
+            _write_totals["questions"], _write_totals["rows"], _write_totals["bytes"],
+        )
+    return {
+        "questions": questions,
+        "rows": rows,
+        "bytes": nbytes,
+        "rows_per_question": round(rows / questions, 2) if questions else 0.0,
+        "bytes_per_question": round(nbytes / questions, 1) if questions else 0.0,
+    }
 
 
 def clear_checkpoints(workspace_id: str) -> int:
     """Delete all LangGraph checkpoints for a workspace.
 
-    Thread IDs are formatted as ``{workspace_id}:{asker_id}``, so we delete
-    all rows where thread_id starts with the workspace prefix.
+    Threads are found by a primary-key range on the ``{workspace_id}:``
+    prefix and deleted by exact thread_id (see ``checkpoint_gc``).
 
     Returns the total number of rows deleted across checkpoint tables.
     """
-    from src.services.db.connection import get_db
-
-    prefix = f"{workspace_id}:%"
-    deleted = 0
-
-    with get_db() as db:
-        for table in ("checkpoints", "checkpoint_writes", "checkpoint_blobs"):
-            try:
-                result = db.execute(
-                    text(f"DELETE FROM {table} WHERE thread_id LIKE :prefix"),
-                    {"prefix": prefix},
-                )
-                deleted += result.rowcount
-            except Exception:
-                # Table may not exist yet if no checkpoints were ever created
-                logger.debug("Table %s not found or empty, skipping", table)
+    from src.services.ai.checkpoint_gc import clear_workspace_threads
 
+    deleted = clear_workspace_threads(workspace_id)
     logger.info(
         "Cleared %d checkpoint rows for workspace %s", deleted, workspace_id,
     )
     return deleted
 
 
-# ── Layer 2: Summary Memory (compress old messages) ───────────────────
+# ── Layer 2: Summary Memory (rolling summary in state) ──────────────
+#
+# The summary lives in ``AgentState.summary`` and is checkpointed with the
+# thread.  Each turn only the pair that slides out of the window is folded
+# into it (one small mini-model call, in the background), and the folded
+# messages are removed from ``messages`` so they are never summarized again.
 
 _SUMMARY_PREFIX = "[이전 대화 요약] "
 
-# Lazy-loaded mini model for cheap summarization
-_mini_llm: ChatOpenAI | None = None
+_SUMMARY_MODEL = "gpt-4o-mini"  # cheap model for summarization
 
 
-def _get_mini_llm() -> ChatOpenAI:
-    global _mini_llm
-    if _mini_llm is None:
-        _mini_llm = ChatOpenAI(
-            model="gpt-4o-mini",
-            temperature=0,
-            max_tokens=200,
-            api_key=settings.openai_api_key,
-        )
-    return _mini_llm
-
+async def _summarize_messages(
+    messages: list[BaseMessage],
+    previous_summary: str = "",
+) -> str:
+    """Fold messages into the previous summary as a concise Korean paragraph.
 
-async def _summarize_messages(messages: list[BaseMessage]) -> str:
-    """Summarize a list of messages into a concise Korean paragraph."""
+    Returns an empty string on failure.
+    """
     if not messages:
-        return ""
+        return previous_summary
 
     conversation = "\n".join(
         f"{'Q' if isinstance(m, HumanMessage) else 'A'}: {_truncate(m.content, 300)}"
         for m in messages
         if isinstance(m, (HumanMessage, AIMessage))
     )
+    if previous_summary:
+        conversation = f"이전 요약: {previous_summary}\n{conversation}"
 
     prompt = (
         "아래 대화 기록을 한국어 3줄 이내로 요약하세요. "
@@ -141,15 +291,20 @@ async def _summarize_messages(messages: list[BaseMessage]) -> str:
     )
 
     try:
-        response = await _get_mini_llm().ainvoke([{"role": "user", "content": prompt}])
+        llm = get_chat_model(_SUMMARY_MODEL, max_tokens=200)
+        response = await llm.ainvoke([{"role": "user", "content": prompt}])
         return response.content.strip()
     except Exception:
-        logger.exception("Summary generation failed, dropping old context")
+        logger.exception("Summary generation failed, keeping previous summary")
         return ""
 
 
 # ── Layer 3: Sliding Window (keep recent pairs) ──────────────────────
 
+SUMMARY_WINDOW_PAIRS = 2  # Q&A pairs kept verbatim once the summary is folded
+# Upper bound on the verbatim window while a fold is still pending (or failed)
+_FALLBACK_WINDOW_PAIRS = 4
+
 def _truncate(text: str, max_len: int = 500) -> str:
     """Truncate text with ellipsis if it exceeds max_len."""
     if len(text) <= max_len:
@@ -157,15 +312,6 @@ def _truncate(text: str, max_len: int = 500) -> str:
     return text[:max_len] + "..."
 
 
-def _extract_existing_summary(messages: list[BaseMessage]) -> tuple[str, list[BaseMessage]]:
-    """Separate any existing summary SystemMessage from the rest."""
-    if messages and isinstance(messages[0], SystemMessage):
-        content = messages[0].content
-        if content.startswith(_SUMMARY_PREFIX):
-            return content[len(_SUMMARY_PREFIX):], messages[1:]
-    return "", messages
-
-
 def _split_recent_and_old(
     messages: list[BaseMessage],
     max_recent_pairs: int = 2,
@@ -188,66 +334,150 @@ def _split_recent_and_old(
     return messages[:split_idx], messages[split_idx:]
 
 
-# ── Entry point ──────────────────────────────────────────────────────
+# ── Entry points ─────────────────────────────────────────────────────
 
-async def trim_and_summarize(
+def recent_window(
     messages: list[BaseMessage],
-    max_recent_pairs: int = 2,
+    max_pairs: int = _FALLBACK_WINDOW_PAIRS,
 ) -> list[BaseMessage]:
-    """Compress conversation history for token-efficient LLM input.
+    """Return the unfolded conversation messages to send verbatim.
+
+    Normally the background fold has already trimmed ``messages`` to
+    ``SUMMARY_WINDOW_PAIRS``; if it has not, up to ``max_pairs`` pairs are
+    kept so the pending pair is not lost from the LLM's view.
+    """
+    conv_messages = [
+        m for m in messages if isinstance(m, (HumanMessage, AIMessage))
+    ]
+    human_count = sum(1 for m in conv_messages if isinstance(m, HumanMessage))
+    if human_count > SUMMARY_WINDOW_PAIRS:
+        logger.debug("Summary not folded yet, using a verbatim window")
+    return _split_recent_and_old(conv_messages, max_pairs)[1]
+
+
+async def roll_summary(
+    messages: list[BaseMessage],
+    summary: str = "",
+    max_recent_pairs: int = SUMMARY_WINDOW_PAIRS,
+) -> tuple[str, list[BaseMessage], list[BaseMessage]]:
+    """Fold the messages that slid out of the window into the summary.
 
-    Returns:
-        A trimmed message list: [summary SystemMessage?] + [recent messages]
+    Returns ``(summary, window, folded)``: the updated summary, the recent
+    messages to send verbatim, and the messages now covered by the summary
+    (the caller removes them from state with ``RemoveMessage``).  While the
+    window is not full nothing is summarized.  If summarization fails the
+    old summary is kept and nothing is folded, so the next turn retries.
 
     Token budget (approximate):
         - Summary: ~100-200 tokens (fixed, regardless of history length)
         - Recent 2 Q&A pairs: ~200-300 tokens
         - Total: ~300-500 tokens (bounded)
     """
-    # Filter to only conversation messages (Human + AI)
     conv_messages = [
-        m for m in messages
-        if isinstance(m, (HumanMessage, AIMessage, SystemMessage))
+        m for m in messages if isinstance(m, (HumanMessage, AIMessage))
     ]
+    old_messages, recent_messages = _split_recent_and_old(
+        conv_messages, max_recent_pairs,
+    )
+    if not old_messages:
+        return summary, recent_messages, []
 
-    if not conv_messages:
-        return messages
+    new_summary = await _summarize_messages(old_messages, summary)
+    if not new_summary:
+        return summary, conv_messages, []
 
-    # Separate existing summary from messages
-    existing_summary, conv_messages = _extract_existing_summary(conv_messages)
+    logger.info(
+        "Folded %d messages into summary, %d kept verbatim",
+        len(old_messages),
+        len(recent_messages),
+    )
+    return new_summary, recent_messages, old_messages
 
-    # Count actual Q&A pairs
-    human_count = sum(1 for m in conv_messages if isinstance(m, HumanMessage))
 
-    # If within window, no trimming needed
-    if human_count <= max_recent_pairs:
-        result = []
-        if existing_summary:
-            result.append(SystemMessage(content=f"{_SUMMARY_PREFIX}{existing_summary}"))
-        result.extend(conv_messages)
-        return result
+def build_history(summary: str, window: list[BaseMessage]) -> list[BaseMessage]:
+    """Return the LLM history: [summary SystemMessage?] + recent messages."""
+    history: list[BaseMessage] = []
+    if summary:
+        history.append(SystemMessage(content=f"{_SUMMARY_PREFIX}{summary}"))
+    history.extend(window)
+    return history
 
-    # Split into old and recent
-    old_messages, recent_messages = _split_recent_and_old(
-        conv_messages, max_recent_pairs
-    )
 
-    # Build text to summarize: existing summary + old messages
-    to_summarize: list[BaseMessage] = []
-    if existing_summary:
-        to_summarize.append(AIMessage(content=f"이전 요약: {existing_summary}"))
-    to_summarize.extend(old_messages)
+# ── Background summarization ─────────────────────────────────────────
+#
+# Runs after a turn's graph invocation, so the mini-model call overlaps
+# with sending the answer instead of delaying it.  Folds for the same
+# thread are serialized; a fold that races with the next turn may be
+# superseded by that turn's checkpoint, in which case the following fold
+# simply redoes it.
 
-    new_summary = await _summarize_messages(to_summarize)
+_summary_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = (
+    weakref.WeakValueDictionary()
+)
+_turn_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = (
+    weakref.WeakValueDictionary()
+)
+_background_tasks: set[asyncio.Task] = set()
 
-    result: list[BaseMessage] = []
-    if new_summary:
-        result.append(SystemMessage(content=f"{_SUMMARY_PREFIX}{new_summary}"))
-    result.extend(recent_messages)
 
-    logger.info(
-        "Memory trimmed: %d messages → summary + %d recent",
-        len(messages),
-        len(recent_messages),
-    )
-    return result
+def thread_turn_lock(thread_id: str) -> asyncio.Lock:
+    """Lock serializing a thread's turns in this process.
+
+    A graph run writes its checkpoint on exit from the state it started
+    with, so anything else written to the thread meanwhile (a fast-path
+    exchange) would be lost; both take this lock.
+    """
+    lock = _turn_locks.get(thread_id)
+    if lock is None:
+        lock = _turn_locks[thread_id] = asyncio.Lock()
+    return lock
+
+
+def run_in_background(coro) -> None:
+    """Run post-turn work on the loop, tracked so shutdown can drain it."""
+    task = asyncio.get_running_loop().create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+def schedule_summary_update(graph, config: dict) -> None:
+    """Fold the thread's overflow into its summary in a background task."""
+    run_in_background(update_summary(graph, config))
+
+
+async def update_summary(graph, config: dict) -> None:
+    """Fold the thread's window overflow into ``summary`` in its checkpoint."""
+    thread_id = config["configurable"]["thread_id"]
+    lock = _summary_locks.get(thread_id)
+    if lock is None:
+        lock = _summary_locks[thread_id] = asyncio.Lock()
+
+    async with lock:
+        try:
+            snapshot = await graph.aget_state(config)
+            values = snapshot.values or {}
+            summary, _, folded = await roll_summary(
+                values.get("messages", []), values.get("summary", ""),
+            )
+            if not folded:
+                return
+            await graph.aupdate_state(
+                config,
+                {
+                    "summary": summary,
+                    "messages": [RemoveMessage(id=m.id) for m in folded if m.id],
+                },
+                as_node="generate",
+            )
+        except Exception:
+            logger.exception("Background summary update failed for %s", thread_id)
+
+
+async def drain_background_tasks(timeout: float = 5.0) -> None:
+    """Wait briefly for in-flight post-turn work (call before closing the pool)."""
+    tasks = list(_background_tasks)
+    if not tasks:
+        return
+    _, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        task.cancel()
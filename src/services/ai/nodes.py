@@ -4,79 +4,29 @@ Each node takes the current ``AgentState`` and returns a partial dict
 that gets merged back into the state.
 """
 
+import inspect
+import json
 import logging
-from typing import Optional
+import random
+import threading
+import time
 
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
-from langchain_openai import ChatOpenAI
 
 from src.config import settings
-from src.services.ai.memory import trim_and_summarize
+from src.services.ai.answer_cache import lookup_cached_answer
+from src.services.ai.embeddings import aembed_text
+from src.services.ai.llm import get_chat_model
+from src.services.ai.memo import make_memo
+from src.services.ai.memory import build_history, recent_window, run_in_background
 from src.services.ai.persona import build_system_prompt
-from src.services.ai.state import AgentState, streaming_callback
-from src.services.ai.vector_store import search_similar
-from src.services.redis_client import get_persona_profile
-from src.utils.keywords import detect_high_risk_keywords
-from src.utils.prohibited import check_prohibited
+from src.services.ai.state import AgentState, merge_hits, streaming_callback
+from src.services.ai.vector_store import asearch_similar, asearch_similar_multi
+from src.utils.question_matcher import scan_question
 
 logger = logging.getLogger(__name__)
 
-# Lazy-loaded LLM singleton
-_llm: Optional[ChatOpenAI] = None
-
-
-def _get_decision_maker_name(workspace_id: str) -> str:
-    """Look up the decision-maker's display name, cached in Redis.
-
-    Falls back to empty string if anything fails.
-    """
-    from src.services.redis_client import RedisManager
-
-    cache_key = f"dm_name:{workspace_id}"
-    cache = RedisManager.get_cache()
-    cached = cache.get(cache_key)
-    if cached:
-        return cached
-
-    try:
-        import uuid as _uuid
-        from src.services.db import get_db
-        from src.services.db.models import Workspace
-        from slack_sdk import WebClient
-
-        with get_db() as db:
-            ws = db.query(Workspace).filter(
-                Workspace.id == _uuid.UUID(workspace_id)
-            ).first()
-            if not ws or not ws.decision_maker_id or not ws.bot_token:
-                return ""
-
-            client = WebClient(token=ws.bot_token)
-            resp = client.users_info(user=ws.decision_maker_id)
-            name = (
-                resp["user"].get("real_name")
-                or resp["user"].get("profile", {}).get("display_name")
-                or resp["user"].get("name", "")
-            )
-
-        if name:
-            cache.set(cache_key, name, ex=86400)  # cache 24h
-        return name
-    except Exception:
-        logger.debug("Failed to look up decision-maker name for %s", workspace_id)
-        return ""
-
-
-def _get_llm() -> ChatOpenAI:
-    """Return a singleton ChatOpenAI (GPT-4o) instance."""
-    global _llm
-    if _llm is None:
-        _llm = ChatOpenAI(
-            model="gpt-4o",
-            temperature=0.3,
-            api_key=settings.openai_api_key,
-        )
-    return _llm
+_ANSWER_MODEL = "gpt-4o"
 
 
 def _to_openai_messages(msgs: list) -> list[dict]:
@@ -94,67 +44,115 @@ def _to_openai_messages(msgs: list) -> list[dict]:
 
 # ── Node: check_rules ────────────────────────────────────────────────
 
+def _screen(state: AgentState) -> dict:
+    """Screen the question for rules, prohibited phrases and risk keywords in one pass."""
+    match = scan_question(
+        state.get("workspace_id", ""), state.get("rules", []), state["question"],
+    )
+    return match.as_state()
+
+
+REFUSAL_ANSWER = (
+    "죄송합니다. 이 주제는 법적·재무적·운영상 판단이 필요한 영역으로, "
+    "AI가 답변을 제공할 수 없습니다. 직접 의사결정자에게 문의해 주세요."
+)
+
+
+def rule_answer(rule_text: str) -> str:
+    """Answer text for a question that matched a decision-maker rule."""
+    return f"📋 [규칙 적용]\n{rule_text}"
+
+
 def check_rules(state: AgentState) -> dict:
     """Match the question against active rules (keyword search).
 
     If a rule matches, the answer is set immediately and the pipeline
-    can skip to END via the conditional edge.
+    can skip to END via the conditional edge.  Screening also yields the
+    safety flags used by ``check_safety``; it is skipped when the caller
+    already screened the question (``safety_checked`` in the input).
     """
-    question = state["question"]
-    rules = state.get("rules", [])
+    screened = {} if state.get("safety_checked") else _screen(state)
+    rule_text = screened.get("matched_rule", state.get("matched_rule", ""))
 
-    for rule in rules:
-        rule_text = rule.get("rule_text", "")
-        # Simple keyword containment — same logic as SloughAI
-        if rule_text and rule_text.lower() in question.lower():
-            return {
-                "answer": f"📋 [규칙 적용]\n{rule_text}",
-                "is_rule_matched": True,
-            }
+    if rule_text:
+        return {
+            **screened,
+            "answer": rule_answer(rule_text),
+            "is_rule_matched": True,
+        }
 
-    return {"is_rule_matched": False}
+    return {**screened, "is_rule_matched": False}
 
 
 # ── Node: check_safety ───────────────────────────────────────────────
 
 def check_safety(state: AgentState) -> dict:
-    """Run prohibited-domain and high-risk keyword checks."""
-    question = state["question"]
+    """Run prohibited-domain and high-risk keyword checks.
 
-    # Prohibited domain check
-    prohibited = check_prohibited(question)
-    if prohibited["is_prohibited"]:
-        return {
-            "is_safe": False,
-            "is_prohibited": True,
-            "is_high_risk": False,
-        }
+    The flags are normally already in state from screening; the node only
+    screens itself if they are missing.
+    """
+    if state.get("safety_checked"):
+        return {}
+    return _screen(state)
+
+
+# ── Node: lookup_cache ───────────────────────────────────────────────
 
-    # High-risk keyword check (answer anyway, but flag it)
-    risk = detect_high_risk_keywords(question)
+async def lookup_cache(state: AgentState) -> dict:
+    """Serve a previous answer to a semantically equivalent question.
+
+    Embeds the question and looks for a cached answer in the same workspace
+    (see ``answer_cache``).  On a miss the embedding is kept in state so the
+    new answer can be stored as a cache entry.
+
+    A question asked within ``settings.answer_cache_followup_seconds`` of
+    the thread's previous turn may refer to it ("what about last year?"),
+    so it is answered fresh and not cached: a cached answer was built for
+    another conversation, and this one would only fit this conversation.
+    """
+    workspace_id = state.get("workspace_id", "")
+    now = time.time()
+    if not settings.answer_cache_enabled or not workspace_id:
+        return {"is_cache_hit": False, "last_turn_at": now}
+    if now - (state.get("last_turn_at") or 0.0) < settings.answer_cache_followup_seconds:
+        return {"is_cache_hit": False, "last_turn_at": now}
+
+    try:
+        embedding = await aembed_text(state["question"])
+    except Exception:
+        logger.exception("Question embedding failed, skipping answer cache")
+        return {"is_cache_hit": False, "last_turn_at": now}
+
+    cached = await lookup_cached_answer(workspace_id, embedding)
+    if cached is None:
+        return {"is_cache_hit": False, "question_embedding": embedding, "last_turn_at": now}
+
+    logger.info(
+        "Answer cache hit: qa=%s similarity=%.3f", cached.qa_id, cached.similarity,
+    )
     return {
-        "is_safe": True,
-        "is_prohibited": False,
-        "is_high_risk": risk["is_high_risk"],
+        "answer": cached.answer,
+        "is_cache_hit": True,
+        "is_high_risk": state.get("is_high_risk", False) or cached.is_high_risk,
+        "messages": [AIMessage(content=cached.answer)],
+        "last_turn_at": now,
     }
 
 
 # ── Query rewriting helper ───────────────────────────────────────────
 
-async def _rewrite_query(question: str) -> list[str]:
-    """Generate 2-3 search-optimized query variants using GPT-4o-mini.
+_REWRITE_MODEL = "gpt-4o-mini"
 
-    Expands keywords, converts temporal expressions, and maintains
-    the original meaning to improve retrieval recall.
+# Rewrites are deterministic (temperature=0), so variants are memoized per
+# normalized question; only the variants are stored, the caller's original
+# wording is always kept as the first query.
+_rewrite_memo = make_memo("query_rewrite", encode=json.dumps, decode=json.loads)
 
-    Returns the original query plus rewritten variants.
-    """
-    llm = ChatOpenAI(
-        model="gpt-4o-mini",
-        temperature=0,
-        max_tokens=200,
-        api_key=settings.openai_api_key,
-    )
+
+async def _generate_rewrites(question: str) -> list[str]:
+    """Ask GPT-4o-mini for up to 2 search-optimized variants of the question."""
+    llm = get_chat_model(_REWRITE_MODEL, temperature=0, max_tokens=200)
     prompt = (
         "당신은 검색 쿼리 최적화 전문가입니다.\n"
         "아래 질문을 벡터 검색에 최적화된 2-3개의 검색 쿼리로 변환하세요.\n"
@@ -166,74 +164,222 @@ async def _rewrite_query(question: str) -> list[str]:
         "- 쿼리만 출력 (번호, 설명 없이)\n\n"
         f"질문: {question}"
     )
+    response = await llm.ainvoke([{"role": "user", "content": prompt}])
+    variants = [
+        line.strip()
+        for line in response.content.strip().split("\n")
+        if line.strip()
+    ]
+    return variants[:2]
+
+
+async def _rewrite_variants(question: str) -> list[str]:
+    """Generate up to 2 search-optimized variants of the question (GPT-4o-mini).
+
+    Expands keywords, converts temporal expressions, and maintains
+    the original meaning to improve retrieval recall.  Results are
+    memoized, and concurrent rewrites of the same question share one call.
+
+    Returns only the variants (the original is searched separately);
+    an empty list if the rewrite fails.
+    """
     try:
-        response = await llm.ainvoke([{"role": "user", "content": prompt}])
-        variants = [
-            line.strip()
-            for line in response.content.strip().split("\n")
-            if line.strip()
-        ]
-        # Always include original query first
-        return [question] + variants[:2]
+        return await _rewrite_memo.aget_or_compute(
+            _REWRITE_MODEL, question, lambda: _generate_rewrites(question),
+        )
     except Exception:
         logger.warning("Query rewrite failed, using original query only")
-        return [question]
+        return []
+
+
+def get_rewrite_memo_stats() -> dict:
+    """Hit ratio and size of the query rewrite memo."""
+    return _rewrite_memo.stats()
+
+
+# ── Nodes: retrieve (parallel branches) ──────────────────────────────
+#
+# After check_rules the graph fans out: check_safety, lookup_cache,
+# retrieve_original and retrieve_rewrites run concurrently.  Each
+# retrieval branch adds its hits to ``retrieved`` (merged by content,
+# best score kept) as soon as it finishes, and merge_context turns the
+# merged hits into the prompt context once every branch is done — or
+# discards them if the question turned out to be prohibited.
+#
+# In "adaptive" mode (settings.query_rewrite_mode) retrieve_rewrites runs
+# after retrieve_original instead, and skips the rewrite when the original
+# search is already confident (see ``_is_confident``).
+
+_RETRIEVE_K = 8
+_RETRIEVE_THRESHOLD = 0.3
+
+_rewrite_stats = {
+    "rewritten": 0,
+    "skipped": 0,
+    "added_hits": 0,  # top-k docs found only by the rewrites
+    "audited": 0,
+    "audit_missed_hits": 0,  # ... that a skipped rewrite would have added
+}
+_rewrite_stats_lock = threading.Lock()
+
+
+def _is_confident(hits: list) -> bool:
+    """Whether the original question's hits are good enough to skip rewriting."""
+    return (
+        bool(hits)
+        and hits[0][1] >= settings.rewrite_min_top_score
+        and len(hits) >= settings.rewrite_min_hits
+    )
 
 
-# ── Node: retrieve ───────────────────────────────────────────────────
+def _added_hits(original: list, rewritten: list) -> int:
+    """Number of merged top-k docs that only the rewritten queries found."""
+    seen = {content for content, _, _ in original}
+    merged = merge_hits(original, rewritten)[:_RETRIEVE_K]
+    return sum(1 for content, _, _ in merged if content not in seen)
 
-async def retrieve(state: AgentState) -> dict:
-    """Retrieve similar documents from pgvector with query rewriting.
 
-    1. Rewrite the question into 2-3 search variants (GPT-4o-mini)
-    2. Run vector search for each variant
-    3. Deduplicate by content, keep highest score per doc
-    4. Annotate with relevance labels and dates
+def _record_rewrite(outcome: str, added: int = 0) -> None:
+    with _rewrite_stats_lock:
+        _rewrite_stats[outcome] += 1
+        if outcome == "rewritten":
+            _rewrite_stats["added_hits"] += added
+        elif outcome == "audited":
+            _rewrite_stats["audit_missed_hits"] += added
+
+
+def get_rewrite_stats() -> dict:
+    """Adaptive rewriting: skip rate and how many top-k docs rewrites contribute."""
+    with _rewrite_stats_lock:
+        stats = dict(_rewrite_stats)
+    decided = stats["rewritten"] + stats["skipped"]
+    stats["mode"] = settings.query_rewrite_mode
+    stats["skip_rate"] = round(stats["skipped"] / decided, 4) if decided else 0.0
+    stats["avg_added_hits"] = (
+        round(stats["added_hits"] / stats["rewritten"], 3) if stats["rewritten"] else 0.0
+    )
+    stats["avg_audit_missed_hits"] = (
+        round(stats["audit_missed_hits"] / stats["audited"], 3) if stats["audited"] else 0.0
+    )
+    return stats
+
+
+async def retrieve_original(state: AgentState) -> dict:
+    """Embed and search the question as asked.
+
+    The embedding is shared with lookup_cache (the query-embedding memo
+    coalesces the two concurrent calls into one API request).
     """
-    workspace_id = state.get("workspace_id", "")
-    question = state["question"]
+    try:
+        hits = await asearch_similar(
+            workspace_id=state.get("workspace_id", ""),
+            query=state["question"],
+            k=_RETRIEVE_K,
+            threshold=_RETRIEVE_THRESHOLD,
+        )
+    except Exception:
+        logger.exception("Vector search failed")
+        return {}
+    return {"retrieved": hits}
+
+
+async def _search_rewrites(workspace_id: str, question: str) -> list:
+    """Rewrite the question and search the variants in one query."""
+    variants = await _rewrite_variants(question)
+    logger.info("Query rewrite: %d variants for '%s'", len(variants), question[:50])
+    if not variants:
+        return []
 
     try:
-        queries = await _rewrite_query(question)
-        logger.info("Query rewrite: %d variants for '%s'", len(queries), question[:50])
-
-        # Collect results from all query variants
-        seen: dict[str, tuple[float, str]] = {}  # content -> (best_score, date_str)
-        for q in queries:
-            results = search_similar(
-                workspace_id=workspace_id,
-                query=q,
-                k=8,
-                threshold=0.3,
-            )
-            for content, score, date_str in results:
-                if content not in seen or score > seen[content][0]:
-                    seen[content] = (score, date_str)
-
-        # Sort by score descending, cap at k=8
-        ranked = sorted(seen.items(), key=lambda x: x[1][0], reverse=True)[:8]
-
-        # Annotate each doc with relevance level and date
-        annotated = []
-        for content, (score, date_str) in ranked:
-            if score > 0.5:
-                label = "[높은 관련성]"
-            elif score >= 0.35:
-                label = "[관련성 있음]"
-            else:
-                label = "[낮은 관련성]"
-            annotated.append(f"{label} [{date_str}]\n{content}")
+        return await asearch_similar_multi(
+            workspace_id=workspace_id,
+            queries=variants,
+            k=_RETRIEVE_K,
+            threshold=_RETRIEVE_THRESHOLD,
+        )
+    except Exception:
+        logger.exception("Vector search failed for rewritten queries")
+        return []
 
-        return {
-            "context": annotated,
-            "sources_used": len(ranked),
-        }
+
+async def _audit_skipped_rewrite(workspace_id: str, question: str, original: list) -> None:
+    """Measure what a skipped rewrite would have added (sampled, off the hot path)."""
+    try:
+        missed = _added_hits(original, await _search_rewrites(workspace_id, question))
     except Exception:
-        logger.exception("Vector search failed")
-        return {
-            "context": [],
-            "sources_used": 0,
-        }
+        logger.exception("Rewrite audit failed")
+        return
+    _record_rewrite("audited", missed)
+    logger.info(
+        "Rewrite audit: skipping missed %d top-%d docs for '%s'",
+        missed, _RETRIEVE_K, question[:50],
+    )
+
+
+async def retrieve_rewrites(state: AgentState) -> dict:
+    """Search rewritten variants of the question.
+
+    In adaptive mode this runs after retrieve_original and rewrites only
+    when those hits are weak; a sample of skipped questions is rewritten
+    in the background to measure the recall cost of skipping.
+    """
+    workspace_id = state.get("workspace_id", "")
+    question = state["question"]
+
+    if settings.query_rewrite_mode != "adaptive":
+        hits = await _search_rewrites(workspace_id, question)
+        return {"retrieved": hits} if hits else {}
+
+    if state.get("is_cache_hit") or not state.get("is_safe"):
+        return {}
+
+    original = state.get("retrieved") or []
+    top_score = original[0][1] if original else 0.0
+    if _is_confident(original):
+        _record_rewrite("skipped")
+        logger.info(
+            "Adaptive rewrite: skipped (top=%.3f, hits=%d)", top_score, len(original),
+        )
+        if random.random() < settings.rewrite_audit_sample_rate:
+            run_in_background(_audit_skipped_rewrite(workspace_id, question, original))
+        return {}
+
+    hits = await _search_rewrites(workspace_id, question)
+    added = _added_hits(original, hits)
+    _record_rewrite("rewritten", added)
+    logger.info(
+        "Adaptive rewrite: rewrote (top=%.3f, hits=%d), added %d top-%d docs",
+        top_score, len(original), added, _RETRIEVE_K,
+    )
+    return {"retrieved": hits} if hits else {}
+
+
+def merge_context(state: AgentState) -> dict:
+    """Keep the top-k merged hits and annotate them with relevance labels and dates.
+
+    Speculative results are dropped when the question is refused or the
+    answer came from the cache.
+    """
+    if not state.get("is_safe") or state.get("is_cache_hit"):
+        return {"context": [], "sources_used": 0}
+
+    ranked = (state.get("retrieved") or [])[:_RETRIEVE_K]
+
+    # Annotate each doc with relevance level and date
+    annotated = []
+    for content, score, date_str in ranked:
+        if score > 0.5:
+            label = "[높은 관련성]"
+        elif score >= 0.35:
+            label = "[관련성 있음]"
+        else:
+            label = "[낮은 관련성]"
+        annotated.append(f"{label} [{date_str}]\n{content}")
+
+    return {
+        "context": annotated,
+        "sources_used": len(ranked),
+    }
 
 
 # ── Node: generate ───────────────────────────────────────────────────
@@ -242,8 +388,10 @@ async def generate(state: AgentState) -> dict:
     """Generate an answer using GPT-4o with persona prompt + conversation memory.
 
     Memory management:
-      1. ``trim_and_summarize`` compresses old messages into a summary
-      2. Recent 2 Q&A pairs are kept verbatim
+      1. ``summary`` holds older turns; it is folded in the background
+         after each turn (``memory.schedule_summary_update``), never here
+      2. Recent 2 Q&A pairs are kept verbatim (a few more while a fold
+         is still pending)
       3. Token cost is bounded at ~400-700 regardless of conversation length
     """
     # Skip if rule already matched
@@ -252,30 +400,26 @@ async def generate(state: AgentState) -> dict:
 
     rules = state.get("rules", [])
     context = state.get("context", [])
-    workspace_id = state.get("workspace_id", "")
-
-    persona = get_persona_profile(workspace_id) if workspace_id else ""
-
-    # Look up decision-maker name for self-identity in prompt
-    dm_name = ""
-    if workspace_id:
-        dm_name = _get_decision_maker_name(workspace_id)
 
+    # Persona and decision-maker name come from the WorkspaceContext snapshot
+    # loaded once per question by generate_answer
     system_prompt = build_system_prompt(
-        rules, context, persona=persona, decision_maker_name=dm_name,
+        rules,
+        context,
+        persona=state.get("persona", ""),
+        decision_maker_name=state.get("decision_maker_name", ""),
     )
 
-    # Trim conversation history for token efficiency
-    raw_messages = state.get("messages", [])
-    trimmed = await trim_and_summarize(raw_messages, max_recent_pairs=2)
-
-    # Build final message list: system prompt + trimmed memory + current question
+    # Build final message list: system prompt + summary + window (incl. question)
+    history = build_history(
+        state.get("summary", ""), recent_window(state.get("messages", [])),
+    )
     messages = [
         {"role": "system", "content": system_prompt},
-        *_to_openai_messages(trimmed),
+        *_to_openai_messages(history),
     ]
 
-    llm = _get_llm()
+    llm = get_chat_model(_ANSWER_MODEL, temperature=0.3)
 
     # Check for streaming callback
     on_chunk = streaming_callback.get(None)
@@ -287,7 +431,10 @@ async def generate(state: AgentState) -> dict:
             async for chunk in llm.astream(messages):
                 if hasattr(chunk, "content") and chunk.content:
                     answer_chunks.append(chunk.content)
-                    on_chunk("".join(answer_chunks))
+                    # on_chunk may be sync or async (Slack handler updates)
+                    pending = on_chunk("".join(answer_chunks))
+                    if inspect.isawaitable(pending):
+                        await pending
             answer_text = "".join(answer_chunks)
         else:
             # Non-streaming mode (backward compatible)
@@ -307,10 +454,5 @@ async def generate(state: AgentState) -> dict:
 
 def refuse_answer(state: AgentState) -> dict:
     """Refuse to answer prohibited-domain questions."""
-    return {
-        "answer": (
-            "죄송합니다. 이 주제는 법적·재무적·운영상 판단이 필요한 영역으로, "
-            "AI가 답변을 제공할 수 없습니다. 직접 의사결정자에게 문의해 주세요."
-        ),
-    }
+    return {"answer": REFUSAL_ANSWER}
 
@@ -6,11 +6,11 @@ for analysis, and caches the resulting persona profile in Redis.
 
 import logging
 
-from langchain_openai import ChatOpenAI
-
-from src.config import settings
+from src.services.ai.llm import get_chat_model
+from src.services.ai.rate_limit import BULK, llm_priority
 from src.services.ai.vector_store import search_similar
 from src.services.redis_client import set_persona_profile
+from src.services.workspace_context import invalidate_workspace_context
 
 logger = logging.getLogger(__name__)
 
@@ -64,7 +64,8 @@ def extract_persona(workspace_id: str) -> str:
 
     for query in _SAMPLE_QUERIES:
         try:
-            results = search_similar(workspace_id=workspace_id, query=query, k=5)
+            with llm_priority(BULK):
+                results = search_similar(workspace_id=workspace_id, query=query, k=5)
             for content, _score, _date in results:
                 if content not in seen:
                     seen.add(content)
@@ -82,15 +83,11 @@ def extract_persona(workspace_id: str) -> str:
 
     # 2. Analyze with GPT-4o-mini
     try:
-        llm = ChatOpenAI(
-            model="gpt-4o-mini",
-            temperature=0,
-            max_tokens=1200,
-            api_key=settings.openai_api_key,
-        )
-        response = llm.invoke([
-            {"role": "user", "content": _PERSONA_ANALYSIS_PROMPT.format(messages=messages_text)},
-        ])
+        llm = get_chat_model("gpt-4o-mini", max_tokens=1200)
+        with llm_priority(BULK):
+            response = llm.invoke([
+                {"role": "user", "content": _PERSONA_ANALYSIS_PROMPT.format(messages=messages_text)},
+            ])
         persona_profile = response.content.strip()
     except Exception:
         logger.exception("Persona analysis LLM call failed (workspace %s)", workspace_id)
@@ -99,6 +96,7 @@ def extract_persona(workspace_id: str) -> str:
     # 3. Cache in Redis
     try:
         set_persona_profile(workspace_id, persona_profile)
+        invalidate_workspace_context(workspace_id)
     except Exception:
         logger.exception("Failed to cache persona profile in Redis (workspace %s)", workspace_id)
 
@@ -0,0 +1,232 @@
+"""Distributed OpenAI rate limiter — per-model RPM/TPM token buckets in Redis.
+
+The web process (answers), the Celery workers (contextualization,
+embeddings, persona) and the beat tasks all draw from the same org
+budget, so the buckets live in Redis (DB2) and every process takes from
+them through one Lua script, which refills and debits both buckets
+atomically using the Redis server clock:
+
+  - ``ratelimit:{model}:requests`` — capacity ``llm_rpm_limits[model]``
+  - ``ratelimit:{model}:tokens``   — capacity ``llm_tpm_limits[model]``
+
+Callers estimate a request's tokens (``estimate_tokens``; prompt plus
+``max_tokens``) before acquiring.  The shared clients in ``llm`` do this
+for every call.
+
+Priority: interactive traffic (answers, the default) may drain the
+buckets; bulk traffic (mark it with ``llm_priority(BULK)``) only takes
+while more than ``llm_bulk_reserve_fraction`` of each bucket is left, so
+a large ingestion cannot starve live answers.  Waits are capped per
+priority; past the cap the call proceeds anyway (the SDK still retries
+429s).  If Redis is unavailable the limiter fails open.
+"""
+
+import asyncio
+import contextvars
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable
+
+from src.config import settings
+from src.services.redis_client import RedisManager
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+_priority: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "llm_priority", default=INTERACTIVE,
+)
+
+_BUCKET_TTL = 120  # a full refill takes 60s; idle buckets expire
+_MAX_SLEEP = 1.0  # re-check at least this often while waiting
+
+# KEYS: request bucket, token bucket
+# ARGV: rpm, tpm, estimated tokens, reserve fraction
+# Returns "0" once both buckets were debited, else the seconds to wait.
+_ACQUIRE_LUA = """
+redis.replicate_commands()
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local rpm, tpm = tonumber(ARGV[1]), tonumber(ARGV[2])
+local cost = math.min(tonumber(ARGV[3]), tpm)
+local reserve = tonumber(ARGV[4])
+
+local function level(key, capacity)
+    local b = redis.call('HMGET', key, 'level', 'ts')
+    local lvl, ts = tonumber(b[1]), tonumber(b[2])
+    if lvl == nil or ts == nil then return capacity end
+    return math.min(capacity, lvl + math.max(now - ts, 0) * capacity / 60)
+end
+
+local req = level(KEYS[1], rpm)
+local tok = level(KEYS[2], tpm)
+local wait = 0
+if req < 1 + reserve * rpm then
+    wait = math.max(wait, (1 + reserve * rpm - req) * 60 / rpm)
+end
+if tok < cost + reserve * tpm then
+    wait = math.max(wait, (cost + reserve * tpm - tok) * 60 / tpm)
+end
+if wait == 0 then
+    req = req - 1
+    tok = tok - cost
+end
+redis.call('HSET', KEYS[1], 'level', req, 'ts', now)
+redis.call('HSET', KEYS[2], 'level', tok, 'ts', now)
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+redis.call('EXPIRE', KEYS[2], ARGV[5])
+return tostring(wait)
+"""
+
+_scripts: dict[int, object] = {}  # id(redis client) -> registered script
+_stats: dict[tuple[str, str], dict] = {}
+_lock = threading.Lock()
+
+
+@contextmanager
+def llm_priority(priority: str):
+    """Run the enclosed LLM calls at ``priority`` (``INTERACTIVE`` or ``BULK``)."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def estimate_tokens(texts: Iterable[str]) -> int:
+    """Rough token count for rate limiting (~4 UTF-8 bytes per token).
+
+    Errs high for Korean (3 bytes per syllable, ~1 token), which is the
+    safe side for a limiter.
+    """
+    return sum(len(text.encode("utf-8")) // 4 + 1 for text in texts)
+
+
+def _limits(model: str) -> tuple[int, int] | None:
+    rpm = settings.llm_rpm_limits.get(model)
+    tpm = settings.llm_tpm_limits.get(model)
+    if not settings.llm_rate_limit_enabled or not rpm or not tpm:
+        return None
+    return rpm, tpm
+
+
+def _script_args(model: str, tokens: int, priority: str, limits: tuple[int, int]):
+    rpm, tpm = limits
+    reserve = settings.llm_bulk_reserve_fraction if priority == BULK else 0.0
+    keys = [f"ratelimit:{model}:requests", f"ratelimit:{model}:tokens"]
+    return keys, [rpm, tpm, tokens, reserve, _BUCKET_TTL]
+
+
+def _max_wait(priority: str) -> float:
+    if priority == BULK:
+        return settings.llm_bulk_max_wait_seconds
+    return settings.llm_interactive_max_wait_seconds
+
+
+def _script(client):
+    script = _scripts.get(id(client))
+    if script is None or script[0] is not client:
+        script = _scripts[id(client)] = (client, client.register_script(_ACQUIRE_LUA))
+    return script[1]
+
+
+def _sleep_for(wait: float, remaining: float) -> float:
+    return max(0.0, min(wait, _MAX_SLEEP, remaining)) * random.uniform(0.9, 1.1)
+
+
+async def aacquire(model: str, tokens: int) -> float:
+    """Take one request and ``tokens`` tokens from ``model``'s buckets.
+
+    Waits (on the event loop) until both buckets allow it at the current
+    priority.  Returns the seconds spent waiting.
+    """
+    limits = _limits(model)
+    if limits is None:
+        return 0.0
+    priority = _priority.get()
+    keys, args = _script_args(model, tokens, priority, limits)
+    started = time.monotonic()
+    deadline = started + _max_wait(priority)
+    try:
+        script = _script(RedisManager.get_async_cache())
+        while True:
+            wait = float(await script(keys=keys, args=args))
+            now = time.monotonic()
+            if wait <= 0:
+                return _record(model, priority, now - started)
+            if now >= deadline:
+                return _record(model, priority, now - started, timed_out=True)
+            await asyncio.sleep(_sleep_for(wait, deadline - now))
+    except Exception:
+        logger.warning("Rate limiter unavailable for %s, proceeding unthrottled", model)
+        return _record(model, priority, time.monotonic() - started, failed=True)
+
+
+def acquire(model: str, tokens: int) -> float:
+    """Blocking ``aacquire`` for sync callers (Celery tasks)."""
+    limits = _limits(model)
+    if limits is None:
+        return 0.0
+    priority = _priority.get()
+    keys, args = _script_args(model, tokens, priority, limits)
+    started = time.monotonic()
+    deadline = started + _max_wait(priority)
+    try:
+        script = _script(RedisManager.get_cache())
+        while True:
+            wait = float(script(keys=keys, args=args))
+            now = time.monotonic()
+            if wait <= 0:
+                return _record(model, priority, now - started)
+            if now >= deadline:
+                return _record(model, priority, now - started, timed_out=True)
+            time.sleep(_sleep_for(wait, deadline - now))
+    except Exception:
+        logger.warning("Rate limiter unavailable for %s, proceeding unthrottled", model)
+        return _record(model, priority, time.monotonic() - started, failed=True)
+
+
+def _record(
+    model: str, priority: str, waited: float, *,
+    timed_out: bool = False, failed: bool = False,
+) -> float:
+    with _lock:
+        stats = _stats.get((model, priority))
+        if stats is None:
+            stats = _stats[(model, priority)] = {
+                "acquired": 0, "throttled": 0, "timed_out": 0, "failed_open": 0,
+                "wait_seconds_total": 0.0, "wait_seconds_max": 0.0,
+            }
+        stats["acquired"] += 1
+        stats["wait_seconds_total"] += waited
+        stats["wait_seconds_max"] = max(stats["wait_seconds_max"], waited)
+        if waited > 0.01:
+            stats["throttled"] += 1
+        if timed_out:
+            stats["timed_out"] += 1
+        if failed:
+            stats["failed_open"] += 1
+    if timed_out:
+        logger.warning(
+            "Rate limit wait for %s (%s) exceeded %.0fs, proceeding", model, priority, waited,
+        )
+    elif waited > 1.0:
+        logger.info("Rate limited %s (%s) for %.1fs", model, priority, waited)
+    return waited
+
+
+def get_rate_limit_stats() -> dict:
+    """Per model and priority: acquisitions, throttled calls and wait times."""
+    with _lock:
+        snapshot = {key: dict(stats) for key, stats in _stats.items()}
+    result: dict[str, dict] = {}
+    for (model, priority), stats in snapshot.items():
+        stats["avg_wait_seconds"] = round(stats.pop("wait_seconds_total") / stats["acquired"], 4)
+        stats["wait_seconds_max"] = round(stats["wait_seconds_max"], 4)
+        result.setdefault(model, {})[priority] = stats
+    return result
@@ -1,7 +1,7 @@
 """LangGraph agent state definition for the RAG pipeline."""
 
 import contextvars
-from typing import Annotated, TypedDict
+from typing import Annotated, Optional, TypedDict
 
 from langchain_core.messages import BaseMessage
 from langgraph.graph.message import add_messages
@@ -14,6 +14,48 @@ streaming_callback: contextvars.ContextVar = contextvars.ContextVar(
 )
 
 
+# Per-turn fields: set in every invocation's inputs (see generate_answer),
+# so they are not persisted in checkpoints (see compact_saver).  Only the
+# conversation (messages, summary, last_turn_at) and workspace_id carry
+# across turns.
+TRANSIENT_FIELDS = frozenset({
+    "question",
+    "rules",
+    "persona",
+    "decision_maker_name",
+    "answer",
+    "context",
+    "sources_used",
+    "retrieved",
+    "question_embedding",
+    "is_cache_hit",
+    "matched_rule",
+    "safety_checked",
+    "is_safe",
+    "is_high_risk",
+    "is_prohibited",
+    "is_rule_matched",
+})
+
+
+Hit = tuple[str, float, str]  # (content, final_score, date_str)
+
+
+def merge_hits(current: list[Hit], update: Optional[list[Hit]]) -> list[Hit]:
+    """Reducer for ``retrieved``: merge search hits by content, keeping the best score.
+
+    The parallel retrieval branches each add their hits as they finish;
+    ``None`` resets the list (every invocation's inputs start with it).
+    """
+    if update is None:
+        return []
+    best = {content: (content, score, date) for content, score, date in current or []}
+    for content, score, date in update:
+        if content not in best or score > best[content][1]:
+            best[content] = (content, score, date)
+    return sorted(best.values(), key=lambda hit: hit[1], reverse=True)
+
+
 class AgentState(TypedDict):
     """State that flows through the RAG pipeline nodes.
 
@@ -25,18 +67,31 @@ class AgentState(TypedDict):
     # Conversation
     messages: Annotated[list[BaseMessage], add_messages]
     question: str
+    summary: str  # rolling summary of turns that left the window (checkpointed)
+    last_turn_at: float  # epoch seconds of the previous turn (checkpointed)
 
     # Multi-tenant context
     workspace_id: str
     rules: list[dict]  # active rules from DB: [{"id": int, "rule_text": str}]
+    persona: str  # from the WorkspaceContext snapshot
+    decision_maker_name: str
 
     # Output
     answer: str
 
     # Retrieval context
+    retrieved: Annotated[list[Hit], merge_hits]  # raw hits from the parallel branches
     context: list[str]
     sources_used: int
 
+    # Semantic answer cache
+    question_embedding: list[float]  # reused as the cache key in qa_history
+    is_cache_hit: bool
+
+    # Screening (rules + safety) — done once per question, see check_rules
+    matched_rule: str
+    safety_checked: bool
+
     # Flags
     is_safe: bool
     is_high_risk: bool
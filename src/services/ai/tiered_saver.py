@@ -0,0 +1,519 @@
+"""Tiered checkpointer — Redis hot tier with write-behind to Postgres.
+
+Active DM threads are read and written on every turn.  ``TieredCheckpointSaver``
+keeps the latest checkpoint of each thread in Redis (cache DB, key
+``ckpt:{thread_id}:{checkpoint_ns}``, ``settings.checkpoint_hot_ttl_seconds``)
+so a turn never waits on Postgres for memory:
+
+  - Reads of the latest checkpoint are served from Redis; on a miss (or for
+    an older checkpoint id) they fall back to Postgres and warm Redis.
+  - Checkpoints (and the pending writes attached to the latest one, e.g.
+    from ``aupdate_state``) go to Redis and are flushed to Postgres in the
+    background after ``settings.checkpoint_flush_delay_seconds``; several
+    writes to the same thread within that delay are coalesced into one.
+  - A flush writes only the channels that changed since the last flush.
+  - Unflushed state is written on shutdown (``aflush``) and before anything
+    that reads Postgres directly (``alist``, older checkpoints, deletes).
+    Threads still in the ``ckpt:dirty`` set after a crash are flushed by
+    ``recover`` on the next startup.  Unflushed hot copies have no TTL
+    (it is set once they are flushed), so they cannot expire before that;
+    the cache DB's ``maxmemory-policy`` must be ``volatile-*`` or
+    ``noeviction`` for Redis not to evict them either.
+  - Deleting a thread (``adelete_thread`` here, ``mark_threads_deleted``
+    for deletes elsewhere, e.g. GC) leaves a ``ckpt:deleted:{thread_id}``
+    tombstone; a write-behind of state older than the tombstone is dropped
+    instead of restoring the thread in Postgres.
+
+If Redis is unavailable, writes go straight through to Postgres.  The hot
+copy left behind is then older than Postgres, so it is deleted (retried in
+the background until Redis accepts it; the thread is read from Postgres
+here meanwhile) before any process — another web worker, the Celery
+worker, this one after a restart — can continue from it.  The delete is
+conditional (``_DROP_STALE_LUA``), so it never removes a newer hot copy.
+Imported lazily (see ``memory._import_checkpoint_deps``).
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, NamedTuple, Optional
+
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    CheckpointTuple,
+    get_checkpoint_id,
+)
+
+from src.config import settings
+from src.services.ai.compact_saver import strip_transient
+from src.services.ai.state import TRANSIENT_FIELDS
+from src.services.redis_client import RedisManager
+
+logger = logging.getLogger(__name__)
+
+_DIRTY_SET = "ckpt:dirty"
+_MAX_FLUSH_BACKOFF = 60.0
+_TOMBSTONE_TTL = 86400  # outlives any write-behind pending when a thread is deleted
+
+# Drop the hot copy unless it is newer than the checkpoint written through
+# (checkpoint ids are time-ordered); a copy without an id predates the field
+_DROP_STALE_LUA = """
+local id = redis.call('HGET', KEYS[1], 'checkpoint_id')
+if id and id > ARGV[1] then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+redis.call('SREM', KEYS[2], ARGV[2])
+return 1
+"""
+_scripts: dict[int, tuple] = {}  # id(redis client) -> (client, registered drop script)
+
+
+def hot_key(thread_id: str, checkpoint_ns: str = "") -> str:
+    return f"ckpt:{thread_id}:{checkpoint_ns}"
+
+
+def tombstone_key(thread_id: str) -> str:
+    return f"ckpt:deleted:{thread_id}"
+
+
+def _queue_deletion(pipe, thread_ids: list[str]) -> None:
+    """Tombstone the threads and drop their hot copies (on a Redis pipeline)."""
+    deleted_at = str(time.time())
+    for thread_id in thread_ids:
+        pipe.set(tombstone_key(thread_id), deleted_at, ex=_TOMBSTONE_TTL)
+        pipe.delete(hot_key(thread_id))
+        pipe.srem(_DIRTY_SET, json.dumps([thread_id, ""]))
+
+
+def mark_threads_deleted(thread_ids: list[str]) -> None:
+    """Drop the threads from the hot tier so no pending write-behind restores them.
+
+    For deletes that bypass the saver (GC, workspace clears), possibly in
+    another process.  Blocking (sync Redis client).
+    """
+    try:
+        pipe = RedisManager.get_cache().pipeline(transaction=True)
+        _queue_deletion(pipe, thread_ids)
+        pipe.execute()
+    except Exception:
+        logger.warning("Failed to drop hot checkpoints for %d threads", len(thread_ids))
+
+
+def _drop_stale_script(client):
+    script = _scripts.get(id(client))
+    if script is None or script[0] is not client:
+        script = _scripts[id(client)] = (client, client.register_script(_DROP_STALE_LUA))
+    return script[1]
+
+
+def _merge_versions(older: Optional[dict], newer: Optional[dict]) -> Optional[dict]:
+    if older is None or newer is None:
+        return None
+    return {**older, **newer}
+
+
+def _thread_key(config: dict) -> tuple[str, str]:
+    configurable = config["configurable"]
+    return configurable["thread_id"], configurable.get("checkpoint_ns", "")
+
+
+class _Pending(NamedTuple):
+    config: dict  # the config ``aput`` was called with (parent checkpoint id)
+    checkpoint: dict
+    metadata: dict
+    writes: list  # [(task_id, channel, value)] for this checkpoint
+    new_versions: Optional[dict]  # channels changed since the last flush (None: all)
+    written_at: float  # time.time() of the latest write, checked against tombstones
+
+
+class TieredCheckpointSaver(BaseCheckpointSaver):
+    """Redis-first checkpointer in front of a Postgres saver (``cold``)."""
+
+    def __init__(self, cold: BaseCheckpointSaver) -> None:
+        super().__init__(serde=cold.serde)
+        self.cold = cold
+        # (thread_id, ns) -> _Pending not yet in Postgres
+        self._pending: dict[tuple[str, str], _Pending] = {}
+        self._flush_tasks: dict[tuple[str, str], asyncio.Task] = {}
+        # Threads written through to Postgres while Redis failed -> the
+        # checkpoint id written: their hot copy (if any) is stale until it is
+        # dropped (``_drop_stale_later``) or overwritten
+        self._cold_only: dict[tuple[str, str], str] = {}
+        self._stale_tasks: dict[tuple[str, str], asyncio.Task] = {}
+        # Latest checkpoint id known to be in Postgres with all its channels
+        self._flushed: dict[tuple[str, str], str] = {}
+        self._stats = {
+            "hot_hits": 0,
+            "cold_reads": 0,
+            "flushes": 0,
+            "flush_errors": 0,
+            "write_through": 0,
+        }
+
+    def get_next_version(self, current, channel):
+        return self.cold.get_next_version(current, channel)
+
+    # ── Reads ────────────────────────────────────────────────────────
+
+    async def aget_tuple(self, config) -> Optional[CheckpointTuple]:
+        thread_id, ns = _thread_key(config)
+        wanted = get_checkpoint_id(config)
+
+        hot = None
+        if (thread_id, ns) not in self._cold_only:
+            hot = await self._read_hot(thread_id, ns)
+        if hot is not None and (
+            wanted is None or hot.config["configurable"]["checkpoint_id"] == wanted
+        ):
+            self._stats["hot_hits"] += 1
+            return hot
+
+        self._stats["cold_reads"] += 1
+        cold = await self.cold.aget_tuple(config)
+        if cold is not None and wanted is None and hot is None:
+            parent_id = (cold.parent_config or {}).get("configurable", {}).get("checkpoint_id")
+            if await self._write_hot(
+                thread_id, ns, cold.checkpoint, cold.metadata, parent_id,
+                cold.pending_writes or [], dirty=False,
+            ):
+                self._cold_only.pop((thread_id, ns), None)
+                self._flushed[(thread_id, ns)] = cold.checkpoint["id"]
+        return cold
+
+    async def alist(
+        self,
+        config,
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before=None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        if config is not None:
+            await self.aflush(config["configurable"]["thread_id"])
+        else:
+            await self.aflush()
+        async for item in self.cold.alist(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def aget_delta_channel_history(self, *, config, channels):
+        await self.aflush(config["configurable"]["thread_id"])
+        return await self.cold.aget_delta_channel_history(config=config, channels=channels)
+
+    # ── Writes ───────────────────────────────────────────────────────
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        thread_id, ns = _thread_key(config)
+        checkpoint, new_versions = strip_transient(checkpoint, new_versions)
+        parent_id = config["configurable"].get("checkpoint_id")
+
+        key = (thread_id, ns)
+        if not await self._write_hot(
+            thread_id, ns, checkpoint, metadata, parent_id, [], dirty=True,
+        ):
+            self._stats["write_through"] += 1
+            self._mark_cold_only(key, checkpoint["id"])
+            await self.aflush(thread_id)  # keep Postgres writes in order
+            return await self.cold.aput(config, checkpoint, metadata, new_versions)
+
+        self._cold_only.pop(key, None)
+        previous = self._pending.get(key)
+        if previous is not None:
+            new_versions = _merge_versions(previous.new_versions, new_versions)
+        self._pending[key] = _Pending(
+            config, checkpoint, metadata, [], new_versions, time.time(),
+        )
+        self._schedule_flush(key)
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        thread_id, ns = _thread_key(config)
+        key = (thread_id, ns)
+        writes = [(ch, v) for ch, v in writes if ch not in TRANSIENT_FIELDS]
+        if not writes:
+            return
+
+        pending = self._pending.get(key)
+        if pending is None and key not in self._cold_only:
+            hot = await self._read_hot(thread_id, ns)
+            if hot is not None:
+                parent = hot.parent_config or {
+                    "configurable": {"thread_id": thread_id, "checkpoint_ns": ns},
+                }
+                # Only the writes are new, unless another process left it unflushed
+                clean = self._flushed.get(key) == hot.checkpoint["id"]
+                pending = _Pending(
+                    parent, hot.checkpoint, hot.metadata, list(hot.pending_writes or []),
+                    {} if clean else None, time.time(),
+                )
+
+        # Writes for the latest (hot) checkpoint stay in Redis with it; writes
+        # for anything older go to Postgres after flushing the thread.
+        if pending is None or pending.checkpoint["id"] != get_checkpoint_id(config):
+            await self.aflush(thread_id)
+            await self.cold.aput_writes(config, writes, task_id, task_path)
+            return
+
+        merged = pending.writes + [(task_id, ch, v) for ch, v in writes]
+        parent_id = pending.config["configurable"].get("checkpoint_id")
+        if not await self._write_hot(
+            thread_id, ns, pending.checkpoint, pending.metadata, parent_id, merged, dirty=True,
+        ):
+            self._mark_cold_only(key, pending.checkpoint["id"])
+            await self.aflush(thread_id)
+            await self.cold.aput_writes(config, writes, task_id, task_path)
+            return
+
+        self._pending[key] = pending._replace(writes=merged, written_at=time.time())
+        self._schedule_flush(key)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        # Tombstone first: flushes in other processes check it
+        await self._mark_deleted(thread_id)
+        for key in [k for k in self._pending if k[0] == thread_id]:
+            self._pending.pop(key, None)
+        for key in [k for k in self._flushed if k[0] == thread_id]:
+            self._flushed.pop(key, None)
+        tasks = [
+            self._flush_tasks.pop(key)
+            for key in [k for k in self._flush_tasks if k[0] == thread_id]
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.cold.adelete_thread(thread_id)
+
+    # ── Stale hot copies ─────────────────────────────────────────────
+
+    def _mark_cold_only(self, key: tuple[str, str], checkpoint_id: str) -> None:
+        self._cold_only[key] = max(checkpoint_id, self._cold_only.get(key, ""))
+        task = self._stale_tasks.get(key)
+        if task is None or task.done():
+            self._stale_tasks[key] = asyncio.get_running_loop().create_task(
+                self._drop_stale_later(key),
+            )
+
+    async def _drop_stale_later(self, key: tuple[str, str]) -> None:
+        """Delete the stale hot copy, retrying until Redis takes it."""
+        delay = settings.checkpoint_flush_delay_seconds
+        while key in self._cold_only:
+            checkpoint_id = self._cold_only[key]
+            if await self._drop_stale(key, checkpoint_id):
+                if self._cold_only.get(key) == checkpoint_id:
+                    del self._cold_only[key]
+                break
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, _MAX_FLUSH_BACKOFF)
+        self._stale_tasks.pop(key, None)
+
+    async def _drop_stale(self, key: tuple[str, str], checkpoint_id: str) -> bool:
+        try:
+            script = _drop_stale_script(RedisManager.get_async_binary_cache())
+            await script(
+                keys=[hot_key(*key), _DIRTY_SET], args=[checkpoint_id, json.dumps(list(key))],
+            )
+            return True
+        except Exception:
+            logger.warning("Stale hot checkpoint delete failed for %s; retrying", key[0])
+            return False
+
+    # ── Write-behind ─────────────────────────────────────────────────
+
+    def _schedule_flush(self, key: tuple[str, str]) -> None:
+        task = self._flush_tasks.get(key)
+        if task is None or task.done():
+            self._flush_tasks[key] = asyncio.get_running_loop().create_task(
+                self._flush_later(key),
+            )
+
+    async def _flush_later(self, key: tuple[str, str]) -> None:
+        delay = settings.checkpoint_flush_delay_seconds
+        while key in self._pending:
+            await asyncio.sleep(delay)
+            if not await self._flush(key):
+                delay = min(delay * 2, _MAX_FLUSH_BACKOFF)
+        self._flush_tasks.pop(key, None)
+
+    async def _flush(self, key: tuple[str, str]) -> bool:
+        entry = self._pending.pop(key, None)
+        if entry is None:
+            return True
+        thread_id = key[0]
+        if await self._deleted_since(thread_id, entry.written_at):
+            logger.info("Dropped write-behind of deleted thread %s", thread_id)
+            return True
+
+        versions = entry.new_versions
+        if versions is None:
+            versions = dict(entry.checkpoint["channel_versions"])
+        try:
+            next_config = await self.cold.aput(
+                entry.config, entry.checkpoint, entry.metadata, versions,
+            )
+            by_task: dict[str, list] = {}
+            for task_id, channel, value in entry.writes:
+                by_task.setdefault(task_id, []).append((channel, value))
+            for task_id, task_writes in by_task.items():
+                await self.cold.aput_writes(next_config, task_writes, task_id)
+        except Exception:
+            logger.exception("Checkpoint flush failed for thread %s", thread_id)
+            self._stats["flush_errors"] += 1
+            newer = self._pending.get(key)
+            if newer is None:
+                self._pending[key] = entry
+            else:  # superseded: the newer state must also write these channels
+                self._pending[key] = newer._replace(
+                    new_versions=_merge_versions(entry.new_versions, newer.new_versions),
+                )
+            return False
+
+        if await self._deleted_since(thread_id, entry.written_at):
+            # Deleted while the write was in flight: undo it
+            await self.cold.adelete_thread(thread_id)
+            return True
+        self._stats["flushes"] += 1
+        self._flushed[key] = entry.checkpoint["id"]
+        if key not in self._pending:
+            await self._mark_clean(key)
+        return True
+
+    async def aflush(self, thread_id: Optional[str] = None) -> None:
+        """Write pending checkpoints (of one thread, or all) to Postgres now."""
+        keys = [k for k in self._pending if thread_id is None or k[0] == thread_id]
+        for key in keys:
+            await self._flush(key)
+
+    async def recover(self) -> int:
+        """Flush threads left dirty in Redis by a process that died before flushing."""
+        cache = RedisManager.get_async_binary_cache()
+        try:
+            members = await cache.smembers(_DIRTY_SET)
+        except Exception:
+            logger.warning("Checkpoint hot tier unavailable, skipping recovery")
+            return 0
+
+        recovered = 0
+        for member in members:
+            thread_id, ns = json.loads(member)
+            hot = await self._read_hot(thread_id, ns)
+            if hot is not None:
+                parent = hot.parent_config or {
+                    "configurable": {"thread_id": thread_id, "checkpoint_ns": ns},
+                }
+                self._pending[(thread_id, ns)] = _Pending(
+                    parent, hot.checkpoint, hot.metadata, list(hot.pending_writes or []),
+                    None, time.time(),
+                )
+                if await self._flush((thread_id, ns)):
+                    recovered += 1
+            else:
+                await cache.srem(_DIRTY_SET, member)
+        if recovered:
+            logger.info("Recovered %d unflushed checkpoint threads", recovered)
+        return recovered
+
+    # ── Redis I/O ────────────────────────────────────────────────────
+
+    async def _read_hot(self, thread_id: str, ns: str) -> Optional[CheckpointTuple]:
+        try:
+            data = await RedisManager.get_async_binary_cache().hgetall(hot_key(thread_id, ns))
+        except Exception:
+            logger.warning("Checkpoint hot tier read failed for %s", thread_id)
+            return None
+        if not data:
+            return None
+
+        checkpoint = self.serde.loads_typed((data[b"ctype"].decode(), data[b"checkpoint"]))
+        metadata = self.serde.loads_typed((data[b"mtype"].decode(), data[b"metadata"]))
+        writes = []
+        if b"writes" in data:
+            writes = self.serde.loads_typed((data[b"wtype"].decode(), data[b"writes"]))
+        parent_id = data.get(b"parent_id", b"").decode()
+        base = {"thread_id": thread_id, "checkpoint_ns": ns}
+        return CheckpointTuple(
+            config={"configurable": {**base, "checkpoint_id": checkpoint["id"]}},
+            checkpoint=checkpoint,
+            metadata=metadata,
+            parent_config=(
+                {"configurable": {**base, "checkpoint_id": parent_id}} if parent_id else None
+            ),
+            pending_writes=[tuple(w) for w in writes],
+        )
+
+    async def _write_hot(
+        self,
+        thread_id: str,
+        ns: str,
+        checkpoint: dict,
+        metadata: dict,
+        parent_id: Optional[str],
+        writes: list,
+        *,
+        dirty: bool,
+    ) -> bool:
+        ctype, cdata = self.serde.dumps_typed(checkpoint)
+        mtype, mdata = self.serde.dumps_typed(metadata)
+        wtype, wdata = self.serde.dumps_typed([list(w) for w in writes])
+        key = hot_key(thread_id, ns)
+        try:
+            pipe = RedisManager.get_async_binary_cache().pipeline(transaction=True)
+            pipe.delete(key)
+            pipe.hset(key, mapping={
+                "checkpoint_id": checkpoint["id"],
+                "ctype": ctype,
+                "checkpoint": cdata,
+                "mtype": mtype,
+                "metadata": mdata,
+                "parent_id": parent_id or "",
+                "wtype": wtype,
+                "writes": wdata,
+            })
+            if dirty:  # no TTL until flushed (see _mark_clean)
+                pipe.sadd(_DIRTY_SET, json.dumps([thread_id, ns]))
+            else:
+                pipe.expire(key, settings.checkpoint_hot_ttl_seconds)
+            await pipe.execute()
+            return True
+        except Exception:
+            logger.warning("Checkpoint hot tier write failed for %s", thread_id)
+            return False
+
+    async def _mark_clean(self, key: tuple[str, str]) -> None:
+        try:
+            pipe = RedisManager.get_async_binary_cache().pipeline(transaction=True)
+            pipe.srem(_DIRTY_SET, json.dumps(list(key)))
+            pipe.expire(hot_key(*key), settings.checkpoint_hot_ttl_seconds)
+            await pipe.execute()
+        except Exception:
+            pass
+
+    async def _mark_deleted(self, thread_id: str) -> None:
+        try:
+            pipe = RedisManager.get_async_binary_cache().pipeline(transaction=True)
+            _queue_deletion(pipe, [thread_id])
+            await pipe.execute()
+        except Exception:
+            logger.warning("Checkpoint hot tier delete failed for %s", thread_id)
+
+    async def _deleted_since(self, thread_id: str, written_at: float) -> bool:
+        """Whether the thread was deleted after state written at ``written_at``."""
+        try:
+            deleted_at = await RedisManager.get_async_binary_cache().get(tombstone_key(thread_id))
+        except Exception:
+            return False
+        return deleted_at is not None and float(deleted_at) >= written_at
+
+    def get_stats(self) -> dict:
+        reads = self._stats["hot_hits"] + self._stats["cold_reads"]
+        return {
+            **self._stats,
+            "pending": len(self._pending),
+            "hot_hit_ratio": round(self._stats["hot_hits"] / reads, 4) if reads else 0.0,
+        }
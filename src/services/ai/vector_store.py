@@ -1,4 +1,9 @@
-"""pgvector search and storage using the existing Embedding ORM model."""
+"""pgvector search and storage using the existing Embedding ORM model.
+
+Each operation has a sync variant (Celery tasks, scripts) and an async
+variant (``a``-prefixed) for the LangGraph nodes, which run on the event
+loop and must not block it.  Both share the same SQL.
+"""
 
 import logging
 import uuid as uuid_mod
@@ -7,12 +12,249 @@ from datetime import datetime, timezone
 from sqlalchemy import text as sa_text
 from sqlalchemy.orm import Session
 
-from src.services.db.connection import get_db
+from src.config import settings
+from src.services.db.ann_index import (
+    abinary_column_available,
+    arecord_ingested,
+    binary_column_available,
+    asearch_profile,
+    index_gucs,
+    profile_rows,
+    record_ingested,
+    search_profile,
+)
+from src.services.db.connection import get_async_db, get_db
+from src.services.db.embedding_storage import cast_type
 from src.services.db.models import Embedding
-from src.services.ai.embeddings import embed_text, embed_texts
+from src.services.ai.embeddings import (
+    aembed_query_texts,
+    aembed_text,
+    aembed_texts,
+    embed_query_texts,
+    embed_text,
+    embed_texts,
+)
 
 logger = logging.getLogger(__name__)
 
+# Combined score = similarity * time_weight
+# time_weight = 1 / (1 + 0.1 * ln(age_days + 1))
+#   - 1 day old  → weight ≈ 0.94
+#   - 30 days    → weight ≈ 0.77
+#   - 180 days   → weight ≈ 0.66
+#   - 365 days   → weight ≈ 0.60
+_TIME_WEIGHT_SQL = """
+    1.0 / (1.0 + 0.1 * LN(
+        GREATEST(EXTRACT(EPOCH FROM (NOW() - created_at)) / 86400.0, 0) + 1
+    ))
+"""
+
+# Two-stage search: the candidate stage orders by the raw cosine distance
+# (``embedding <=> q``) with a LIMIT, which the ANN index on ``embedding``
+# (one per partition, see ann_index) can serve; the threshold and the
+# time-decay score (LN() per row) are then applied to those few candidates
+# only.  Filtering or ordering on a derived expression instead would force
+# a scan of every row in the workspace.
+_CANDIDATES_SQL = """
+    SELECT content, embedding <=> {vec} AS distance, created_at
+    FROM embeddings
+    WHERE workspace_id = :ws_id
+    ORDER BY embedding <=> {vec}
+    LIMIT :candidates
+"""
+
+# Binary prefilter for large workspaces (opt-in column): the Hamming index
+# on ``embedding_bq`` (1 bit per dimension, ~1/32 of the float vector)
+# yields a wide candidate set cheaply, which is reranked by exact cosine
+# distance before the usual threshold + time-decay scoring
+_BINARY_CANDIDATES_SQL = """
+    SELECT content, embedding <=> {vec} AS distance, created_at
+    FROM (
+        SELECT content, embedding, created_at
+        FROM embeddings
+        WHERE workspace_id = :ws_id
+        ORDER BY embedding_bq <~> binary_quantize({vec})
+        LIMIT :binary_candidates
+    ) prefiltered
+    ORDER BY distance
+    LIMIT :candidates
+"""
+
+
+def _search_sql(candidates_sql: str):
+    return sa_text(f"""
+    WITH candidates AS MATERIALIZED (
+        {candidates_sql.format(vec=f"CAST(:query_vec AS {cast_type()})")}
+    ),
+    scored AS (
+        SELECT
+            content,
+            1 - distance AS similarity,
+            {_TIME_WEIGHT_SQL} AS time_weight,
+            TO_CHAR(created_at, 'YYYY-MM-DD') AS date_str
+        FROM candidates
+        WHERE 1 - distance > :threshold
+    )
+    SELECT content, similarity, time_weight, similarity * time_weight AS final_score, date_str
+    FROM scored
+    ORDER BY final_score DESC
+    LIMIT :k
+""")
+
+
+_SEARCH_SQL = _search_sql(_CANDIDATES_SQL)
+_BINARY_SEARCH_SQL = _search_sql(_BINARY_CANDIDATES_SQL)
+
+
+def _multi_search_sql(num_queries: int, binary: bool = False):
+    """Build the multi-query statement for ``num_queries`` query vectors.
+
+    A LATERAL join runs the per-variant two-stage search against a VALUES
+    list of query vectors, and ``DISTINCT ON (content)`` keeps the
+    highest-scoring hit per document.
+    """
+    candidates_sql = _BINARY_CANDIDATES_SQL if binary else _CANDIDATES_SQL
+    values_sql = ", ".join(
+        f"(CAST(:q{i} AS {cast_type()}))" for i in range(num_queries)
+    )
+    return sa_text(f"""
+        WITH query_vecs (vec) AS (
+            VALUES {values_sql}
+        ),
+        hits AS (
+            SELECT hit.*
+            FROM query_vecs q
+            CROSS JOIN LATERAL (
+                SELECT
+                    content,
+                    similarity,
+                    time_weight,
+                    similarity * time_weight AS final_score,
+                    date_str
+                FROM (
+                    SELECT
+                        content,
+                        1 - distance AS similarity,
+                        {_TIME_WEIGHT_SQL} AS time_weight,
+                        TO_CHAR(created_at, 'YYYY-MM-DD') AS date_str
+                    FROM ({candidates_sql.format(vec="q.vec")}) candidates
+                    WHERE 1 - distance > :threshold
+                ) scored
+                ORDER BY final_score DESC
+                LIMIT :k
+            ) hit
+        ),
+        best AS (
+            SELECT DISTINCT ON (content)
+                content, similarity, time_weight, final_score, date_str
+            FROM hits
+            ORDER BY content, final_score DESC
+        )
+        SELECT content, similarity, time_weight, final_score, date_str
+        FROM best
+        ORDER BY final_score DESC
+        LIMIT :k
+    """)
+
+
+# ANN scan width for this transaction's searches, per workspace (see
+# ann_index.index_gucs): the partition's calibrated value, widened when
+# the workspace filter drops most of what the index returns
+_SET_INDEX_GUCS_SQL = sa_text("""
+    SELECT set_config('ivfflat.probes', :probes, true),
+           set_config('hnsw.ef_search', :ef_search, true)
+""")
+
+
+def _candidate_count(k: int) -> int:
+    return max(k, settings.vector_search_candidates)
+
+
+def _wants_binary_prefilter(profile) -> bool:
+    return (
+        settings.vector_search_binary_prefilter
+        and profile_rows(profile) >= settings.vector_search_binary_min_rows
+    )
+
+
+# Without embedding_bq (scripts/add_binary_embeddings.py) the float index is used
+def _use_binary_prefilter(profile) -> bool:
+    return _wants_binary_prefilter(profile) and binary_column_available()
+
+
+async def _ause_binary_prefilter(profile) -> bool:
+    return _wants_binary_prefilter(profile) and await abinary_column_available()
+
+
+def _index_gucs(profile, k: int, binary: bool) -> dict:
+    if binary:
+        return index_gucs(profile, settings.vector_search_binary_candidates, binary=True)
+    return index_gucs(profile, _candidate_count(k))
+
+
+def _search_params(workspace_id: str, query_embedding: list[float], k: int, threshold: float) -> dict:
+    return {
+        "ws_id": uuid_mod.UUID(workspace_id),
+        "query_vec": str(query_embedding),
+        "k": k,
+        "candidates": _candidate_count(k),
+        "binary_candidates": settings.vector_search_binary_candidates,
+        "threshold": threshold,
+    }
+
+
+def _multi_search_params(
+    workspace_id: str, query_embeddings: list[list[float]], k: int, threshold: float,
+) -> dict:
+    params = {f"q{i}": str(vec) for i, vec in enumerate(query_embeddings)}
+    params.update({
+        "ws_id": uuid_mod.UUID(workspace_id),
+        "k": k,
+        "candidates": _candidate_count(k),
+        "binary_candidates": settings.vector_search_binary_candidates,
+        "threshold": threshold,
+    })
+    return params
+
+
+def _dedupe_queries(queries: list[str]) -> list[str]:
+    return list(dict.fromkeys(q for q in queries if q))
+
+
+def _log_search(results, threshold: float) -> None:
+    if results:
+        logger.info(
+            "Vector search: %d results (top=%.3f, min=%.3f, time_w=%.2f~%.2f)",
+            len(results),
+            results[0][1],       # top similarity
+            results[-1][1],      # min similarity
+            results[0][2],       # top time_weight
+            results[-1][2],      # min time_weight
+        )
+    else:
+        logger.info("Vector search: 0 results above threshold %.2f", threshold)
+
+
+def _log_multi_search(results, num_queries: int, threshold: float) -> None:
+    if results:
+        logger.info(
+            "Multi-query vector search: %d queries → %d results (top=%.3f, min=%.3f)",
+            num_queries,
+            len(results),
+            results[0][3],       # top final_score
+            results[-1][3],      # min final_score
+        )
+    else:
+        logger.info(
+            "Multi-query vector search: %d queries → 0 results above threshold %.2f",
+            num_queries,
+            threshold,
+        )
+
+
+def _to_results(rows) -> list[tuple[str, float, str]]:
+    return [(row[0], row[3], row[4]) for row in rows]  # (content, final_score, date_str)
+
 
 def search_similar(
     workspace_id: str,
@@ -37,55 +279,163 @@ def search_similar(
         List of (content, final_score, date_str) tuples. date_str is
         formatted as YYYY-MM-DD for temporal awareness in the LLM.
     """
-    query_embedding = embed_text(query)
+    return search_by_vector(workspace_id, embed_text(query), k, threshold)
+
+
+def search_by_vector(
+    workspace_id: str,
+    query_embedding: list[float],
+    k: int = 5,
+    threshold: float = 0.3,
+    binary: bool | None = None,
+) -> list[tuple[str, float, str]]:
+    """``search_similar`` for an already embedded query.
+
+    ``binary`` forces the binary prefilter on or off; by default it is used
+    for workspaces of at least ``settings.vector_search_binary_min_rows``
+    embeddings when ``settings.vector_search_binary_prefilter`` is set and
+    ``embedding_bq`` exists.
+    """
+    profile = search_profile(workspace_id)
+    if binary is None:
+        binary = _use_binary_prefilter(profile)
 
     with get_db() as db:
-        # Combined score = similarity * time_weight
-        # time_weight = 1 / (1 + 0.1 * ln(age_days + 1))
-        #   - 1 day old  → weight ≈ 0.94
-        #   - 30 days    → weight ≈ 0.77
-        #   - 180 days   → weight ≈ 0.66
-        #   - 365 days   → weight ≈ 0.60
+        db.execute(_SET_INDEX_GUCS_SQL, _index_gucs(profile, k, binary))
         results = db.execute(
-            sa_text("""
-                WITH scored AS (
-                    SELECT
-                        content,
-                        1 - (embedding <=> :query_vec) AS similarity,
-                        1.0 / (1.0 + 0.1 * LN(
-                            GREATEST(EXTRACT(EPOCH FROM (NOW() - created_at)) / 86400.0, 0) + 1
-                        )) AS time_weight,
-                        TO_CHAR(created_at, 'YYYY-MM-DD') AS date_str
-                    FROM embeddings
-                    WHERE workspace_id = :ws_id
-                      AND 1 - (embedding <=> :query_vec) > :threshold
-                )
-                SELECT content, similarity, time_weight, similarity * time_weight AS final_score, date_str
-                FROM scored
-                ORDER BY final_score DESC
-                LIMIT :k
-            """),
-            {
-                "ws_id": uuid_mod.UUID(workspace_id),
-                "query_vec": str(query_embedding),
-                "k": k,
-                "threshold": threshold,
-            },
+            _BINARY_SEARCH_SQL if binary else _SEARCH_SQL,
+            _search_params(workspace_id, query_embedding, k, threshold),
         ).fetchall()
 
-    if results:
-        logger.info(
-            "Vector search: %d results (top=%.3f, min=%.3f, time_w=%.2f~%.2f)",
-            len(results),
-            results[0][1],       # top similarity
-            results[-1][1],      # min similarity
-            results[0][2],       # top time_weight
-            results[-1][2],      # min time_weight
+    _log_search(results, threshold)
+    return _to_results(results)
+
+
+async def asearch_similar(
+    workspace_id: str,
+    query: str,
+    k: int = 5,
+    threshold: float = 0.3,
+) -> list[tuple[str, float, str]]:
+    """Async ``search_similar`` on the async engine and embeddings client."""
+    query_embedding = await aembed_text(query)
+
+    profile = await asearch_profile(workspace_id)
+    binary = await _ause_binary_prefilter(profile)
+    async with get_async_db() as db:
+        await db.execute(_SET_INDEX_GUCS_SQL, _index_gucs(profile, k, binary))
+        results = (await db.execute(
+            _BINARY_SEARCH_SQL if binary else _SEARCH_SQL,
+            _search_params(workspace_id, query_embedding, k, threshold),
+        )).fetchall()
+
+    _log_search(results, threshold)
+    return _to_results(results)
+
+
+def search_similar_multi(
+    workspace_id: str,
+    queries: list[str],
+    k: int = 8,
+    threshold: float = 0.3,
+) -> list[tuple[str, float, str]]:
+    """Search with several query variants in one embedding call and one SQL query.
+
+    Equivalent to calling ``search_similar`` once per query and merging the
+    results by content (keeping each document's best score), but embeds the
+    variants that are not already memoized in a single batched API call and
+    scores them in a single statement.
+
+    Args:
+        workspace_id: UUID string of the workspace.
+        queries: Query variants (e.g. the question plus its rewrites).
+        k: Maximum number of merged results to return (also the per-variant limit).
+        threshold: Minimum cosine similarity (0-1).
+
+    Returns:
+        List of (content, final_score, date_str) tuples, best score first.
+    """
+    queries = _dedupe_queries(queries)
+    if not queries:
+        return []
+
+    query_embeddings = embed_query_texts(queries)
+
+    profile = search_profile(workspace_id)
+    binary = _use_binary_prefilter(profile)
+    with get_db() as db:
+        db.execute(_SET_INDEX_GUCS_SQL, _index_gucs(profile, k, binary))
+        results = db.execute(
+            _multi_search_sql(len(query_embeddings), binary),
+            _multi_search_params(workspace_id, query_embeddings, k, threshold),
+        ).fetchall()
+
+    _log_multi_search(results, len(queries), threshold)
+    return _to_results(results)
+
+
+async def asearch_similar_multi(
+    workspace_id: str,
+    queries: list[str],
+    k: int = 8,
+    threshold: float = 0.3,
+) -> list[tuple[str, float, str]]:
+    """Async ``search_similar_multi`` on the async engine and embeddings client."""
+    queries = _dedupe_queries(queries)
+    if not queries:
+        return []
+
+    query_embeddings = await aembed_query_texts(queries)
+
+    profile = await asearch_profile(workspace_id)
+    binary = await _ause_binary_prefilter(profile)
+    async with get_async_db() as db:
+        await db.execute(_SET_INDEX_GUCS_SQL, _index_gucs(profile, k, binary))
+        results = (await db.execute(
+            _multi_search_sql(len(query_embeddings), binary),
+            _multi_search_params(workspace_id, query_embeddings, k, threshold),
+        )).fetchall()
+
+    _log_multi_search(results, len(queries), threshold)
+    return _to_results(results)
+
+
+def _build_records(
+    workspace_id: str,
+    chunks: list[dict],
+    vectors: list[list[float]],
+) -> list[Embedding]:
+    """Turn chunks + vectors into ``Embedding`` rows (not yet added to a session)."""
+    ws_uuid = uuid_mod.UUID(workspace_id)
+    records = []
+
+    for chunk, vector in zip(chunks, vectors):
+        # Use original Slack message timestamp for created_at
+        # so time-weighted scoring reflects actual message date,
+        # not ingestion date.
+        msg_ts = chunk.get("message_ts", "")
+        created_at = None
+        if msg_ts:
+            try:
+                created_at = datetime.fromtimestamp(
+                    float(msg_ts), tz=timezone.utc,
+                )
+            except (ValueError, OSError):
+                pass  # fall back to server default (NOW())
+
+        record = Embedding(
+            workspace_id=ws_uuid,
+            content=chunk["content"],
+            embedding=vector,
+            channel_id=chunk.get("channel_id"),
+            message_ts=chunk.get("message_ts"),
+            thread_ts=chunk.get("thread_ts"),
         )
-    else:
-        logger.info("Vector search: 0 results above threshold %.2f", threshold)
+        if created_at is not None:
+            record.created_at = created_at
+        records.append(record)
 
-    return [(row[0], row[3], row[4]) for row in results]  # (content, final_score, date_str)
+    return records
 
 
 def store_embeddings(
@@ -107,38 +457,33 @@ def store_embeddings(
 
     texts = [c["content"] for c in chunks]
     vectors = embed_texts(texts)
-
-    ws_uuid = uuid_mod.UUID(workspace_id)
-    stored = 0
+    records = _build_records(workspace_id, chunks, vectors)
 
     with get_db() as db:
-        for chunk, vector in zip(chunks, vectors):
-            # Use original Slack message timestamp for created_at
-            # so time-weighted scoring reflects actual message date,
-            # not ingestion date.
-            msg_ts = chunk.get("message_ts", "")
-            created_at = None
-            if msg_ts:
-                try:
-                    created_at = datetime.fromtimestamp(
-                        float(msg_ts), tz=timezone.utc,
-                    )
-                except (ValueError, OSError):
-                    pass  # fall back to server default (NOW())
-
-            record = Embedding(
-                workspace_id=ws_uuid,
-                content=chunk["content"],
-                embedding=vector,
-                channel_id=chunk.get("channel_id"),
-                message_ts=chunk.get("message_ts"),
-                thread_ts=chunk.get("thread_ts"),
-            )
-            if created_at is not None:
-                record.created_at = created_at
-            db.add(record)
-            stored += 1
+        db.add_all(records)
         db.flush()
+        record_ingested(db, workspace_id, len(records))
+
+    logger.info("Stored %d embeddings for workspace %s", len(records), workspace_id)
+    return len(records)
+
+
+async def astore_embeddings(
+    workspace_id: str,
+    chunks: list[dict],
+) -> int:
+    """Async ``store_embeddings`` on the async engine and embeddings client."""
+    if not chunks:
+        return 0
+
+    texts = [c["content"] for c in chunks]
+    vectors = await aembed_texts(texts)
+    records = _build_records(workspace_id, chunks, vectors)
+
+    async with get_async_db() as db:
+        db.add_all(records)
+        await db.flush()
+        await arecord_ingested(db, workspace_id, len(records))
 
-    logger.info("Stored %d embeddings for workspace %s", stored, workspace_id)
-    return stored
+    logger.info("Stored %d embeddings for workspace %s", len(records), workspace_id)
+    return len(records)
@@ -1,5 +1,5 @@
-"""Database service — re-export session helper for convenience."""
+"""Database service — re-export session helpers for convenience."""
 
-from src.services.db.connection import get_db
+from src.services.db.connection import get_async_db, get_db
 
-__all__ = ["get_db"]
+__all__ = ["get_async_db", "get_db"]
@@ -0,0 +1,602 @@
+"""Adaptive ANN indexes for the embeddings partitions.
+
+Each leaf partition of ``embeddings`` (see ``embedding_partitions``; an
+unpartitioned table counts as one) gets one ANN index once it holds
+``settings.ann_min_rebuild_rows`` rows (smaller ones are scanned exactly),
+kept fitted to the partition's size:
+
+  - Rows per workspace are counted on every insert (``record_ingested``,
+    called by ``vector_store``) into ``embedding_counts``, and reconciled
+    with ``count(*)`` daily (``reconcile_counts``).
+  - ``maintain_indexes`` (hourly, and after each ingestion job) plans every
+    partition with ``plan_index``: IVFFlat below ``settings.ann_hnsw_min_rows``
+    rows, with ``lists`` sized to the rows and rebuilt once the partition
+    grew or shrank by ``settings.ann_rebuild_growth_factor`` since the build
+    (its centroids are trained on the rows present at build time); HNSW
+    above, which stays accurate as it grows.  A rebuild creates the new
+    index ``CONCURRENTLY`` next to the old one and then swaps them, so
+    searches and inserts are never blocked.
+  - After a build the index is calibrated: sampled rows are searched
+    exactly and through the index, and the smallest ``ivfflat.probes`` /
+    ``hnsw.ef_search`` reaching ``settings.ann_target_recall`` is stored in
+    ``embedding_indexes``.
+  - Searches take their GUCs from ``index_gucs`` for the workspace's
+    ``search_profile`` / ``asearch_profile``: the calibrated value, raised
+    for a workspace that is a small share of a shared partition, since its
+    ``workspace_id`` filter drops most of what the index returns.
+  - Once ``embedding_bq`` was added (``scripts/add_binary_embeddings.py``),
+    every partition also gets a Hamming-distance HNSW index on it (the
+    binary prefilter, see ``vector_store``, which uses it only while the
+    column exists: ``binary_column_available``).
+
+Every decision is logged.
+"""
+
+import logging
+import math
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.config import settings
+from src.services.db.connection import engine, get_async_db, get_db
+from src.services.db.embedding_partitions import get_leaf_partitions, ivfflat_lists
+from src.services.db.embedding_storage import cast_type, cosine_ops, has_binary_column
+
+logger = logging.getLogger(__name__)
+
+_HNSW_M = 16
+_HNSW_EF_CONSTRUCTION = 64
+_MAX_EF_SEARCH = 1000  # pgvector's upper bound for hnsw.ef_search
+_DEFAULT_EF_SEARCH = 40  # pgvector's default
+_MAINTENANCE_LOCK_KEY = 0x616E6E  # pg advisory lock: one maintenance run at a time
+
+
+# ── Row counts ────────────────────────────────────────────────────────
+
+# The partition is looked up once per workspace; inserts are routed there
+_RECORD_INGESTED_SQL = text("""
+    INSERT INTO embedding_counts (workspace_id, partition, rows, updated_at)
+    VALUES (
+        :ws_id,
+        (SELECT tableoid::regclass::text FROM embeddings WHERE workspace_id = :ws_id LIMIT 1),
+        :rows,
+        NOW()
+    )
+    ON CONFLICT (workspace_id) DO UPDATE
+    SET rows = embedding_counts.rows + EXCLUDED.rows,
+        partition = COALESCE(embedding_counts.partition, EXCLUDED.partition),
+        updated_at = NOW()
+""")
+
+_RECONCILE_SQL = text("""
+    INSERT INTO embedding_counts (workspace_id, partition, rows, updated_at)
+    SELECT workspace_id, tableoid::regclass::text, count(*), NOW()
+    FROM embeddings
+    GROUP BY workspace_id, tableoid
+    ON CONFLICT (workspace_id) DO UPDATE
+    SET rows = EXCLUDED.rows, partition = EXCLUDED.partition, updated_at = NOW()
+""")
+
+_DROP_EMPTY_COUNTS_SQL = text("""
+    DELETE FROM embedding_counts c
+    WHERE NOT EXISTS (SELECT 1 FROM embeddings e WHERE e.workspace_id = c.workspace_id)
+""")
+
+
+def _ingested_params(workspace_id: str, rows: int) -> dict:
+    return {"ws_id": uuid.UUID(str(workspace_id)), "rows": rows}
+
+
+def record_ingested(db: Session, workspace_id: str, rows: int) -> None:
+    """Add ``rows`` freshly inserted embeddings to the workspace's count."""
+    db.execute(_RECORD_INGESTED_SQL, _ingested_params(workspace_id, rows))
+
+
+async def arecord_ingested(db: AsyncSession, workspace_id: str, rows: int) -> None:
+    """Async ``record_ingested``."""
+    await db.execute(_RECORD_INGESTED_SQL, _ingested_params(workspace_id, rows))
+
+
+def reconcile_counts() -> int:
+    """Recount every workspace's embeddings (deletes are not tracked)."""
+    with get_db() as db:
+        workspaces = db.execute(_RECONCILE_SQL).rowcount
+        dropped = db.execute(_DROP_EMPTY_COUNTS_SQL).rowcount
+    logger.info("Reconciled embedding counts: %d workspaces, %d dropped", workspaces, dropped)
+    return workspaces
+
+
+# ── Planning ──────────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class IndexPlan:
+    method: str  # "ivfflat" | "hnsw"
+    lists: Optional[int]
+    reason: str
+
+
+def plan_index(rows: int, current: Optional[dict]) -> Optional[IndexPlan]:
+    """Decide whether a partition of ``rows`` rows needs a new ANN index.
+
+    ``current`` holds the existing index's ``method``, ``lists`` and
+    ``rows_at_build`` (None if the partition has no index).  Returns None
+    when the current index still fits.
+    """
+    method = "hnsw" if rows >= settings.ann_hnsw_min_rows else "ivfflat"
+    lists = ivfflat_lists(rows) if method == "ivfflat" else None
+    growth = settings.ann_rebuild_growth_factor
+
+    if current is None:
+        # IVFFlat lists trained on a handful of rows stay poor; an exact
+        # scan of them is cheap anyway
+        if rows < settings.ann_min_rebuild_rows:
+            return None
+        return IndexPlan(method, lists, "no ANN index")
+    if current["method"] == "hnsw":
+        # Fall back to IVFFlat only well below the threshold, not on every dip
+        if rows * growth < settings.ann_hnsw_min_rows:
+            return IndexPlan("ivfflat", ivfflat_lists(rows), f"shrank to {rows} rows")
+        return None
+    if method == "hnsw":
+        return IndexPlan(method, None, f"grew to {rows} rows")
+
+    built = current["rows_at_build"]
+    if max(rows, built) < settings.ann_min_rebuild_rows:
+        return None
+    if rows >= max(built, 1) * growth or rows * growth <= built:
+        return IndexPlan(method, lists, f"{built} → {rows} rows since the last build")
+    return None
+
+
+# ── Building ──────────────────────────────────────────────────────────
+
+_CATALOG_INDEXES_SQL = text("""
+    SELECT t.relname, c.relname, am.amname, c.reloptions, a.attname
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    JOIN pg_class t ON t.oid = i.indrelid
+    JOIN pg_am am ON am.oid = c.relam
+    JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+    WHERE am.amname IN ('ivfflat', 'hnsw') AND i.indisvalid
+""")
+
+_UPSERT_STATE_SQL = text("""
+    INSERT INTO embedding_indexes (partition, method, lists, rows, rows_at_build, built_at)
+    VALUES (:partition, :method, :lists, :rows, :rows, NOW())
+    ON CONFLICT (partition) DO UPDATE
+    SET method = EXCLUDED.method, lists = EXCLUDED.lists, rows = EXCLUDED.rows,
+        rows_at_build = EXCLUDED.rows_at_build, built_at = NOW(),
+        probes = NULL, ef_search = NULL, recall = NULL, calibrated_at = NULL
+""")
+
+
+def _index_name(partition: str) -> str:
+    return f"ix_{partition}_cosine"
+
+
+def _binary_index_name(partition: str) -> str:
+    return f"ix_{partition}_bq"
+
+
+def _catalog_indexes(db: Session) -> tuple[dict[str, dict], set[str]]:
+    """Valid ANN index per table (name, method, IVFFlat lists), and the
+    tables with a Hamming index on ``embedding_bq``."""
+    indexes, binary_indexed = {}, set()
+    for table, name, method, options, column in db.execute(_CATALOG_INDEXES_SQL).all():
+        if column == "embedding_bq":
+            binary_indexed.add(table)
+            continue
+        if column != "embedding":
+            continue
+        lists = next(
+            (int(o.split("=", 1)[1]) for o in options or [] if o.startswith("lists=")), None,
+        )
+        if method == "ivfflat" and lists is None:
+            lists = 100  # pgvector's default
+        if table not in indexes or name == _index_name(table):
+            indexes[table] = {"name": name, "method": method, "lists": lists}
+    return indexes, binary_indexed
+
+
+def _create_index_sql(name: str, partition: str, plan: IndexPlan) -> str:
+    if plan.method == "hnsw":
+        options = f"m = {_HNSW_M}, ef_construction = {_HNSW_EF_CONSTRUCTION}"
+    else:
+        options = f"lists = {plan.lists}"
+    return (
+        f"CREATE INDEX CONCURRENTLY {name} ON {partition} "
+        f"USING {plan.method} (embedding {cosine_ops()}) WITH ({options})"
+    )
+
+
+def build_index(partition: str, plan: IndexPlan, rows: int, replaces: Optional[str]) -> None:
+    """Build ``plan``'s index on ``partition`` without blocking writes, then swap it in.
+
+    ``replaces`` is the partition's current ANN index, dropped once the new
+    one is valid.
+    """
+    final = _index_name(partition)
+    staging = f"{final}_next"
+    started = time.monotonic()
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        # An interrupted CONCURRENTLY build leaves an invalid index behind
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {staging}"))
+        conn.execute(text(_create_index_sql(staging, partition, plan)))
+        if replaces:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {replaces}"))
+        conn.execute(text(f"ALTER INDEX {staging} RENAME TO {final}"))
+        conn.execute(text(f"ANALYZE {partition}"))
+    with get_db() as db:
+        db.execute(_UPSERT_STATE_SQL, {
+            "partition": partition, "method": plan.method, "lists": plan.lists, "rows": rows,
+        })
+    logger.info(
+        "Built %s index %s (lists=%s) on %d rows in %.1fs",
+        plan.method, final, plan.lists, rows, time.monotonic() - started,
+    )
+
+
+def build_binary_index(partition: str) -> None:
+    """Build the Hamming-distance HNSW index on ``embedding_bq``."""
+    name = _binary_index_name(partition)
+    started = time.monotonic()
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))  # invalid leftover
+        conn.execute(text(
+            f"CREATE INDEX CONCURRENTLY {name} ON {partition} "
+            f"USING hnsw (embedding_bq bit_hamming_ops) "
+            f"WITH (m = {_HNSW_M}, ef_construction = {_HNSW_EF_CONSTRUCTION})"
+        ))
+    logger.info("Built binary index %s in %.1fs", name, time.monotonic() - started)
+
+
+# ── Calibration ───────────────────────────────────────────────────────
+
+_SAVE_CALIBRATION_SQL = text("""
+    UPDATE embedding_indexes
+    SET probes = :probes, ef_search = :ef_search, recall = :recall, calibrated_at = NOW()
+    WHERE partition = :partition
+""")
+
+
+def _candidate_values(method: str, lists: Optional[int], k: int) -> list[int]:
+    if method == "hnsw":
+        values, ef = [], k
+        while ef < _MAX_EF_SEARCH:
+            values.append(ef)
+            ef *= 2
+        return values + [_MAX_EF_SEARCH]
+    values, probes = [], 1
+    while probes < lists:
+        values.append(probes)
+        probes *= 2
+    return values + [lists]
+
+
+def _nearest_ids(db: Session, partition: str, vector: str, k: int) -> set[int]:
+    return set(db.execute(text(f"""
+        SELECT id FROM {partition}
+        ORDER BY embedding <=> CAST(:vec AS {cast_type()})
+        LIMIT :k
+    """), {"vec": vector, "k": k}).scalars().all())
+
+
+def calibrate(partition: str, method: str, lists: Optional[int], rows: int) -> Optional[int]:
+    """Find the smallest probes / ef_search reaching the target recall on ``partition``.
+
+    Recall is measured over the partition's own rows (no workspace filter)
+    at ``settings.vector_search_candidates`` neighbours.  Stores and
+    returns the chosen value, or None if the partition is too small to
+    measure or the planner would not use the index.
+    """
+    k = settings.vector_search_candidates
+    if rows < max(settings.ann_min_rebuild_rows, k):
+        return None
+    name = _index_name(partition)
+    guc = "hnsw.ef_search" if method == "hnsw" else "ivfflat.probes"
+    samples_wanted = settings.ann_calibration_queries
+    percent = min(100.0, 100.0 * samples_wanted * 5 / rows)
+
+    with get_db() as db:
+        samples = db.execute(text(f"""
+            SELECT embedding::text FROM {partition} TABLESAMPLE BERNOULLI (:percent) LIMIT :n
+        """), {"percent": percent, "n": samples_wanted}).scalars().all()
+        if not samples:
+            return None
+
+        db.execute(text("SET LOCAL enable_indexscan = off"))
+        exact = [_nearest_ids(db, partition, vector, k) for vector in samples]
+        db.execute(text("SET LOCAL enable_indexscan = on"))
+        db.execute(text("SET LOCAL enable_seqscan = off"))
+        db.execute(text("SET LOCAL enable_sort = off"))
+
+        plan = "\n".join(db.execute(text(f"""
+            EXPLAIN SELECT id FROM {partition}
+            ORDER BY embedding <=> CAST(:vec AS {cast_type()}) LIMIT :k
+        """), {"vec": samples[0], "k": k}).scalars().all())
+        if f"using {name} on" not in plan:
+            logger.warning("Skipping calibration of %s: planner does not use %s", partition, name)
+            return None
+
+        total = sum(len(ids) for ids in exact)
+        chosen, recall = None, 0.0
+        for value in _candidate_values(method, lists, k):
+            db.execute(text("SELECT set_config(:guc, :value, true)"), {"guc": guc, "value": str(value)})
+            found = sum(
+                len(ids & _nearest_ids(db, partition, vector, k))
+                for vector, ids in zip(samples, exact)
+            )
+            chosen, recall = value, found / total
+            if recall >= settings.ann_target_recall:
+                break
+
+        db.execute(_SAVE_CALIBRATION_SQL, {
+            "partition": partition,
+            "probes": chosen if method == "ivfflat" else None,
+            "ef_search": chosen if method == "hnsw" else None,
+            "recall": recall,
+        })
+    logger.info(
+        "Calibrated %s: %s=%d → recall@%d %.3f over %d samples (target %.2f)",
+        partition, guc, chosen, k, recall, len(samples), settings.ann_target_recall,
+    )
+    _search_cache.clear()
+    return chosen
+
+
+# ── Maintenance ───────────────────────────────────────────────────────
+
+_PARTITION_ROWS_SQL = text("""
+    SELECT partition, sum(rows)::bigint FROM embedding_counts
+    WHERE partition IS NOT NULL GROUP BY partition
+""")
+
+_STATES_SQL = text("""
+    SELECT partition, method, lists, rows_at_build, calibrated_at FROM embedding_indexes
+""")
+
+_ADOPT_SQL = text("""
+    INSERT INTO embedding_indexes (partition, method, lists, rows, rows_at_build)
+    VALUES (:partition, :method, :lists, :rows, :rows)
+    ON CONFLICT (partition) DO UPDATE
+    SET method = EXCLUDED.method, lists = EXCLUDED.lists, rows_at_build = EXCLUDED.rows,
+        calibrated_at = NULL
+""")
+
+_UPDATE_ROWS_SQL = text("UPDATE embedding_indexes SET rows = :rows WHERE partition = :partition")
+
+
+def _partition_rows(db: Session) -> dict[str, int]:
+    """Rows per leaf partition: tracked counts, else the planner's estimate."""
+    leaves = get_leaf_partitions(db)
+    if not leaves:  # not partitioned
+        estimate = db.execute(text(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = 'embeddings'::regclass"
+        )).scalar()
+        leaves = [("embeddings", estimate)]
+    tracked = dict(db.execute(_PARTITION_ROWS_SQL).all())
+    return {name: tracked.get(name, max(estimate, 0)) for name, estimate in leaves}
+
+
+def maintain_indexes(partitions: Optional[Iterable[str]] = None) -> list[dict]:
+    """Plan, rebuild and calibrate the ANN index of every (or the given) partition.
+
+    Returns the decisions taken.  Skips the run if another one holds the
+    maintenance lock.
+    """
+    # Autocommit: an open transaction here would stall CREATE INDEX CONCURRENTLY
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as lock_conn:
+        locked = lock_conn.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": _MAINTENANCE_LOCK_KEY},
+        ).scalar()
+        if not locked:
+            logger.info("ANN index maintenance already running elsewhere; skipping")
+            return []
+        try:
+            return _maintain(set(partitions) if partitions else None)
+        finally:
+            lock_conn.execute(
+                text("SELECT pg_advisory_unlock(:key)"), {"key": _MAINTENANCE_LOCK_KEY},
+            )
+
+
+def _maintain(only: Optional[set[str]]) -> list[dict]:
+    with get_db() as db:
+        rows_by_partition = _partition_rows(db)
+        indexes, binary_indexed = _catalog_indexes(db)
+        binary_column = has_binary_column(db)
+        states = {row.partition: row for row in db.execute(_STATES_SQL).all()}
+
+        # Indexes built outside the manager (migrations, dedicated partitions)
+        for partition, index in indexes.items():
+            state = states.get(partition)
+            if partition in rows_by_partition and (
+                state is None
+                or (state.method, state.lists) != (index["method"], index["lists"])
+            ):
+                db.execute(_ADOPT_SQL, {
+                    "partition": partition, "method": index["method"],
+                    "lists": index["lists"], "rows": rows_by_partition[partition],
+                })
+                logger.info(
+                    "Adopted %s index %s on %s", index["method"], index["name"], partition,
+                )
+        states = {row.partition: row for row in db.execute(_STATES_SQL).all()}
+        for partition, rows in rows_by_partition.items():
+            db.execute(_UPDATE_ROWS_SQL, {"partition": partition, "rows": rows})
+
+    decisions = []
+    for partition, rows in sorted(rows_by_partition.items()):
+        if only is not None and partition not in only:
+            continue
+        state = states.get(partition)
+        index = indexes.get(partition)
+        current = None
+        if index is not None and state is not None:
+            current = {
+                "method": state.method, "lists": state.lists,
+                "rows_at_build": state.rows_at_build,
+            }
+
+        plan = plan_index(rows, current)
+        if plan is not None:
+            logger.info(
+                "ANN index plan for %s (%d rows): %s → %s lists=%s (%s)",
+                partition, rows, current["method"] if current else "none",
+                plan.method, plan.lists, plan.reason,
+            )
+            build_index(partition, plan, rows, index["name"] if index else None)
+            probes = calibrate(partition, plan.method, plan.lists, rows)
+            decisions.append({
+                "partition": partition, "rows": rows, "method": plan.method,
+                "lists": plan.lists, "reason": plan.reason, "calibrated": probes,
+            })
+        elif state is not None and state.calibrated_at is None:
+            calibrate(partition, state.method, state.lists, rows)
+
+        # Every partition once embedding_bq was added, and those created after
+        if binary_column and partition not in binary_indexed:
+            logger.info("ANN index plan for %s: no binary index → hnsw on embedding_bq", partition)
+            build_binary_index(partition)
+
+    _search_cache.clear()
+    _binary_column_cache.clear()
+    return decisions
+
+
+# ── Search settings ───────────────────────────────────────────────────
+
+_SEARCH_SETTINGS_SQL = text("""
+    SELECT c.rows, i.method, i.lists, i.rows, i.probes, i.ef_search
+    FROM embedding_counts c
+    JOIN embedding_indexes i ON i.partition = c.partition
+    WHERE c.workspace_id = :ws_id
+""")
+
+_search_cache: dict[str, tuple[float, Optional[tuple]]] = {}
+_binary_column_cache: dict[str, tuple[float, bool]] = {}  # "embedding_bq" → (expires, exists)
+
+
+def index_gucs(profile: Optional[tuple], candidates: int, *, binary: bool = False) -> dict:
+    """``ivfflat.probes`` / ``hnsw.ef_search`` for a workspace's search.
+
+    The index returns the nearest rows of the whole partition; the
+    workspace filter keeps only its own, so the scan is widened by the
+    workspace's share of the partition to still yield ``candidates`` rows.
+    With ``binary`` the candidates come from the HNSW index on
+    ``embedding_bq``, which is not calibrated.
+    """
+    probes = settings.vector_search_probes
+    ef_search = max(candidates, _DEFAULT_EF_SEARCH)
+    if profile is not None:
+        workspace_rows, method, lists, partition_rows, calibrated_probes, calibrated_ef = profile
+        workspace_rows = max(workspace_rows, 1)
+        if binary:
+            share = workspace_rows / max(partition_rows, workspace_rows)
+            ef_search = min(_MAX_EF_SEARCH, max(ef_search, math.ceil(candidates / share)))
+        elif method == "ivfflat" and lists:
+            needed = math.ceil(candidates * lists / workspace_rows)
+            probes = min(lists, max(calibrated_probes or probes, needed))
+        elif method == "hnsw":
+            share = workspace_rows / max(partition_rows, workspace_rows)
+            needed = math.ceil(candidates / share)
+            ef_search = min(_MAX_EF_SEARCH, max(calibrated_ef or ef_search, needed))
+    return {"probes": str(probes), "ef_search": str(ef_search)}
+
+
+def _cached_profile(workspace_id: str) -> tuple[bool, Optional[tuple]]:
+    entry = _search_cache.get(workspace_id)
+    if entry is not None and entry[0] > time.monotonic():
+        return True, entry[1]
+    return False, None
+
+
+def _cache_profile(workspace_id: str, profile: Optional[tuple]) -> None:
+    expires = time.monotonic() + settings.ann_search_settings_ttl_seconds
+    _search_cache[workspace_id] = (expires, profile)
+
+
+def profile_rows(profile: Optional[tuple]) -> int:
+    """The workspace's embedding count from its search profile (0 if unknown)."""
+    return profile[0] if profile is not None else 0
+
+
+def search_profile(workspace_id: str) -> Optional[tuple]:
+    """The workspace's row count and its partition's index state (cached).
+
+    Pass it to ``index_gucs``; None when the workspace is not tracked yet.
+    """
+    hit, profile = _cached_profile(workspace_id)
+    if not hit:
+        try:
+            with get_db() as db:
+                row = db.execute(
+                    _SEARCH_SETTINGS_SQL, {"ws_id": uuid.UUID(workspace_id)},
+                ).first()
+            profile = tuple(row) if row else None
+        except Exception:
+            logger.warning("ANN search settings unavailable for %s; using defaults", workspace_id)
+        _cache_profile(workspace_id, profile)
+    return profile
+
+
+async def asearch_profile(workspace_id: str) -> Optional[tuple]:
+    """Async ``search_profile``."""
+    hit, profile = _cached_profile(workspace_id)
+    if not hit:
+        try:
+            async with get_async_db() as db:
+                row = (await db.execute(
+                    _SEARCH_SETTINGS_SQL, {"ws_id": uuid.UUID(workspace_id)},
+                )).first()
+            profile = tuple(row) if row else None
+        except Exception:
+            logger.warning("ANN search settings unavailable for %s; using defaults", workspace_id)
+        _cache_profile(workspace_id, profile)
+    return profile
+
+
+def _cached_binary_column() -> Optional[bool]:
+    entry = _binary_column_cache.get("embedding_bq")
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+    return None
+
+
+def _cache_binary_column(exists: bool) -> None:
+    expires = time.monotonic() + settings.ann_search_settings_ttl_seconds
+    _binary_column_cache["embedding_bq"] = (expires, exists)
+
+
+def binary_column_available() -> bool:
+    """Whether ``embeddings.embedding_bq`` exists (cached), for the binary prefilter."""
+    exists = _cached_binary_column()
+    if exists is None:
+        try:
+            with get_db() as db:
+                exists = has_binary_column(db)
+        except Exception:
+            logger.warning("Could not check for embedding_bq; binary prefilter off")
+            exists = False
+        _cache_binary_column(exists)
+    return exists
+
+
+async def abinary_column_available() -> bool:
+    """Async ``binary_column_available``."""
+    exists = _cached_binary_column()
+    if exists is None:
+        try:
+            async with get_async_db() as db:
+                exists = await db.run_sync(has_binary_column)
+        except Exception:
+            logger.warning("Could not check for embedding_bq; binary prefilter off")
+            exists = False
+        _cache_binary_column(exists)
+    return exists
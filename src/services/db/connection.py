@@ -1,8 +1,9 @@
-"""SQLAlchemy engine, session factory, and get_db() context manager."""
+"""SQLAlchemy engines, session factories, and get_db()/get_async_db() context managers."""
 
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
 
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
 from src.config import settings
@@ -19,6 +20,18 @@ engine = create_engine(_url, pool_pre_ping=True)
 SessionLocal = sessionmaker(bind=engine)
 Base = declarative_base()
 
+# Async engine (psycopg 3 async driver) for the event-loop hot path.
+# Connections are bound to the event loop that opened them, so use it only
+# from one loop per process (see src.utils.aio).
+async_engine = create_async_engine(
+    _url,
+    pool_pre_ping=True,
+    pool_size=settings.async_db_pool_size,
+    max_overflow=settings.async_db_max_overflow,
+    pool_timeout=settings.async_db_pool_timeout,
+)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
 
 @contextmanager
 def get_db():
@@ -32,3 +45,27 @@ def get_db():
         raise
     finally:
         session.close()
+
+
+@asynccontextmanager
+async def get_async_db():
+    """Yield an ``AsyncSession``; auto-commit on success, rollback on error."""
+    session = AsyncSessionLocal()
+    try:
+        yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+
+def get_async_pool_stats() -> dict:
+    """Return async engine pool usage (size, checked out, overflow)."""
+    pool = async_engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
@@ -0,0 +1,102 @@
+"""Embeddings partition management (see migration 010).
+
+``embeddings`` is list-partitioned by ``workspace_id``: large tenants have
+a dedicated partition (``embeddings_ws_<hex>``) and everyone else shares
+the hash-partitioned default (``embeddings_shared_p*``).  Each leaf has
+its own ANN index (built and refitted by ``ann_index``), so a workspace's
+search only probes lists built from its own partition.  Callers never name partitions — inserts and
+``WHERE workspace_id = ...`` queries on ``embeddings`` are routed and
+pruned by Postgres.
+"""
+
+import logging
+import math
+import uuid
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.services.db.embedding_storage import cosine_ops
+
+logger = logging.getLogger(__name__)
+
+_COLUMNS = "id, workspace_id, content, embedding, channel_id, message_ts, thread_ts, created_at"
+
+_LEAF_PARTITIONS_SQL = text("""
+    WITH RECURSIVE tree AS (
+        SELECT inhrelid AS relid FROM pg_inherits WHERE inhparent = 'embeddings'::regclass
+        UNION ALL
+        SELECT i.inhrelid FROM pg_inherits i JOIN tree t ON i.inhparent = t.relid
+    )
+    SELECT c.relname, c.reltuples::bigint
+    FROM tree JOIN pg_class c ON c.oid = tree.relid
+    WHERE c.relkind = 'r'
+    ORDER BY c.relname
+""")
+
+
+def partition_name(workspace_id: str) -> str:
+    """Name of a workspace's dedicated partition."""
+    return f"embeddings_ws_{uuid.UUID(str(workspace_id)).hex}"
+
+
+def ivfflat_lists(rows: int) -> int:
+    """IVFFlat ``lists`` for a partition of ``rows`` vectors (pgvector guidance)."""
+    if rows > 1_000_000:
+        return int(math.sqrt(rows))
+    return max(10, rows // 1000)
+
+
+def get_leaf_partitions(db: Session) -> list[tuple[str, int]]:
+    """Leaf partitions of ``embeddings`` with their estimated row counts."""
+    return [(name, rows) for name, rows in db.execute(_LEAF_PARTITIONS_SQL).all()]
+
+
+def get_workspaces_to_dedicate(db: Session, min_rows: int) -> list[str]:
+    """Workspaces in the shared partition with at least ``min_rows`` embeddings."""
+    rows = db.execute(text("""
+        SELECT workspace_id FROM embeddings_shared
+        GROUP BY workspace_id HAVING count(*) >= :min_rows
+    """), {"min_rows": min_rows}).scalars().all()
+    return [str(workspace_id) for workspace_id in rows]
+
+
+def dedicate_workspace_partition(db: Session, workspace_id: str) -> str:
+    """Move a workspace out of the shared partition into its own.
+
+    Writes to ``embeddings`` are blocked (reads are not) while the rows
+    are copied, so run it off-peak for very large tenants.  Commits with
+    the caller's session.  Returns the partition name.
+    """
+    workspace_id = str(uuid.UUID(str(workspace_id)))
+    name = partition_name(workspace_id)
+
+    db.execute(text("LOCK TABLE embeddings IN EXCLUSIVE MODE"))
+    db.execute(text(f"CREATE TABLE {name} (LIKE embeddings INCLUDING DEFAULTS INCLUDING GENERATED)"))
+    moved = db.execute(text(f"""
+        WITH moved AS (
+            DELETE FROM embeddings_shared WHERE workspace_id = :ws_id
+            RETURNING {_COLUMNS}
+        )
+        INSERT INTO {name} ({_COLUMNS}) SELECT {_COLUMNS} FROM moved
+    """), {"ws_id": workspace_id}).rowcount
+
+    # The CHECK lets ATTACH skip validating the new partition's rows
+    db.execute(text(
+        f"ALTER TABLE {name} ADD CONSTRAINT {name}_ws CHECK (workspace_id = '{workspace_id}')"
+    ))
+    db.execute(text(
+        f"ALTER TABLE embeddings ATTACH PARTITION {name} FOR VALUES IN ('{workspace_id}')"
+    ))
+    db.execute(text(f"ALTER TABLE {name} DROP CONSTRAINT {name}_ws"))
+    db.execute(text(f"""
+        CREATE INDEX ix_{name}_cosine ON {name}
+        USING ivfflat (embedding {cosine_ops()}) WITH (lists = {ivfflat_lists(moved)})
+    """))
+    # ann_index adopts the new index on its next run
+    db.execute(text(
+        "UPDATE embedding_counts SET partition = :name WHERE workspace_id = :ws_id"
+    ), {"name": name, "ws_id": workspace_id})
+
+    logger.info("Moved %d embeddings of workspace %s to partition %s", moved, workspace_id, name)
+    return name
@@ -0,0 +1,250 @@
+"""Embedding storage mode — pgvector column type and dimensions.
+
+``settings.embedding_storage`` picks the element type of the stored
+embeddings (``embeddings.embedding`` and ``qa_history.question_embedding``):
+
+  - ``vector``  — float32, 4 bytes per dimension
+  - ``halfvec`` — float16, 2 bytes per dimension (pgvector 0.7+)
+
+and ``settings.embedding_dimensions`` their length.  text-embedding-3-small
+is trained so that its first N dimensions, re-normalized, are a valid
+shorter embedding (the API's ``dimensions`` parameter returns exactly
+that), so stored vectors can be reduced in place without re-embedding
+(``reduce_sql``), and new ones are requested at the reduced length
+(``src.services.ai.embeddings``).
+
+The settings can change at any deploy, so the columns are not converted by
+a migration: ``scripts/convert_embedding_storage.py`` (``convert_storage``)
+rewrites them to the configured mode, and the web app and worker refuse to
+start while they differ (``check_storage``).  Check the recall of a mode on
+real data before switching: ``scripts/bench_embedding_storage.py``.
+
+``embeddings.embedding_bq``, the binary-quantized copy behind the search
+prefilter, is opt-in the same way: ``scripts/add_binary_embeddings.py``
+(``add_binary_column``), and searches fall back to the float index while
+it is absent.
+"""
+
+import logging
+
+from pgvector.sqlalchemy import HALFVEC, Vector
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+FULL_DIMENSIONS = 1536  # text-embedding-3-small
+
+_STORAGE_TYPES = ("vector", "halfvec")
+
+
+def _validate(storage: str, dimensions: int) -> None:
+    if storage not in _STORAGE_TYPES:
+        raise ValueError(f"embedding_storage must be one of {_STORAGE_TYPES}, not {storage!r}")
+    if not 1 <= dimensions <= FULL_DIMENSIONS:
+        raise ValueError(f"embedding_dimensions must be 1..{FULL_DIMENSIONS}, not {dimensions}")
+
+
+def column_type():
+    """SQLAlchemy column type for stored embeddings."""
+    _validate(settings.embedding_storage, settings.embedding_dimensions)
+    if settings.embedding_storage == "halfvec":
+        return HALFVEC(settings.embedding_dimensions)
+    return Vector(settings.embedding_dimensions)
+
+
+def sql_type(storage: str | None = None, dimensions: int | None = None) -> str:
+    """Column type in SQL, e.g. ``halfvec(1536)`` (the configured mode by default)."""
+    storage = storage or settings.embedding_storage
+    dimensions = dimensions or settings.embedding_dimensions
+    _validate(storage, dimensions)
+    return f"{storage}({dimensions})"
+
+
+def cast_type() -> str:
+    """Type to cast query vector literals to, so they compare with the column."""
+    return settings.embedding_storage
+
+
+def cosine_ops() -> str:
+    """Operator class for cosine ANN indexes on the column."""
+    return f"{settings.embedding_storage}_cosine_ops"
+
+
+def request_dimensions() -> int | None:
+    """``dimensions`` to request from the embeddings API (None for full length)."""
+    if settings.embedding_dimensions >= FULL_DIMENSIONS:
+        return None
+    return settings.embedding_dimensions
+
+
+def reduce_sql(column: str, storage: str, dimensions: int) -> str:
+    """SQL expression turning a ``vector`` column into ``storage(dimensions)``.
+
+    The column may already be shortened (to at least ``dimensions``): a
+    prefix of a re-normalized prefix, re-normalized, is the same vector.
+    """
+    target = sql_type(storage, dimensions)
+    if dimensions >= FULL_DIMENSIONS:
+        return f"{column}::{target}"
+    return f"l2_normalize(subvector({column}, 1, {dimensions}))::{target}"
+
+
+# ── Stored columns ────────────────────────────────────────────────────
+
+STORED_COLUMNS = (("embeddings", "embedding"), ("qa_history", "question_embedding"))
+
+_STORED_TYPE_SQL = text("""
+    SELECT format_type(atttypid, atttypmod) FROM pg_attribute
+    WHERE attrelid = CAST(:table AS regclass) AND attname = :column AND NOT attisdropped
+""")
+
+_ANN_INDEXES_SQL = text("""
+    SELECT c.relname
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    JOIN pg_class t ON t.oid = i.indrelid
+    JOIN pg_am am ON am.oid = c.relam
+    WHERE am.amname IN ('ivfflat', 'hnsw') AND t.relname LIKE 'embeddings%'
+""")
+
+
+def stored_types(db: Session) -> dict[str, str]:
+    """SQL type of each stored column, e.g. ``{"embeddings.embedding": "vector(1536)"}``."""
+    return {
+        f"{table}.{column}": db.execute(_STORED_TYPE_SQL, {"table": table, "column": column}).scalar()
+        for table, column in STORED_COLUMNS
+    }
+
+
+def _dimensions(type_name: str) -> int:
+    return int(type_name.split("(", 1)[1].rstrip(")"))
+
+
+def check_storage(db: Session) -> None:
+    """Raise if the stored columns are not of the configured type.
+
+    Inserts and searches cast to ``sql_type()``, so a mismatch would fail
+    every one of them (or, for a changed length, every insert).
+    """
+    target = sql_type()
+    mismatched = {name: current for name, current in stored_types(db).items() if current != target}
+    if mismatched:
+        found = ", ".join(f"{name} is {current}" for name, current in mismatched.items())
+        raise RuntimeError(
+            f"Stored embeddings do not match the settings ({found}; "
+            f"embedding_storage/embedding_dimensions say {target}): "
+            "run scripts/convert_embedding_storage.py or restore the previous settings"
+        )
+
+
+def verify_storage() -> None:
+    """``check_storage`` on a session of its own, for process startup.
+
+    A database that cannot be reached is only logged (the process retries
+    it like any other query); a mismatch raises.
+    """
+    from src.services.db.connection import get_db
+
+    try:
+        with get_db() as db:
+            check_storage(db)
+    except SQLAlchemyError:
+        logger.warning("Could not check the embedding storage mode", exc_info=True)
+
+
+def convert_storage(db: Session, storage: str, dimensions: int) -> list[str]:
+    """Rewrite the stored columns to ``storage(dimensions)`` in place.
+
+    Vectors can be shortened or change element type, but not lengthened
+    (that needs re-ingestion).  The ANN indexes are dropped for the rewrite
+    and their state in ``embedding_indexes`` cleared; the index manager
+    (``ann_index.maintain_indexes``) builds new ones with the new operator
+    class.  ``embedding_bq``, generated from the column, is dropped and
+    re-added at the new length.  Returns the changes made.
+    """
+    target = sql_type(storage, dimensions)
+    changes = []
+    for name, current in stored_types(db).items():
+        if current == target:
+            continue
+        if dimensions > _dimensions(current):
+            raise RuntimeError(
+                f"{name} is {current}; shortened embeddings cannot be lengthened to {target}, "
+                "re-ingest instead"
+            )
+        changes.append((name, current))
+    if not changes:
+        return []
+
+    for index in db.execute(_ANN_INDEXES_SQL).scalars().all():
+        db.execute(text(f"DROP INDEX IF EXISTS {index}"))
+    has_binary = has_binary_column(db)
+    if has_binary:
+        db.execute(text("ALTER TABLE embeddings DROP COLUMN embedding_bq"))
+
+    for name, _ in changes:
+        table, column = name.split(".")
+        using = reduce_sql(f"{column}::vector", storage, dimensions)
+        db.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} TYPE {target} USING {using}"))
+
+    if has_binary:
+        db.execute(_add_binary_column_sql(dimensions))
+    db.execute(text("DELETE FROM embedding_indexes"))
+    for table in {name.split(".")[0] for name, _ in changes}:
+        db.execute(text(f"ANALYZE {table}"))
+    return [f"{name}: {current} → {target}" for name, current in changes]
+
+
+# ── Binary-quantized column ───────────────────────────────────────────
+
+_HAS_BINARY_COLUMN_SQL = text("""
+    SELECT EXISTS (
+        SELECT 1 FROM pg_attribute
+        WHERE attrelid = 'embeddings'::regclass AND attname = 'embedding_bq' AND NOT attisdropped
+    )
+""")
+
+_PGVECTOR_VERSION_SQL = text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+
+
+def _add_binary_column_sql(dimensions: int):
+    return text(f"""
+        ALTER TABLE embeddings ADD COLUMN embedding_bq bit({dimensions})
+        GENERATED ALWAYS AS (binary_quantize(embedding)::bit({dimensions})) STORED
+    """)
+
+
+def has_binary_column(db: Session) -> bool:
+    """Whether ``embeddings.embedding_bq`` exists."""
+    return bool(db.execute(_HAS_BINARY_COLUMN_SQL).scalar())
+
+
+def add_binary_column(db: Session) -> bool:
+    """Add ``embedding_bq = binary_quantize(embedding)`` as a stored generated column.
+
+    One bit per dimension (~192 bytes for 1536 dims instead of ~6 KB), so
+    inserts need no change; adding it rewrites ``embeddings``.  Needs
+    pgvector 0.7+.  Returns False if the column already exists.
+    """
+    if has_binary_column(db):
+        return False
+    version = db.execute(_PGVECTOR_VERSION_SQL).scalar() or "0.0"
+    if tuple(int(part) for part in version.split(".")[:2]) < (0, 7):
+        raise RuntimeError(
+            f"pgvector {version} has no binary_quantize; run ALTER EXTENSION vector UPDATE (0.7+)"
+        )
+    current = db.execute(_STORED_TYPE_SQL, {"table": "embeddings", "column": "embedding"}).scalar()
+    db.execute(_add_binary_column_sql(_dimensions(current)))
+    return True
+
+
+def drop_binary_column(db: Session) -> bool:
+    """Drop ``embedding_bq`` and its indexes.  Returns False if it did not exist."""
+    if not has_binary_column(db):
+        return False
+    db.execute(text("ALTER TABLE embeddings DROP COLUMN embedding_bq"))
+    return True
@@ -3,10 +3,12 @@
 import uuid
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     Column,
     Date,
     DateTime,
+    Float,
     ForeignKey,
     Integer,
     String,
@@ -17,9 +19,8 @@ from sqlalchemy import (
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
-from pgvector.sqlalchemy import Vector
-
 from src.services.db.connection import Base
+from src.services.db.embedding_storage import column_type
 
 
 class Workspace(Base):
@@ -81,6 +82,9 @@ class QAHistory(Base):
     feedback_at = Column(DateTime)
     is_reflected = Column(Boolean, default=False)  # feedback → KB sync tracking
 
+    # Semantic answer cache key (see src/services/ai/answer_cache.py)
+    question_embedding = Column(column_type(), nullable=True)
+
     # Metadata
     is_high_risk = Column(Boolean, default=False)
     matched_rule_id = Column(Integer, ForeignKey("rules.id"))
@@ -133,15 +137,68 @@ class IngestionJob(Base):
 
 
 class Embedding(Base):
+    # List-partitioned by workspace_id with per-partition ANN indexes and a
+    # (id, workspace_id) primary key: see migration 010 / embedding_partitions.
+    # The opt-in generated embedding_bq column (scripts/add_binary_embeddings.py)
+    # is not mapped; only the binary prefilter in vector_store reads it.
     __tablename__ = "embeddings"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     workspace_id = Column(UUID(as_uuid=True), ForeignKey("workspaces.id", ondelete="CASCADE"), nullable=False)
     content = Column(Text, nullable=False)
-    embedding = Column(Vector(1536), nullable=False)  # text-embedding-3-small
+    embedding = Column(column_type(), nullable=False)  # text-embedding-3-small, see embedding_storage
     channel_id = Column(String(64))
     message_ts = Column(String(64))
     thread_ts = Column(String(64))
     created_at = Column(DateTime, server_default=func.now())
 
     workspace = relationship("Workspace")
+
+
+class ConversationThread(Base):
+    """Registry of LangGraph checkpoint threads (``{workspace_id}:{asker_id}``)."""
+
+    # Indexes on workspace_id and last_active_at: see migration 009
+    __tablename__ = "conversation_threads"
+
+    thread_id = Column(String(80), primary_key=True)
+    workspace_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("workspaces.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    asker_user_id = Column(String(20), nullable=False)
+    last_active_at = Column(DateTime, server_default=func.now(), nullable=False)
+    compacted_at = Column(DateTime)
+
+
+class EmbeddingCount(Base):
+    """Embeddings per workspace and the partition holding them (see ann_index)."""
+
+    __tablename__ = "embedding_counts"
+
+    workspace_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("workspaces.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    partition = Column(String(63))
+    rows = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now())
+
+
+class EmbeddingIndex(Base):
+    """ANN index per embeddings leaf partition and its calibrated search settings."""
+
+    __tablename__ = "embedding_indexes"
+
+    partition = Column(String(63), primary_key=True)
+    method = Column(String(16), nullable=False)  # ivfflat | hnsw
+    lists = Column(Integer)  # ivfflat only
+    rows = Column(BigInteger, nullable=False, default=0)  # at the last maintenance run
+    rows_at_build = Column(BigInteger, nullable=False, default=0)
+    probes = Column(Integer)  # ivfflat.probes reaching the target recall
+    ef_search = Column(Integer)  # hnsw.ef_search reaching the target recall
+    recall = Column(Float)  # measured at calibration
+    built_at = Column(DateTime, server_default=func.now())
+    calibrated_at = Column(DateTime)
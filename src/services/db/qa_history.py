@@ -4,13 +4,13 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from src.services.db.models import QAHistory
 
 
-def create_qa_record(
-    db: Session,
+def _new_qa_record(
     *,
     workspace_id: uuid.UUID,
     asker_user_id: str,
@@ -21,9 +21,9 @@ def create_qa_record(
     channel_id: str | None = None,
     is_high_risk: bool = False,
     matched_rule_id: int | None = None,
+    question_embedding: list[float] | None = None,
 ) -> QAHistory:
-    """Insert a new Q&A record and return it."""
-    record = QAHistory(
+    return QAHistory(
         id=uuid.uuid4(),
         workspace_id=workspace_id,
         asker_user_id=asker_user_id,
@@ -34,12 +34,26 @@ def create_qa_record(
         channel_id=channel_id,
         is_high_risk=is_high_risk,
         matched_rule_id=matched_rule_id,
+        question_embedding=question_embedding,
     )
+
+
+def create_qa_record(db: Session, **fields) -> QAHistory:
+    """Insert a new Q&A record and return it (fields: see ``_new_qa_record``)."""
+    record = _new_qa_record(**fields)
     db.add(record)
     db.flush()
     return record
 
 
+async def acreate_qa_record(db: AsyncSession, **fields) -> QAHistory:
+    """Async ``create_qa_record``."""
+    record = _new_qa_record(**fields)
+    db.add(record)
+    await db.flush()
+    return record
+
+
 def get_qa_record(db: Session, qa_id: uuid.UUID) -> Optional[QAHistory]:
     """Fetch a single QA record by its UUID."""
     return db.query(QAHistory).filter(QAHistory.id == qa_id).first()
@@ -61,14 +75,15 @@ def update_feedback(
     qa_id: uuid.UUID,
     feedback_type: str,
     corrected_answer: str | None = None,
-) -> None:
-    """Record decision-maker feedback on a QA record."""
+) -> Optional[QAHistory]:
+    """Record decision-maker feedback on a QA record. Returns the record if found."""
     record = db.query(QAHistory).filter(QAHistory.id == qa_id).first()
     if record is None:
-        return
+        return None
     record.feedback_type = feedback_type
     record.feedback_at = datetime.utcnow()
     record.review_status = "completed"
     if corrected_answer is not None:
         record.corrected_answer = corrected_answer
     db.flush()
+    return record
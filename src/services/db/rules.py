@@ -3,6 +3,8 @@
 import uuid
 from typing import Optional
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from src.services.db.models import Rule
@@ -18,6 +20,16 @@ def get_active_rules(db: Session, workspace_id: uuid.UUID) -> list[Rule]:
     )
 
 
+async def aget_active_rules(db: AsyncSession, workspace_id: uuid.UUID) -> list[Rule]:
+    """Async ``get_active_rules``."""
+    result = await db.execute(
+        select(Rule)
+        .where(Rule.workspace_id == workspace_id, Rule.is_active.is_(True))
+        .order_by(Rule.id.desc())
+    )
+    return list(result.scalars().all())
+
+
 def create_rule(db: Session, workspace_id: uuid.UUID, rule_text: str) -> Rule:
     """Insert a new rule."""
     rule = Rule(workspace_id=workspace_id, rule_text=rule_text)
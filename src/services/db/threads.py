@@ -0,0 +1,75 @@
+"""Conversation thread registry — indexed lookup of checkpoint threads."""
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.services.db.models import ConversationThread
+
+
+async def atouch_thread(
+    db: AsyncSession, thread_id: str, workspace_id: uuid.UUID, asker_user_id: str,
+) -> None:
+    """Register a thread or bump its ``last_active_at`` (one upsert)."""
+    stmt = insert(ConversationThread).values(
+        thread_id=thread_id,
+        workspace_id=workspace_id,
+        asker_user_id=asker_user_id,
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[ConversationThread.thread_id],
+            set_={"last_active_at": func.now()},
+        )
+    )
+
+
+def get_threads_to_compact(db: Session, idle_since: datetime, limit: int) -> list[str]:
+    """Threads active since their last compaction and idle since ``idle_since``."""
+    return list(db.execute(
+        select(ConversationThread.thread_id)
+        .where(
+            ConversationThread.last_active_at < idle_since,
+            or_(
+                ConversationThread.compacted_at.is_(None),
+                ConversationThread.compacted_at < ConversationThread.last_active_at,
+            ),
+        )
+        .order_by(ConversationThread.last_active_at)
+        .limit(limit)
+    ).scalars().all())
+
+
+def mark_threads_compacted(db: Session, thread_ids: list[str]) -> None:
+    db.execute(
+        update(ConversationThread)
+        .where(ConversationThread.thread_id.in_(thread_ids))
+        .values(compacted_at=func.now())
+    )
+
+
+def get_idle_thread_ids(db: Session, inactive_since: datetime, limit: int) -> list[str]:
+    """Threads with no activity since ``inactive_since`` (oldest first)."""
+    return list(db.execute(
+        select(ConversationThread.thread_id)
+        .where(ConversationThread.last_active_at < inactive_since)
+        .order_by(ConversationThread.last_active_at)
+        .limit(limit)
+    ).scalars().all())
+
+
+def delete_workspace_threads(db: Session, workspace_id: uuid.UUID) -> None:
+    """Drop a workspace's registry rows (its checkpoints are already gone)."""
+    db.execute(
+        delete(ConversationThread).where(ConversationThread.workspace_id == workspace_id)
+    )
+
+
+def delete_threads(db: Session, thread_ids: list[str]) -> None:
+    db.execute(
+        delete(ConversationThread).where(ConversationThread.thread_id.in_(thread_ids))
+    )
@@ -3,6 +3,8 @@
 import uuid
 from typing import Optional
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from src.services.db.models import Workspace
@@ -13,6 +15,14 @@ def get_workspace_by_team_id(db: Session, team_id: str) -> Optional[Workspace]:
     return db.query(Workspace).filter(Workspace.slack_team_id == team_id).first()
 
 
+async def aget_workspace_by_team_id(db: AsyncSession, team_id: str) -> Optional[Workspace]:
+    """Async ``get_workspace_by_team_id``."""
+    result = await db.execute(
+        select(Workspace).where(Workspace.slack_team_id == team_id).limit(1)
+    )
+    return result.scalars().first()
+
+
 def create_workspace(db: Session, *, slack_team_id: str, slack_team_name: str,
                      admin_id: str, decision_maker_id: str, bot_token: str,
                      user_token: str = "") -> Workspace:
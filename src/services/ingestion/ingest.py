@@ -1,6 +1,5 @@
 """Ingestion orchestrator — fetches Slack history and passes to AI pipeline."""
 
-import asyncio
 import logging
 import uuid
 
@@ -24,6 +23,7 @@ from src.services.slack.conversations import (
     list_bot_channels,
     resolve_user_names,
 )
+from src.utils.aio import run_sync
 
 logger = logging.getLogger(__name__)
 
@@ -142,7 +142,7 @@ def run_ingestion(team_id: str, channel_ids: list[str] | None = None, incrementa
     for ch, raw_msgs in all_raw_by_channel:
         logger.info("Contextualizing #%s (%d messages)", ch["name"], len(raw_msgs))
         try:
-            contextualized = asyncio.run(contextualize_messages(
+            contextualized = run_sync(contextualize_messages(
                 raw_messages=raw_msgs,
                 decision_maker_id=decision_maker_id,
                 user_names=user_names,
@@ -177,7 +177,7 @@ def run_ingestion(team_id: str, channel_ids: list[str] | None = None, incrementa
         for i in range(0, total_messages, _BATCH_SIZE):
             batch = all_messages[i : i + _BATCH_SIZE]
 
-            asyncio.run(ingest_messages(
+            run_sync(ingest_messages(
                 workspace_id=str(workspace_id),
                 messages=batch,
             ))
@@ -203,6 +203,14 @@ def run_ingestion(team_id: str, channel_ids: list[str] | None = None, incrementa
         mark_job_completed(db, job_id, total_messages=total_messages, processed_messages=processed)
         update_workspace(db, workspace_id, onboarding_completed=True)
 
+    # Refit ANN indexes to the new row counts in the background (a rebuild
+    # of a large partition takes minutes)
+    try:
+        from src.tasks.ann_index import maintain_ann_indexes_task
+        maintain_ann_indexes_task.delay()
+    except Exception:
+        logger.exception("Could not schedule ANN index maintenance after ingestion")
+
     # 6. Extract persona from ingested messages
     try:
         from src.services.ai.persona_extractor import extract_persona
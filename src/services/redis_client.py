@@ -7,12 +7,18 @@ DB layout:
   - DB0: Celery Broker (task queue)
   - DB1: Celery Backend (task results)
   - DB2: Dedup keys + Rule cache
+
+Pub/sub channel ``slough:invalidate`` (on DB2's server) carries cache
+invalidations between processes; see ``publish_invalidation``.
 """
 
+import asyncio
 import logging
-from typing import Optional
+from collections import defaultdict
+from typing import Callable, Optional
 
 import redis
+import redis.asyncio as aioredis
 
 from src.config import settings
 
@@ -27,6 +33,8 @@ class RedisManager:
     _broker_client: Optional[redis.Redis] = None
     _backend_client: Optional[redis.Redis] = None
     _cache_client: Optional[redis.Redis] = None
+    _async_cache_client: Optional[aioredis.Redis] = None
+    _async_binary_cache_client: Optional[aioredis.Redis] = None
 
     @classmethod
     def get_broker(cls) -> redis.Redis:
@@ -58,6 +66,40 @@ class RedisManager:
             )
         return cls._cache_client
 
+    @classmethod
+    def get_async_cache(cls) -> aioredis.Redis:
+        """DB2 (async client) for handlers and nodes on the event loop.
+
+        Its connections are bound to the loop that opened them, so use it
+        only from the process loop (see ``src.utils.aio``).
+        """
+        if cls._async_cache_client is None:
+            cls._async_cache_client = aioredis.from_url(
+                settings.redis_cache_url,
+                decode_responses=True,
+            )
+        return cls._async_cache_client
+
+    @classmethod
+    def get_async_binary_cache(cls) -> aioredis.Redis:
+        """DB2 (async client, raw bytes) for serialized payloads such as checkpoints."""
+        if cls._async_binary_cache_client is None:
+            cls._async_binary_cache_client = aioredis.from_url(
+                settings.redis_cache_url,
+                decode_responses=False,
+            )
+        return cls._async_binary_cache_client
+
+    @classmethod
+    async def close_async_cache(cls) -> None:
+        """Close the async cache clients' connection pools."""
+        if cls._async_cache_client is not None:
+            await cls._async_cache_client.aclose()
+            cls._async_cache_client = None
+        if cls._async_binary_cache_client is not None:
+            await cls._async_binary_cache_client.aclose()
+            cls._async_binary_cache_client = None
+
 
 # ── Dedup Helper ──────────────────────────────────────────────────────
 
@@ -82,6 +124,15 @@ def is_duplicate_event(event_id: str) -> bool:
     return True  # Duplicate
 
 
+async def ais_duplicate_event(event_id: str) -> bool:
+    """Async ``is_duplicate_event`` (single ``SET NX EX`` round trip)."""
+    cache = RedisManager.get_async_cache()
+    is_new = await cache.set(
+        f"dedup:{event_id}", "1", nx=True, ex=settings.dedup_ttl_seconds,
+    )
+    return not is_new
+
+
 # ── Rule Cache Helpers ────────────────────────────────────────────────
 
 def get_cached_rule(keyword: str) -> Optional[str]:
@@ -163,3 +214,92 @@ def set_persona_profile(workspace_id: str, profile: str) -> None:
     """Cache the persona profile for a workspace (no TTL — persists until overwritten)."""
     cache = RedisManager.get_cache()
     cache.set(f"persona:{workspace_id}", profile)
+
+
+# ── Cache Invalidation (pub/sub) ──────────────────────────────────────
+#
+# In-process caches register a handler per cache ``kind``.  Writers call
+# ``publish_invalidation(kind, key)``: local handlers run immediately and
+# the message is published so every other web process drops its copy too.
+# Messages are "<kind>:<key>"; key "*" means "drop everything" and is
+# delivered locally whenever the listener (re)subscribes, since messages
+# published while it was disconnected are lost.
+
+INVALIDATION_CHANNEL = "slough:invalidate"
+_ALL_KEYS = "*"
+
+_invalidation_handlers: dict[str, list[Callable[[str], None]]] = defaultdict(list)
+_listener_task: Optional[asyncio.Task] = None
+
+
+def on_invalidation(kind: str, handler: Callable[[str], None]) -> None:
+    """Register ``handler(key)`` for invalidations of ``kind``."""
+    _invalidation_handlers[kind].append(handler)
+
+
+def _dispatch_invalidation(kind: str, key: str) -> None:
+    for handler in _invalidation_handlers.get(kind, []):
+        try:
+            handler(key)
+        except Exception:
+            logger.exception("Invalidation handler failed for %s:%s", kind, key)
+
+
+def _dispatch_all() -> None:
+    for kind in list(_invalidation_handlers):
+        _dispatch_invalidation(kind, _ALL_KEYS)
+
+
+def publish_invalidation(kind: str, key: str) -> None:
+    """Invalidate ``kind``/``key`` in this process and broadcast it (best-effort)."""
+    _dispatch_invalidation(kind, key)
+    try:
+        RedisManager.get_cache().publish(INVALIDATION_CHANNEL, f"{kind}:{key}")
+    except Exception:
+        logger.warning("Failed to publish invalidation %s:%s", kind, key)
+
+
+async def _listen_for_invalidations() -> None:
+    backoff = 1.0
+    while True:
+        pubsub = RedisManager.get_async_cache().pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(INVALIDATION_CHANNEL)
+            _dispatch_all()  # anything may have changed while unsubscribed
+            backoff = 1.0
+            async for message in pubsub.listen():
+                kind, _, key = str(message.get("data", "")).partition(":")
+                if kind and key:
+                    _dispatch_invalidation(kind, key)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.warning("Invalidation listener disconnected, retrying in %.0fs", backoff)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
+
+
+def start_invalidation_listener() -> None:
+    """Start the pub/sub listener task on the running loop (idempotent)."""
+    global _listener_task
+    if _listener_task is None or _listener_task.done():
+        _listener_task = asyncio.get_running_loop().create_task(
+            _listen_for_invalidations(), name="invalidation-listener",
+        )
+
+
+async def stop_invalidation_listener() -> None:
+    """Cancel the pub/sub listener task."""
+    global _listener_task
+    task, _listener_task = _listener_task, None
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
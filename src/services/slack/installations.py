@@ -0,0 +1,102 @@
+"""In-process installation cache — bot tokens for ``authorize()``.
+
+Every Slack request (events, commands, actions, view submissions) is
+authorized with the workspace's bot token.  Tokens (with the workspace id)
+are cached per team in process memory for
+``settings.installation_cache_ttl_seconds``, so the hot path makes no DB
+round trip.  ``handle_installation`` and the
+``app_uninstalled`` handler call ``invalidate_installation``, which drops
+the entry here and, via Redis pub/sub, in every other web process.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from src.config import settings
+from src.services.db.connection import get_async_db
+from src.services.db.workspaces import aget_workspace_by_team_id
+from src.services.redis_client import on_invalidation, publish_invalidation
+
+logger = logging.getLogger(__name__)
+
+_INVALIDATION_KIND = "installation"
+
+
+@dataclass(frozen=True)
+class Installation:
+    workspace_id: str
+    bot_token: str
+
+
+_tokens: dict[str, tuple[Installation, float]] = {}  # team_id -> (installation, expires_at)
+_lock = threading.Lock()
+_generation = 0  # bumped on every invalidation; guards in-flight DB reads
+_stats = {"hits": 0, "misses": 0}
+
+
+async def get_installation(team_id: str) -> Optional[Installation]:
+    """Return a team's workspace id and bot token, or None if it is not installed."""
+    now = time.monotonic()
+    with _lock:
+        cached = _tokens.get(team_id)
+        if cached is not None and cached[1] > now:
+            _stats["hits"] += 1
+            return cached[0]
+        _stats["misses"] += 1
+        generation = _generation
+
+    async with get_async_db() as db:
+        workspace = await aget_workspace_by_team_id(db, team_id)
+    if workspace is None:
+        return None
+
+    installation = Installation(str(workspace.id), workspace.bot_token)
+    with _lock:
+        # Don't cache a row read before an invalidation that raced with it
+        if generation == _generation:
+            _tokens[team_id] = (
+                installation,
+                now + settings.installation_cache_ttl_seconds,
+            )
+    return installation
+
+
+async def get_bot_token(team_id: str) -> Optional[str]:
+    """Return the bot token for a team, or None if the team is not installed."""
+    installation = await get_installation(team_id)
+    return installation.bot_token if installation else None
+
+
+def invalidate_installation(team_id: str) -> None:
+    """Drop a team's cached token in all processes (call after changing the row)."""
+    publish_invalidation(_INVALIDATION_KIND, team_id)
+
+
+def _drop(team_id: str) -> None:
+    global _generation
+    with _lock:
+        _generation += 1
+        if team_id == "*":
+            _tokens.clear()
+        else:
+            _tokens.pop(team_id, None)
+
+
+on_invalidation(_INVALIDATION_KIND, _drop)
+
+
+def get_installation_cache_stats() -> dict:
+    """Hit rate and size of the installation cache."""
+    with _lock:
+        hits, misses = _stats["hits"], _stats["misses"]
+        size = len(_tokens)
+    lookups = hits + misses
+    return {
+        "size": size,
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+    }
@@ -15,6 +15,7 @@ from src.services.db.workspaces import (
     get_workspace_by_team_id,
     update_workspace,
 )
+from src.services.slack.installations import invalidate_installation
 
 logger = logging.getLogger(__name__)
 
@@ -117,6 +118,8 @@ def handle_installation(oauth_response: dict) -> None:
             )
             logger.info("Created workspace for team %s", team_id)
 
+    invalidate_installation(team_id)
+
 
 def send_welcome_dm(bot_token: str, user_id: str) -> None:
     """Send an onboarding DM to the decision-maker after installation."""
@@ -0,0 +1,337 @@
+"""Per-question workspace snapshot — decision-maker, persona, rules, token.
+
+Answering a question needs the same handful of workspace facts every time.
+``get_workspace_context`` assembles them once into a ``WorkspaceContext``
+and caches it in two tiers:
+
+  1. In-process TTL dict (``settings.workspace_context_ttl_seconds``)
+  2. Redis hash ``ws_ctx:{workspace_id}`` (``settings.workspace_context_redis_ttl_seconds``),
+     shared by all processes
+
+A miss in both loads the workspace row and active rules from the DB, the
+persona from Redis and the decision-maker's name from Slack.  The bot token
+is never written to Redis; it is attached from the installation cache.
+
+Writers that change rules, the persona or the decision-maker call
+``invalidate_workspace_context``, which bumps the workspace's version
+(``ws_ctx_ver:{workspace_id}``), deletes the Redis hash and drops the local
+entry in every process via pub/sub.  A load stores its snapshot in Redis
+only if the version is still the one it read before loading, so a snapshot
+loaded before an invalidation (in any process) cannot overwrite it.
+"""
+
+import dataclasses
+import json
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Optional
+
+from slack_sdk.web.async_client import AsyncWebClient
+
+from src.config import settings
+from src.services.db.connection import get_async_db
+from src.services.db.models import Workspace
+from src.services.db.rules import aget_active_rules
+from src.services.redis_client import (
+    RedisManager,
+    on_invalidation,
+    publish_invalidation,
+)
+from src.services.slack.installations import get_installation
+
+logger = logging.getLogger(__name__)
+
+_INVALIDATION_KIND = "workspace_context"
+_DM_NAME_TTL = 86400  # Slack display names rarely change
+_VERSION_TTL = 86400  # outlives any load in flight; a missing key reads as ""
+
+# Store the snapshot only if no invalidation bumped the version since the load began
+_STORE_LUA = """
+if (redis.call('GET', KEYS[2]) or '') ~= ARGV[1] then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], unpack(ARGV, 3))
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+
+@dataclass
+class WorkspaceContext:
+    workspace_id: str
+    team_id: str
+    decision_maker_id: str
+    decision_maker_name: str
+    persona: str
+    rules: list[dict]  # [{"id": int, "rule_text": str}]
+    bot_token: str = field(default="", repr=False)
+
+    def _to_hash(self) -> dict[str, str]:
+        return {
+            "workspace_id": self.workspace_id,
+            "team_id": self.team_id,
+            "decision_maker_id": self.decision_maker_id,
+            "decision_maker_name": self.decision_maker_name,
+            "persona": self.persona,
+            "rules": json.dumps(self.rules, ensure_ascii=False),
+        }
+
+    @classmethod
+    def _from_hash(cls, data: dict[str, str]) -> "WorkspaceContext":
+        return cls(
+            workspace_id=data["workspace_id"],
+            team_id=data.get("team_id", ""),
+            decision_maker_id=data.get("decision_maker_id", ""),
+            decision_maker_name=data.get("decision_maker_name", ""),
+            persona=data.get("persona", ""),
+            rules=json.loads(data.get("rules") or "[]"),
+        )
+
+
+# workspace_id -> (context without bot token, expires_at)
+_contexts: dict[str, tuple[WorkspaceContext, float]] = {}
+_lock = threading.Lock()
+_generation = 0  # bumped on every invalidation; guards in-flight loads
+_scripts: dict[int, tuple] = {}  # id(redis client) -> (client, registered store script)
+_stats = {"local_hits": 0, "redis_hits": 0, "misses": 0}
+
+
+def _redis_key(workspace_id: str) -> str:
+    return f"ws_ctx:{workspace_id}"
+
+
+def _dm_name_key(workspace_id: str) -> str:
+    return f"dm_name:{workspace_id}"
+
+
+def _version_key(workspace_id: str) -> str:
+    return f"ws_ctx_ver:{workspace_id}"
+
+
+async def get_workspace_context(team_id: str) -> Optional[WorkspaceContext]:
+    """Return the snapshot for a Slack team, or None if it is not installed."""
+    installation = await get_installation(team_id)
+    if installation is None:
+        return None
+    return await _get_context(installation.workspace_id, installation.bot_token)
+
+
+async def get_workspace_context_by_id(workspace_id: str) -> Optional[WorkspaceContext]:
+    """Return the snapshot for a workspace id (bot token looked up by team)."""
+    return await _get_context(workspace_id, None)
+
+
+async def _get_context(
+    workspace_id: str, bot_token: Optional[str],
+) -> Optional[WorkspaceContext]:
+    now = time.monotonic()
+    with _lock:
+        cached = _contexts.get(workspace_id)
+        if cached is not None and cached[1] > now:
+            _stats["local_hits"] += 1
+            return await _with_token(cached[0], bot_token)
+        generation = _generation
+
+    ctx = await _aredis_load(workspace_id)
+    if ctx is not None:
+        with _lock:
+            _stats["redis_hits"] += 1
+    else:
+        with _lock:
+            _stats["misses"] += 1
+        version = await _aredis_version(workspace_id)
+        ctx, bot_token = await _load(workspace_id, bot_token)
+        if ctx is None:
+            return None
+        with _lock:
+            current = generation == _generation
+        if current and version is not None:
+            await _aredis_store(ctx, version)
+
+    with _lock:
+        # Don't cache a snapshot read before an invalidation that raced with it
+        if generation == _generation:
+            _contexts[workspace_id] = (
+                ctx, now + settings.workspace_context_ttl_seconds,
+            )
+    return await _with_token(ctx, bot_token)
+
+
+async def _with_token(
+    ctx: WorkspaceContext, bot_token: Optional[str],
+) -> WorkspaceContext:
+    if bot_token is None:
+        installation = await get_installation(ctx.team_id) if ctx.team_id else None
+        bot_token = installation.bot_token if installation else ""
+    return dataclasses.replace(ctx, bot_token=bot_token)
+
+
+async def _load(
+    workspace_id: str, bot_token: Optional[str],
+) -> tuple[Optional[WorkspaceContext], Optional[str]]:
+    """Build a snapshot from the DB, Redis and Slack (both cache tiers missed)."""
+    async with get_async_db() as db:
+        workspace = await db.get(Workspace, uuid.UUID(workspace_id))
+        if workspace is None:
+            return None, bot_token
+        active_rules = await aget_active_rules(db, workspace.id)
+        rules = [{"id": r.id, "rule_text": r.rule_text} for r in active_rules]
+        team_id = workspace.slack_team_id
+        decision_maker_id = workspace.decision_maker_id or ""
+        if bot_token is None:
+            bot_token = workspace.bot_token or ""
+
+    cache = RedisManager.get_async_cache()
+    persona = ""
+    try:
+        persona = await cache.get(f"persona:{workspace_id}") or ""
+    except Exception:
+        logger.warning("Failed to read persona for workspace %s", workspace_id)
+
+    dm_name = await _decision_maker_name(workspace_id, decision_maker_id, bot_token)
+    ctx = WorkspaceContext(
+        workspace_id=workspace_id,
+        team_id=team_id,
+        decision_maker_id=decision_maker_id,
+        decision_maker_name=dm_name,
+        persona=persona,
+        rules=rules,
+    )
+    return ctx, bot_token
+
+
+async def _decision_maker_name(
+    workspace_id: str, decision_maker_id: str, bot_token: str,
+) -> str:
+    """Look up the decision-maker's display name, cached in Redis.
+
+    Falls back to empty string if anything fails.
+    """
+    if not decision_maker_id or not bot_token:
+        return ""
+
+    cache = RedisManager.get_async_cache()
+    cache_key = _dm_name_key(workspace_id)
+    try:
+        cached = await cache.get(cache_key)
+        if cached:
+            return cached
+    except Exception:
+        pass
+
+    try:
+        resp = await AsyncWebClient(token=bot_token).users_info(user=decision_maker_id)
+        user = resp["user"]
+        name = (
+            user.get("real_name")
+            or user.get("profile", {}).get("display_name")
+            or user.get("name", "")
+        )
+    except Exception:
+        logger.debug("Failed to look up decision-maker name for %s", workspace_id)
+        return ""
+
+    if name:
+        try:
+            await cache.set(cache_key, name, ex=_DM_NAME_TTL)
+        except Exception:
+            pass
+    return name
+
+
+async def _aredis_load(workspace_id: str) -> Optional[WorkspaceContext]:
+    try:
+        data = await RedisManager.get_async_cache().hgetall(_redis_key(workspace_id))
+        return WorkspaceContext._from_hash(data) if data else None
+    except Exception:
+        logger.warning("Workspace context Redis read failed for %s", workspace_id)
+        return None
+
+
+async def _aredis_version(workspace_id: str) -> Optional[str]:
+    """Current invalidation version ("" if never invalidated), None if unreadable."""
+    try:
+        return await RedisManager.get_async_cache().get(_version_key(workspace_id)) or ""
+    except Exception:
+        logger.warning("Workspace context version read failed for %s", workspace_id)
+        return None
+
+
+def _store_script(client):
+    script = _scripts.get(id(client))
+    if script is None or script[0] is not client:
+        script = _scripts[id(client)] = (client, client.register_script(_STORE_LUA))
+    return script[1]
+
+
+async def _aredis_store(ctx: WorkspaceContext, version: str) -> None:
+    """Store the snapshot unless the workspace was invalidated since ``version`` was read."""
+    fields = [item for pair in ctx._to_hash().items() for item in pair]
+    try:
+        script = _store_script(RedisManager.get_async_cache())
+        stored = await script(
+            keys=[_redis_key(ctx.workspace_id), _version_key(ctx.workspace_id)],
+            args=[version, settings.workspace_context_redis_ttl_seconds, *fields],
+        )
+        if not stored:
+            logger.info(
+                "Workspace context for %s changed while loading; not stored", ctx.workspace_id,
+            )
+    except Exception:
+        logger.warning("Workspace context Redis write failed for %s", ctx.workspace_id)
+
+
+# ── Invalidation ─────────────────────────────────────────────────────
+
+def invalidate_workspace_context(workspace_id: str) -> None:
+    """Drop a workspace's snapshot everywhere (call after changing its inputs).
+
+    The cached decision-maker name goes too, so a new decision-maker's name
+    reaches prompts right away, and the version bump keeps loads already in
+    flight from storing what they read.  Blocking (sync Redis client) — call via
+    ``asyncio.to_thread`` from the loop.
+    """
+    workspace_id = str(workspace_id)
+    try:
+        pipe = RedisManager.get_cache().pipeline(transaction=True)
+        pipe.incr(_version_key(workspace_id))
+        pipe.expire(_version_key(workspace_id), _VERSION_TTL)
+        pipe.delete(_redis_key(workspace_id), _dm_name_key(workspace_id))
+        pipe.execute()
+    except Exception:
+        logger.warning("Failed to delete workspace context for %s", workspace_id)
+    publish_invalidation(_INVALIDATION_KIND, workspace_id)
+
+
+def _drop(workspace_id: str) -> None:
+    global _generation
+    with _lock:
+        _generation += 1
+        if workspace_id == "*":
+            _contexts.clear()
+        else:
+            _contexts.pop(workspace_id, None)
+
+
+on_invalidation(_INVALIDATION_KIND, _drop)
+
+
+def get_workspace_context_stats() -> dict:
+    """Hit rates per tier and size of the in-process snapshot cache."""
+    with _lock:
+        local, remote, misses = (
+            _stats["local_hits"], _stats["redis_hits"], _stats["misses"],
+        )
+        size = len(_contexts)
+    lookups = local + remote + misses
+    return {
+        "size": size,
+        "local_hits": local,
+        "redis_hits": remote,
+        "misses": misses,
+        "hit_ratio": round((local + remote) / lookups, 4) if lookups else 0.0,
+    }
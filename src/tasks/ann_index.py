@@ -0,0 +1,29 @@
+"""Celery Beat tasks — adaptive ANN index maintenance.
+
+Hourly (and after each ingestion job): rebuild partitions' ANN indexes
+that no longer fit their size and calibrate search settings.  Daily:
+recount embeddings per workspace.  See ``src.services.db.ann_index``.
+"""
+
+import logging
+
+from src.worker import celery_app
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="maintain_ann_indexes")
+def maintain_ann_indexes_task(partitions: list[str] | None = None):
+    """Plan, rebuild and calibrate ANN indexes (see ann_index.maintain_indexes)."""
+    from src.services.db.ann_index import maintain_indexes
+
+    decisions = maintain_indexes(partitions)
+    return {"rebuilt": decisions}
+
+
+@celery_app.task(name="reconcile_embedding_counts")
+def reconcile_embedding_counts_task():
+    """Recount embeddings per workspace (see ann_index.reconcile_counts)."""
+    from src.services.db.ann_index import reconcile_counts
+
+    return {"workspaces": reconcile_counts()}
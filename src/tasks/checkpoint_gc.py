@@ -0,0 +1,22 @@
+"""Celery Beat task — checkpoint compaction and idle-thread GC.
+
+Hourly: trim recently active conversation threads to their latest
+checkpoint (summary + window), then delete threads idle for longer than
+``settings.checkpoint_thread_ttl_days``.
+"""
+
+import logging
+
+from src.worker import celery_app
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="compact_checkpoints")
+def compact_checkpoints_task():
+    """Compact active threads and purge idle ones (see checkpoint_gc)."""
+    from src.services.ai.checkpoint_gc import compact_threads, purge_idle_threads
+
+    compacted = compact_threads()
+    purged = purge_idle_threads()
+    return {"compacted": compacted, "purged": purged}
@@ -22,6 +22,8 @@ def sync_feedback_to_kb():
     """
     from src.services.db import get_db
     from src.services.db.models import QAHistory
+    from src.services.ai.answer_cache import invalidate_answer_cache
+    from src.services.ai.rate_limit import BULK, llm_priority
     from src.services.ai.vector_store import store_embeddings
     from sqlalchemy import select
 
@@ -55,7 +57,9 @@ def sync_feedback_to_kb():
                         "thread_ts": None,
                     }
 
-                    store_embeddings(str(record.workspace_id), [chunk])
+                    with llm_priority(BULK):
+                        store_embeddings(str(record.workspace_id), [chunk])
+                    invalidate_answer_cache(str(record.workspace_id))
 
                     # Mark as reflected
                     record.is_reflected = True
@@ -0,0 +1,85 @@
+"""Process-wide event loop for calling async code from sync code.
+
+Celery tasks and background threads are synchronous.  Calling
+``asyncio.run()`` there creates and destroys an event loop per call, which
+makes it impossible to share loop-bound resources (the checkpointer
+connection pool, async DB engine, ...) across requests.  ``run_sync``
+instead submits the coroutine to a single long-lived loop running in a
+daemon thread, so those resources are created once and reused for the
+lifetime of the process.
+
+In the web process the Slack handlers are async and run on uvicorn's loop,
+which ``adopt_loop`` registers as the process loop; ``run_sync`` then
+submits to that loop (e.g. from the ``/slough-ingest`` background thread),
+so the loop-bound resources are still shared with the handlers.
+"""
+
+import asyncio
+import logging
+import threading
+from typing import Any, Coroutine, Optional
+
+logger = logging.getLogger(__name__)
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_thread: Optional[threading.Thread] = None
+_lock = threading.Lock()
+
+
+def adopt_loop(loop: asyncio.AbstractEventLoop) -> None:
+    """Use an already running loop (the server's) as the process loop."""
+    global _loop, _thread
+    with _lock:
+        if _thread is not None:
+            raise RuntimeError("Background event loop already started")
+        _loop = loop
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Return the process event loop, starting a background one on first use."""
+    global _loop, _thread
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+            _thread = threading.Thread(
+                target=_loop.run_forever,
+                name="slough-async-loop",
+                daemon=True,
+            )
+            _thread.start()
+            logger.debug("Started background event loop")
+        return _loop
+
+
+def run_sync(coro: Coroutine[Any, Any, Any], timeout: Optional[float] = None) -> Any:
+    """Run ``coro`` on the process loop and block until it finishes.
+
+    Must not be called from the process loop itself (it would deadlock).
+    """
+    loop = get_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("run_sync() called from the process event loop")
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    return future.result(timeout=timeout)
+
+
+def shutdown_loop(timeout: float = 5.0) -> None:
+    """Stop the background loop and wait for its thread to exit.
+
+    An adopted loop is only forgotten; its owner (uvicorn) stops it.
+    """
+    global _loop, _thread
+    with _lock:
+        loop, thread = _loop, _thread
+        _loop, _thread = None, None
+    if loop is None or thread is None:
+        return
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=timeout)
+    if not loop.is_running():
+        loop.close()
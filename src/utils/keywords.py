@@ -1,5 +1,9 @@
+from src.utils.matcher import AhoCorasick
+
 HIGH_RISK_KEYWORDS = ["계약", "해고", "투자", "법적", "소송", "퇴사", "연봉"]
 
+_automaton = AhoCorasick(HIGH_RISK_KEYWORDS)
+
 
 def detect_high_risk_keywords(text: str) -> dict:
     """Check text for high-risk Korean keywords.
@@ -7,5 +11,5 @@ def detect_high_risk_keywords(text: str) -> dict:
     Returns:
         {"is_high_risk": bool, "keywords": list[str]}
     """
-    found = [kw for kw in HIGH_RISK_KEYWORDS if kw in text]
+    found = [HIGH_RISK_KEYWORDS[i] for i in _automaton.find(text)]
     return {"is_high_risk": len(found) > 0, "keywords": found}
@@ -0,0 +1,68 @@
+"""Aho-Corasick multi-pattern substring matcher.
+
+Builds a trie of all patterns with failure links once, then finds every
+pattern occurring in a text in a single pass — O(len(text) + matches)
+regardless of how many patterns there are.
+"""
+
+from collections import deque
+from typing import Iterable
+
+
+class AhoCorasick:
+    """Compiled automaton over a fixed list of patterns.
+
+    ``find(text)`` returns the indices (into the original pattern list) of
+    all patterns that occur in ``text`` as substrings, in ascending order.
+    Empty patterns never match.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = list(patterns)
+        # Node 0 is the root; each node has goto edges, a failure link and
+        # the pattern indices ending there (including via failure links)
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[list[int]] = [[]]
+
+        for index, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            node = 0
+            for char in pattern:
+                nxt = self._goto[node].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = nxt
+            self._out[node].append(index)
+
+        self._build_failure_links()
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._out[child].extend(self._out[self._fail[child]])
+
+    def find(self, text: str) -> list[int]:
+        """Return the sorted indices of all patterns found in ``text``."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: set[int] = set()
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if out[node]:
+                found.update(out[node])
+        return sorted(found)
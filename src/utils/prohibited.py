@@ -1,5 +1,7 @@
 """Prohibited domain checker — refuses questions about topics the bot should not answer."""
 
+from src.utils.matcher import AhoCorasick
+
 # Keywords that indicate prohibited domains
 # (legal, financial, HR decisions, interpersonal)
 PROHIBITED_KEYWORDS = [
@@ -24,14 +26,15 @@ PROHIBITED_DOMAINS = [
 ]
 
 
+_PHRASES = PROHIBITED_KEYWORDS + PROHIBITED_DOMAINS
+_automaton = AhoCorasick(_PHRASES)
+
+
 def check_prohibited(text: str) -> dict:
     """Check if a question falls into a prohibited domain.
 
     Returns:
         {"is_prohibited": bool, "matched": list[str]}
     """
-    matched = []
-    for phrase in PROHIBITED_KEYWORDS + PROHIBITED_DOMAINS:
-        if phrase in text:
-            matched.append(phrase)
+    matched = [_PHRASES[i] for i in _automaton.find(text)]
     return {"is_prohibited": len(matched) > 0, "matched": matched}
@@ -0,0 +1,105 @@
+"""Per-workspace question screening — rules, high-risk keywords, prohibited phrases.
+
+All three pattern sets are compiled into one ``AhoCorasick`` automaton per
+workspace, so a question is screened in a single linear pass however many
+rules the workspace has.  Automata are cached and rebuilt only when the
+workspace's rule texts change.
+"""
+
+import hashlib
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+from src.utils.keywords import HIGH_RISK_KEYWORDS
+from src.utils.matcher import AhoCorasick
+from src.utils.prohibited import PROHIBITED_DOMAINS, PROHIBITED_KEYWORDS
+
+_PROHIBITED_PHRASES = PROHIBITED_KEYWORDS + PROHIBITED_DOMAINS
+
+
+@dataclass
+class QuestionMatch:
+    """Result of screening one question."""
+
+    rule_text: Optional[str] = None  # first matching rule, in rule order
+    high_risk_keywords: list[str] = field(default_factory=list)
+    prohibited: list[str] = field(default_factory=list)
+
+    @property
+    def is_prohibited(self) -> bool:
+        return bool(self.prohibited)
+
+    @property
+    def is_high_risk(self) -> bool:
+        return bool(self.high_risk_keywords)
+
+    def as_state(self) -> dict:
+        """Screening fields for ``AgentState`` (see ``check_rules``/``check_safety``)."""
+        return {
+            "matched_rule": self.rule_text or "",
+            "is_safe": not self.is_prohibited,
+            "is_prohibited": self.is_prohibited,
+            # Prohibited questions are refused, so they are not flagged as risky
+            "is_high_risk": self.is_high_risk and not self.is_prohibited,
+            "safety_checked": True,
+        }
+
+
+class QuestionMatcher:
+    """One automaton over a workspace's rules plus the built-in keyword lists.
+
+    Matching is case-insensitive (text and patterns are lowercased once),
+    as rule matching always was; the keyword lists are Hangul, which has no
+    case, so their behaviour is unchanged.
+    """
+
+    def __init__(self, rule_texts: list[str]):
+        self._rules = [r for r in rule_texts if r]
+        patterns = self._rules + HIGH_RISK_KEYWORDS + _PROHIBITED_PHRASES
+        self._automaton = AhoCorasick(p.lower() for p in patterns)
+        self._risk_start = len(self._rules)
+        self._prohibited_start = self._risk_start + len(HIGH_RISK_KEYWORDS)
+
+    def scan(self, text: str) -> QuestionMatch:
+        match = QuestionMatch()
+        for index in self._automaton.find(text.lower()):
+            if index < self._risk_start:
+                if match.rule_text is None:
+                    match.rule_text = self._rules[index]
+            elif index < self._prohibited_start:
+                match.high_risk_keywords.append(HIGH_RISK_KEYWORDS[index - self._risk_start])
+            else:
+                match.prohibited.append(_PROHIBITED_PHRASES[index - self._prohibited_start])
+        return match
+
+
+# ── Per-workspace cache ──────────────────────────────────────────────
+
+_matchers: dict[str, tuple[str, QuestionMatcher]] = {}
+_matchers_lock = threading.Lock()
+
+
+def _fingerprint(rule_texts: list[str]) -> str:
+    return hashlib.sha1("\x1f".join(rule_texts).encode()).hexdigest()
+
+
+def get_question_matcher(workspace_id: str, rules: list[dict]) -> QuestionMatcher:
+    """Return the cached matcher for a workspace, rebuilding it if its rules changed."""
+    rule_texts = [r.get("rule_text", "") for r in rules]
+    fingerprint = _fingerprint(rule_texts)
+
+    with _matchers_lock:
+        cached = _matchers.get(workspace_id)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+
+    matcher = QuestionMatcher(rule_texts)
+    with _matchers_lock:
+        _matchers[workspace_id] = (fingerprint, matcher)
+    return matcher
+
+
+def scan_question(workspace_id: str, rules: list[dict], text: str) -> QuestionMatch:
+    """Screen a question against a workspace's rules, risk keywords and prohibited phrases."""
+    return get_question_matcher(workspace_id, rules).scan(text)
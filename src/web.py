@@ -1,12 +1,31 @@
 """FastAPI app with OAuth install routes, health check, and Bolt HTTP handler."""
 
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
-from slack_bolt import App as BoltApp
-from slack_bolt.adapter.fastapi import SlackRequestHandler
-
+from slack_bolt.adapter.fastapi.async_handler import AsyncSlackRequestHandler
+from slack_bolt.app.async_app import AsyncApp
+
+from src.config import settings
+
+from src.services.ai import get_fast_path_stats, shut_down, warm_up
+from src.services.ai.answer_cache import get_answer_cache_stats
+from src.services.ai.embeddings import get_query_embedding_memo_stats
+from src.services.ai.llm import get_llm_stats
+from src.services.ai.memory import get_checkpointer_stats
+from src.services.ai.nodes import get_rewrite_memo_stats, get_rewrite_stats
+from src.services.ai.rate_limit import get_rate_limit_stats
+from src.services.db.connection import get_async_pool_stats
+from src.services.db.embedding_storage import verify_storage
+from src.services.redis_client import (
+    RedisManager,
+    start_invalidation_listener,
+    stop_invalidation_listener,
+)
+from src.services.slack.installations import get_installation_cache_stats
 from src.services.slack.oauth import (
     build_authorize_url,
     exchange_code_for_token,
@@ -15,19 +34,84 @@ from src.services.slack.oauth import (
     send_welcome_dm,
     validate_state,
 )
+from src.services.workspace_context import get_workspace_context_stats
+from src.utils.aio import adopt_loop, shutdown_loop
 
 logger = logging.getLogger(__name__)
 
 
-def create_web_app(bolt_app: BoltApp) -> FastAPI:
-    """Create the FastAPI app with Bolt handler mounted."""
-    web_app = FastAPI(title="Slough.ai", docs_url=None, redoc_url=None)
-    handler = SlackRequestHandler(bolt_app)
+@asynccontextmanager
+async def _lifespan(web_app: FastAPI):
+    """Open process-lifetime resources on startup and close them on shutdown.
+
+    Slack handlers and the AI pipeline run on this (uvicorn's) loop, which
+    is also registered as the process loop for sync callers, so the
+    checkpointer pool, async DB engine and Redis client all live on it.
+    """
+    adopt_loop(asyncio.get_running_loop())
+    # Fatal: every search would fail against columns of another storage mode
+    await asyncio.to_thread(verify_storage)
+    start_invalidation_listener()
+    try:
+        await warm_up()
+    except Exception:
+        # Not fatal — get_checkpointer() retries lazily on the first question
+        logger.exception("AI pipeline warm-up failed")
+
+    socket_handler = None
+    if web_app.state.socket_mode:
+        from slack_bolt.adapter.socket_mode.async_handler import AsyncSocketModeHandler
+
+        socket_handler = AsyncSocketModeHandler(web_app.state.bolt_app, settings.slack_app_token)
+        await socket_handler.connect_async()
+
+    yield
+
+    if socket_handler is not None:
+        await socket_handler.close_async()
+    await stop_invalidation_listener()
+    try:
+        await asyncio.wait_for(shut_down(), timeout=10)
+    except Exception:
+        logger.exception("Failed to shut down AI pipeline")
+    await RedisManager.close_async_cache()
+    shutdown_loop()
+
+
+def create_web_app(bolt_app: AsyncApp, *, socket_mode: bool = False) -> FastAPI:
+    """Create the FastAPI app with Bolt handler mounted.
+
+    With ``socket_mode`` the Bolt app also connects over Socket Mode at
+    startup (local development).
+    """
+    web_app = FastAPI(
+        title="Slough.ai", docs_url=None, redoc_url=None, lifespan=_lifespan,
+    )
+    web_app.state.bolt_app = bolt_app
+    web_app.state.socket_mode = socket_mode
+    handler = AsyncSlackRequestHandler(bolt_app)
 
     @web_app.get("/health")
     def health():
         return {"status": "ok"}
 
+    @web_app.get("/metrics")
+    def metrics():
+        """In-process performance counters (pool usage, cache hit rates, ...)."""
+        return {
+            "fast_path": get_fast_path_stats(),
+            "installations": get_installation_cache_stats(),
+            "workspace_context": get_workspace_context_stats(),
+            "checkpointer": get_checkpointer_stats(),
+            "async_db": get_async_pool_stats(),
+            "answer_cache": get_answer_cache_stats(),
+            "llm": get_llm_stats(),
+            "llm_rate_limit": get_rate_limit_stats(),
+            "query_rewrite": get_rewrite_stats(),
+            "query_rewrite_memo": get_rewrite_memo_stats(),
+            "query_embedding_memo": get_query_embedding_memo_stats(),
+        }
+
     @web_app.post("/slack/events")
     async def slack_events(req: Request):
         """Handle all Slack events, commands, and interactions via HTTP."""
@@ -2,6 +2,7 @@
 
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_init
 
 from src.config import settings
 
@@ -35,6 +36,21 @@ celery_app.conf.update(
             "task": "sync_rules_from_db",
             "schedule": crontab(hour=0, minute=0),
         },
+        # 매시간 체크포인트 압축 + 유휴 스레드 정리
+        "compact-checkpoints-hourly": {
+            "task": "compact_checkpoints",
+            "schedule": crontab(minute=30),
+        },
+        # 매시간 파티션별 ANN 인덱스 점검 (재구축 + recall 보정)
+        "maintain-ann-indexes-hourly": {
+            "task": "maintain_ann_indexes",
+            "schedule": crontab(minute=45),
+        },
+        # 매일 새벽 워크스페이스별 임베딩 수 재집계
+        "reconcile-embedding-counts-daily": {
+            "task": "reconcile_embedding_counts",
+            "schedule": crontab(hour=4, minute=0),
+        },
     },
 )
 
@@ -42,4 +58,17 @@ celery_app.conf.include = [
     "src.tasks.ingestion",
     "src.tasks.weekly_report",
     "src.tasks.feedback_sync",
+    "src.tasks.checkpoint_gc",
+    "src.tasks.ann_index",
 ]
+
+
+@worker_init.connect
+def _check_embedding_storage(**_):
+    """Refuse to start ingesting into columns of another storage mode."""
+    from src.services.db.embedding_storage import verify_storage
+
+    try:
+        verify_storage()
+    except RuntimeError as exc:
+        raise SystemExit(str(exc)) from exc  # exceptions from signal handlers are only logged
@@ -0,0 +1,110 @@
+"""체크포인트 GC가 실제 Postgres 체크포인트 테이블에서 지우는 범위 검증 (DB 없으면 skip).
+
+테스트마다 새 workspace_id 접두사의 스레드만 쓰고, 끝나면 그 범위를 지운다.
+"""
+
+import asyncio
+import uuid
+
+import psycopg
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from psycopg.rows import dict_row
+from sqlalchemy import text as sa_text
+
+from src.config import settings
+from src.services.ai import checkpoint_gc
+from src.services.ai.compact_saver import CompactPostgresSaver
+from src.services.ai.graph import create_graph
+from src.services.db.connection import engine
+
+_TABLES = ("checkpoint_writes", "checkpoint_blobs", "checkpoints")
+
+
+def _run(body):
+    """Run ``body(saver)`` against the configured database, then drop its threads."""
+    prefix = str(uuid.uuid4())
+
+    async def run():
+        try:
+            conn = await psycopg.AsyncConnection.connect(
+                settings.postgres_dsn, autocommit=True, prepare_threshold=0, row_factory=dict_row,
+            )
+        except psycopg.OperationalError:
+            pytest.skip("PostgreSQL is not available")
+        async with conn:
+            saver = CompactPostgresSaver(conn)
+            await saver.setup()
+            try:
+                return await body(saver, prefix)
+            finally:
+                with engine.begin() as db:
+                    for table in _TABLES:
+                        db.execute(sa_text(f"DELETE FROM {table} WHERE thread_id LIKE :p"), {"p": f"{prefix}%"})
+
+    return asyncio.run(run())
+
+
+async def _write_turns(saver, thread_id: str, turns: int):
+    graph = create_graph().compile(checkpointer=saver)
+    config = {"configurable": {"thread_id": thread_id}}
+    for i in range(turns):
+        await graph.aupdate_state(
+            config, {"messages": [HumanMessage(f"q{i}"), AIMessage(f"a{i}")]}, as_node="generate",
+        )
+    await graph.aupdate_state(config, {"summary": "요약"}, as_node="generate")
+    return graph, config
+
+
+def test_workspace_threads_are_found_by_prefix_without_the_registry():
+    async def body(saver, prefix):
+        for thread_id in (f"{prefix}:U1", f"{prefix}:U2", f"{prefix}0:U1"):
+            await _write_turns(saver, thread_id, 1)
+        with engine.begin() as db:
+            return sorted(checkpoint_gc._workspace_thread_ids(db, prefix, 10)), prefix
+
+    found, prefix = _run(body)
+    # Not registered in conversation_threads, and "{prefix}0:U1" is another workspace
+    assert found == [f"{prefix}:U1", f"{prefix}:U2"]
+
+
+def _blobs(thread_id: str) -> set[tuple[str, str]]:
+    with engine.connect() as db:
+        return set(db.execute(
+            sa_text("SELECT channel, version FROM checkpoint_blobs WHERE thread_id = :t"),
+            {"t": thread_id},
+        ).all())
+
+
+def _checkpoint_count(thread_id: str) -> int:
+    with engine.connect() as db:
+        return db.execute(
+            sa_text("SELECT count(*) FROM checkpoints WHERE thread_id = :t"), {"t": thread_id},
+        ).scalar()
+
+
+def test_prune_keeps_the_latest_checkpoint_and_the_blobs_it_references():
+    async def body(saver, prefix):
+        thread_id = f"{prefix}:U1"
+        graph, config = await _write_turns(saver, thread_id, 3)
+        before = (await graph.aget_state(config)).values
+        referenced = (await saver.aget_tuple(config)).checkpoint["channel_versions"]
+        blobs_before = _blobs(thread_id)
+        assert _checkpoint_count(thread_id) == 4
+
+        with engine.begin() as db:
+            deleted = checkpoint_gc._prune_old_versions(db, thread_id)
+
+        after = (await graph.aget_state(config)).values
+        return before, after, referenced, blobs_before, _blobs(thread_id), _checkpoint_count(thread_id), deleted
+
+    before, after, referenced, blobs_before, blobs_after, checkpoints, deleted = _run(body)
+
+    assert checkpoints == 1 and deleted > 0
+    assert [m.content for m in after["messages"]] == [m.content for m in before["messages"]]
+    assert after["summary"] == before["summary"] == "요약"
+    # Exactly the blobs the latest checkpoint points to survive — including
+    # the messages blob, written by an older checkpoint than the latest
+    assert blobs_after == {(ch, v) for ch, v in blobs_before if referenced.get(ch) == v}
+    assert ("messages", referenced["messages"]) in blobs_after
+    assert len(blobs_before) > len(blobs_after)
@@ -0,0 +1,93 @@
+"""벡터 검색 SQL이 ANN 인덱스를 쓸 수 있는지 EXPLAIN으로 검증 (DB 없으면 skip).
+
+트랜잭션 안에서 인덱스를 만들고 seq scan을 끈 뒤 실행 계획을 확인하고,
+끝나면 롤백한다 — 테스트 DB에 흔적을 남기지 않는다.
+"""
+
+import uuid
+
+import pytest
+from sqlalchemy import text as sa_text
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.services.ai import vector_store
+from src.services.db.connection import engine
+
+
+_ANN_INDEXES_SQL = sa_text("""
+    SELECT i.indexrelid::regclass::text
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    JOIN pg_am am ON am.oid = c.relam
+    WHERE am.amname IN ('ivfflat', 'hnsw')
+      AND i.indrelid::regclass::text LIKE 'embeddings%'
+""")
+
+
+@pytest.fixture
+def conn():
+    try:
+        connection = engine.connect()
+    except SQLAlchemyError:
+        pytest.skip("PostgreSQL is not available")
+    transaction = connection.begin()
+    try:
+        # Unpartitioned schema (create_all) has no ANN index; partitioned
+        # (migration 010) has one per leaf partition
+        if not connection.execute(_ANN_INDEXES_SQL).first():
+            connection.execute(sa_text("""
+                CREATE INDEX ix_embeddings_cosine
+                ON embeddings USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100)
+            """))
+    except SQLAlchemyError:
+        transaction.rollback()
+        connection.close()
+        pytest.skip("embeddings table / pgvector is not available")
+    connection.execute(sa_text("SET LOCAL enable_seqscan = off"))
+    yield connection
+    transaction.rollback()
+    connection.close()
+
+
+def _plan(conn, statement, params) -> str:
+    rows = conn.execute(sa_text(f"EXPLAIN {statement.text}"), params).fetchall()
+    return "\n".join(row[0] for row in rows)
+
+
+def _uses_ann_index(conn, plan: str) -> bool:
+    return any(f"using {name} " in plan for name in conn.execute(_ANN_INDEXES_SQL).scalars())
+
+
+def test_single_query_search_uses_ann_index(conn):
+    params = vector_store._search_params(str(uuid.uuid4()), [0.01] * 1536, k=8, threshold=0.3)
+
+    plan = _plan(conn, vector_store._SEARCH_SQL, params)
+
+    assert _uses_ann_index(conn, plan), plan
+    assert "Seq Scan on embeddings" not in plan, plan
+
+
+def test_multi_query_search_uses_ann_index_per_variant(conn):
+    params = vector_store._multi_search_params(
+        str(uuid.uuid4()), [[0.01] * 1536, [0.02] * 1536], k=8, threshold=0.3,
+    )
+
+    plan = _plan(conn, vector_store._multi_search_sql(2), params)
+
+    assert _uses_ann_index(conn, plan), plan
+    assert "Seq Scan on embeddings" not in plan, plan
+
+
+def test_binary_prefilter_uses_hamming_index(conn):
+    has_column = conn.execute(sa_text("""
+        SELECT EXISTS (SELECT 1 FROM pg_attribute
+                       WHERE attrelid = 'embeddings'::regclass AND attname = 'embedding_bq')
+    """)).scalar()
+    if not has_column:
+        pytest.skip("embedding_bq (scripts/add_binary_embeddings.py) is not available")
+    params = vector_store._search_params(str(uuid.uuid4()), [0.01] * 1536, k=8, threshold=0.3)
+
+    plan = _plan(conn, vector_store._BINARY_SEARCH_SQL, params)
+
+    assert "_bq on" in plan, plan
+    assert "Seq Scan on embeddings" not in plan, plan
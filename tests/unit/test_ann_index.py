@@ -0,0 +1,110 @@
+"""ANN 인덱스 관리자 — 파티션 크기별 인덱스 선택·재구축 판단과 검색 GUC 계산 검증."""
+
+import pytest
+
+from src.services.db import ann_index
+
+
+@pytest.fixture(autouse=True)
+def _thresholds(monkeypatch):
+    monkeypatch.setattr(ann_index.settings, "ann_hnsw_min_rows", 200_000)
+    monkeypatch.setattr(ann_index.settings, "ann_rebuild_growth_factor", 2.0)
+    monkeypatch.setattr(ann_index.settings, "ann_min_rebuild_rows", 1_000)
+
+
+def _ivfflat(lists: int, rows_at_build: int) -> dict:
+    return {"method": "ivfflat", "lists": lists, "rows_at_build": rows_at_build}
+
+
+def test_partition_without_index_gets_one_sized_to_its_rows():
+    assert ann_index.plan_index(30_000, None) == ann_index.IndexPlan("ivfflat", 30, "no ANN index")
+    assert ann_index.plan_index(500_000, None).method == "hnsw"
+
+
+def test_ivfflat_is_rebuilt_only_after_doubling_or_halving():
+    current = _ivfflat(20, 20_000)
+    assert ann_index.plan_index(39_999, current) is None
+    assert ann_index.plan_index(40_000, current).lists == 40
+    assert ann_index.plan_index(10_000, current).lists == 10
+
+
+def test_small_partitions_are_left_alone():
+    # 1,000행 미만 파티션은 인덱스 없이 정확 검색하고, 이미 있는 인덱스도 그대로 둔다
+    assert ann_index.plan_index(900, None) is None
+    assert ann_index.plan_index(1_000, None).reason == "no ANN index"
+    assert ann_index.plan_index(900, _ivfflat(10, 0)) is None
+    assert ann_index.plan_index(1_000, _ivfflat(10, 0)).reason.endswith("since the last build")
+
+
+def test_hnsw_switch_has_hysteresis():
+    hnsw = {"method": "hnsw", "lists": None, "rows_at_build": 250_000}
+    assert ann_index.plan_index(200_000, _ivfflat(200, 150_000)).method == "hnsw"
+    assert ann_index.plan_index(150_000, hnsw) is None
+    assert ann_index.plan_index(90_000, hnsw).method == "ivfflat"
+
+
+def test_search_gucs_default_without_profile(monkeypatch):
+    monkeypatch.setattr(ann_index.settings, "vector_search_probes", 10)
+    assert ann_index.index_gucs(None, 50) == {"probes": "10", "ef_search": "50"}
+
+
+def test_search_gucs_widen_for_small_share_of_shared_partition():
+    # 전용 파티션: 보정값 그대로
+    dedicated = (100_000, "ivfflat", 100, 100_000, 4, None)
+    assert ann_index.index_gucs(dedicated, 50)["probes"] == "4"
+    # 공유 파티션의 작은 워크스페이스: 필터 후에도 후보 50개가 남도록 확장
+    shared = (500, "ivfflat", 100, 100_000, 4, None)
+    assert ann_index.index_gucs(shared, 50)["probes"] == "10"
+    tiny = (20, "ivfflat", 100, 100_000, 4, None)
+    assert ann_index.index_gucs(tiny, 50)["probes"] == "100"
+    hnsw = (10_000, "hnsw", None, 500_000, None, 80)
+    assert ann_index.index_gucs(hnsw, 50)["ef_search"] == "1000"
+    assert ann_index.index_gucs((400_000, "hnsw", None, 500_000, None, 80), 50)["ef_search"] == "80"
+
+
+def test_binary_prefilter_ef_search_covers_its_candidates():
+    dedicated = (150_000, "ivfflat", 150, 150_000, 4, None)
+    assert ann_index.index_gucs(dedicated, 400, binary=True)["ef_search"] == "400"
+    shared = (150_000, "hnsw", None, 300_000, None, 60)
+    assert ann_index.index_gucs(shared, 400, binary=True)["ef_search"] == "800"
+
+
+def test_binary_prefilter_falls_back_without_embedding_bq(monkeypatch):
+    from src.services.ai import vector_store
+
+    checks = []
+
+    def fake_has_binary_column(db):
+        checks.append(db)
+        return False
+
+    class _Session:
+        def __enter__(self):
+            return "db"
+
+        def __exit__(self, *exc):
+            return False
+
+    monkeypatch.setattr(ann_index, "has_binary_column", fake_has_binary_column)
+    monkeypatch.setattr(ann_index, "get_db", _Session)
+    monkeypatch.setattr(ann_index, "_binary_column_cache", {})
+    monkeypatch.setattr(ann_index.settings, "vector_search_binary_prefilter", True)
+    monkeypatch.setattr(ann_index.settings, "vector_search_binary_min_rows", 100_000)
+    large = (150_000, "hnsw", None, 150_000, None, 60)
+
+    assert vector_store._use_binary_prefilter(large) is False
+    assert vector_store._use_binary_prefilter(large) is False
+    assert checks == ["db"]  # the column check is cached
+
+    ann_index._cache_binary_column(True)
+    assert vector_store._use_binary_prefilter(large) is True
+    assert vector_store._use_binary_prefilter((500, "hnsw", None, 150_000, None, 60)) is False
+
+
+def test_binary_prefilter_is_off_when_the_check_fails(monkeypatch):
+    def unreachable():
+        raise ConnectionError("db down")
+
+    monkeypatch.setattr(ann_index, "get_db", unreachable)
+    monkeypatch.setattr(ann_index, "_binary_column_cache", {})
+    assert ann_index.binary_column_available() is False
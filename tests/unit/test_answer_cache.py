@@ -0,0 +1,65 @@
+"""시맨틱 답변 캐시: 후속 질문은 캐시를 건너뛰고, 거절된 답변은 캐시를 무효화하는지 검증."""
+
+import asyncio
+import time
+
+import src.services.ai as ai
+from src.config import settings
+from src.services.ai import nodes
+from src.services.ai.answer_cache import CachedAnswer
+
+
+def _fake_cache(monkeypatch, lookups):
+    async def fake_embed(text):
+        return [0.1, 0.2]
+
+    async def fake_lookup(workspace_id, embedding):
+        lookups.append(workspace_id)
+        return CachedAnswer(qa_id="qa1", answer="캐시된 답변", similarity=0.97, is_high_risk=False)
+
+    monkeypatch.setattr(settings, "answer_cache_enabled", True)
+    monkeypatch.setattr(nodes, "aembed_text", fake_embed)
+    monkeypatch.setattr(nodes, "lookup_cached_answer", fake_lookup)
+
+
+def test_first_question_of_a_conversation_is_served_from_cache(monkeypatch):
+    lookups = []
+    _fake_cache(monkeypatch, lookups)
+    idle = time.time() - settings.answer_cache_followup_seconds - 60
+
+    result = asyncio.run(nodes.lookup_cache(
+        {"workspace_id": "w1", "question": "휴가 규정은?", "last_turn_at": idle}
+    ))
+
+    assert result["is_cache_hit"] is True
+    assert result["answer"] == "캐시된 답변"
+    assert result["last_turn_at"] > idle
+    assert lookups == ["w1"]
+
+
+def test_followup_question_skips_the_cache(monkeypatch):
+    lookups = []
+    _fake_cache(monkeypatch, lookups)
+
+    result = asyncio.run(nodes.lookup_cache(
+        {"workspace_id": "w1", "question": "작년에는요?", "last_turn_at": time.time() - 30}
+    ))
+
+    assert result["is_cache_hit"] is False
+    assert "question_embedding" not in result  # the answer is not stored as an entry
+    assert lookups == []
+
+
+def test_rejected_feedback_invalidates_the_workspace_cache(monkeypatch):
+    invalidated = []
+
+    async def fake_invalidate(workspace_id):
+        invalidated.append(workspace_id)
+
+    monkeypatch.setattr(ai, "ainvalidate_answer_cache", fake_invalidate)
+
+    asyncio.run(ai.process_feedback("w1", "qa1", "approved"))
+    assert invalidated == []
+
+    asyncio.run(ai.process_feedback("w1", "qa1", "rejected"))
+    assert invalidated == ["w1"]
@@ -0,0 +1,69 @@
+"""체크포인트 GC 배치: 한 번에 checkpoint_gc_batch_size개씩, 짧은 배치에서 멈추는지 검증 (DB 없이)."""
+
+from contextlib import nullcontext
+
+import pytest
+
+from src.services.ai import checkpoint_gc
+from src.services.db import connection, threads
+from src.utils import aio
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Fake registry of thread ids; batches and deletions are recorded."""
+    state = {"threads": [], "limits": [], "deleted": [], "pruned": [], "compacted": []}
+
+    def take(db, since, limit):
+        state["limits"].append(limit)
+        return state["threads"][:limit]
+
+    def delete_checkpoints(db, thread_ids):
+        state["deleted"].append(list(thread_ids))
+        return len(thread_ids)
+
+    def forget(db, thread_ids):
+        state["threads"] = [t for t in state["threads"] if t not in thread_ids]
+
+    monkeypatch.setattr(connection, "get_db", nullcontext)
+    monkeypatch.setattr(checkpoint_gc.settings, "checkpoint_gc_batch_size", 2)
+    monkeypatch.setattr(threads, "get_idle_thread_ids", take)
+    monkeypatch.setattr(threads, "get_threads_to_compact", take)
+    monkeypatch.setattr(threads, "delete_threads", forget)
+    monkeypatch.setattr(threads, "mark_threads_compacted", forget)
+    monkeypatch.setattr(checkpoint_gc, "delete_thread_checkpoints", delete_checkpoints)
+    monkeypatch.setattr(
+        checkpoint_gc, "_prune_old_versions",
+        lambda db, thread_id: state["pruned"].append(thread_id) or 1,
+    )
+    monkeypatch.setattr(aio, "run_sync", lambda coro: coro.close())
+    return state
+
+
+def test_purge_deletes_in_batches_and_stops_after_a_short_one(registry):
+    registry["threads"] = [f"w:u{i}" for i in range(5)]
+
+    result = checkpoint_gc.purge_idle_threads()
+
+    assert registry["limits"] == [2, 2, 2]
+    assert registry["deleted"] == [["w:u0", "w:u1"], ["w:u2", "w:u3"], ["w:u4"]]
+    assert result == {"threads": 5, "rows_deleted": 5}
+
+
+def test_purge_stops_on_an_empty_batch(registry):
+    registry["threads"] = [f"w:u{i}" for i in range(4)]
+
+    assert checkpoint_gc.purge_idle_threads()["threads"] == 4
+    assert registry["limits"] == [2, 2, 2]  # the third batch came back empty
+
+
+def test_compaction_is_capped_per_run(registry, monkeypatch):
+    monkeypatch.setattr(checkpoint_gc, "_MAX_BATCHES_PER_RUN", 3)
+    monkeypatch.setattr(threads, "mark_threads_compacted", lambda db, thread_ids: None)
+    registry["threads"] = [f"w:u{i}" for i in range(10)]  # never marked: always due
+
+    result = checkpoint_gc.compact_threads()
+
+    assert registry["limits"] == [2, 2, 2]
+    assert registry["pruned"] == ["w:u0", "w:u1"] * 3
+    assert result["threads"] == 6
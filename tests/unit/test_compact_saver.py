@@ -0,0 +1,33 @@
+"""체크포인트 압축 저장: 직렬화 왕복, 압축 적용, 턴 단위 필드 제외 검증."""
+
+from langchain_core.messages import HumanMessage
+
+from src.services.ai.compact_saver import CompressedSerializer, strip_transient
+
+
+def test_large_payloads_are_compressed_and_round_trip():
+    serde = CompressedSerializer()
+    messages = [HumanMessage(content="휴가 정책 " * 200, id="h1")]
+
+    type_, data = serde.dumps_typed(messages)
+    assert type_.endswith("+zlib")
+    assert serde.loads_typed((type_, data)) == messages
+
+    # Small values stay uncompressed; pre-existing payloads still load
+    assert serde.dumps_typed("짧음")[0] == "msgpack"
+    plain = serde.dumps_typed({"a": 1})
+    assert serde.loads_typed(plain) == {"a": 1}
+
+
+def test_transient_fields_are_not_persisted():
+    checkpoint = {
+        "id": "c1",
+        "channel_values": {"messages": [], "summary": "s", "context": ["doc"], "is_safe": True},
+        "channel_versions": {},
+    }
+    stripped, versions = strip_transient(
+        checkpoint, {"messages": "2", "context": "2", "is_safe": "2"},
+    )
+    assert set(stripped["channel_values"]) == {"messages", "summary"}
+    assert versions == {"messages": "2"}
+    assert "context" in checkpoint["channel_values"]  # input is not mutated
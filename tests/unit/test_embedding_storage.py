@@ -0,0 +1,114 @@
+"""임베딩 저장 방식 — 컬럼 타입, 축소 SQL, API 요청 차원 검증."""
+
+import pytest
+
+from src.services.db import embedding_storage
+
+
+def test_default_is_full_precision():
+    assert embedding_storage.sql_type() == "vector(1536)"
+    assert embedding_storage.request_dimensions() is None
+    assert embedding_storage.cosine_ops() == "vector_cosine_ops"
+
+
+def test_halfvec_keeps_dimensions(monkeypatch):
+    monkeypatch.setattr(embedding_storage.settings, "embedding_storage", "halfvec")
+    assert embedding_storage.sql_type() == "halfvec(1536)"
+    assert embedding_storage.cosine_ops() == "halfvec_cosine_ops"
+    assert embedding_storage.reduce_sql("embedding", "halfvec", 1536) == "embedding::halfvec(1536)"
+
+
+def test_shortened_vectors_are_renormalized_prefixes(monkeypatch):
+    monkeypatch.setattr(embedding_storage.settings, "embedding_dimensions", 512)
+    assert embedding_storage.request_dimensions() == 512
+    assert embedding_storage.reduce_sql("embedding", "vector", 512) == (
+        "l2_normalize(subvector(embedding, 1, 512))::vector(512)"
+    )
+
+
+def test_rejects_unknown_modes():
+    with pytest.raises(ValueError):
+        embedding_storage.sql_type("bit", 1536)
+    with pytest.raises(ValueError):
+        embedding_storage.sql_type("vector", 3072)
+
+
+class _FakeDB:
+    """Answers the catalog lookups and records every other statement."""
+
+    def __init__(self, types: dict, indexes=("ix_embeddings_cosine",)):
+        self.types = types
+        self.indexes = list(indexes)
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        sql = " ".join(str(statement).split())
+        if params is not None:
+            return _Result(self.types.get(f"{params['table']}.{params['column']}"))
+        if "pg_index" in sql:
+            return _Result(rows=self.indexes)
+        self.statements.append(sql)
+        return _Result()
+
+
+class _Result:
+    def __init__(self, value=None, rows=()):
+        self.value = value
+        self.rows = rows
+
+    def scalar(self):
+        return self.value
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return list(self.rows)
+
+
+_FULL = {"embeddings.embedding": "vector(1536)", "qa_history.question_embedding": "vector(1536)"}
+
+
+def test_startup_check_names_the_conversion_script(monkeypatch):
+    embedding_storage.check_storage(_FakeDB(_FULL))
+
+    monkeypatch.setattr(embedding_storage.settings, "embedding_storage", "halfvec")
+    with pytest.raises(RuntimeError, match="convert_embedding_storage.py") as exc:
+        embedding_storage.check_storage(_FakeDB(_FULL))
+    assert "embeddings.embedding is vector(1536)" in str(exc.value)
+    assert "halfvec(1536)" in str(exc.value)
+
+
+def test_conversion_rewrites_columns_and_leaves_indexes_to_the_manager():
+    db = _FakeDB({**_FULL, "qa_history.question_embedding": "halfvec(768)"})
+
+    changes = embedding_storage.convert_storage(db, "halfvec", 512)
+
+    assert changes == [
+        "embeddings.embedding: vector(1536) → halfvec(512)",
+        "qa_history.question_embedding: halfvec(768) → halfvec(512)",
+    ]
+    assert "DROP INDEX IF EXISTS ix_embeddings_cosine" in db.statements
+    assert (
+        "ALTER TABLE qa_history ALTER COLUMN question_embedding TYPE halfvec(512) "
+        "USING l2_normalize(subvector(question_embedding::vector, 1, 512))::halfvec(512)"
+    ) in db.statements
+    assert not any(sql.startswith("CREATE INDEX") for sql in db.statements)
+    assert "DELETE FROM embedding_indexes" in db.statements
+
+
+def test_conversion_never_lengthens_vectors():
+    db = _FakeDB({**_FULL, "embeddings.embedding": "vector(512)"})
+    with pytest.raises(RuntimeError, match="re-ingest"):
+        embedding_storage.convert_storage(db, "vector", 1536)
+    assert embedding_storage.convert_storage(_FakeDB(_FULL), "vector", 1536) == []
+
+
+def test_binary_column_needs_pgvector_0_7(monkeypatch):
+    db = _FakeDB(_FULL)
+    monkeypatch.setattr(embedding_storage, "has_binary_column", lambda db: False)
+    monkeypatch.setattr(db, "execute", lambda statement, params=None: _Result(
+        "0.6.2" if "extversion" in str(statement) else None
+    ))
+    with pytest.raises(RuntimeError, match="0.7"):
+        embedding_storage.add_binary_column(db)
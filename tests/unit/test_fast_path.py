@@ -0,0 +1,83 @@
+"""Fast path: 규칙·금지 질문의 즉시 답변과, 스레드에 교환을 기록하는 순서 검증.
+
+Postgres 대신 InMemorySaver를 사용한다 (LLM 호출 없음).
+"""
+
+import asyncio
+
+from langgraph.checkpoint.memory import InMemorySaver
+
+import src.services.ai as ai
+from src.services.ai import memory
+from src.services.ai.nodes import REFUSAL_ANSWER
+from src.utils.question_matcher import QuestionMatch
+
+
+def test_rule_match_is_answered_before_the_prohibited_check():
+    before = ai.get_fast_path_stats()
+
+    rule = ai._fast_path_answer(QuestionMatch(
+        rule_text="휴가는 팀장 승인", high_risk_keywords=["계약"], prohibited=["소송"],
+    ))
+    refused = ai._fast_path_answer(QuestionMatch(prohibited=["소송"], high_risk_keywords=["계약"]))
+
+    assert "휴가는 팀장 승인" in rule.answer and not rule.is_prohibited
+    assert not rule.is_high_risk  # prohibited questions are not flagged as risky
+    assert refused.answer == REFUSAL_ANSWER and refused.is_prohibited and not refused.is_high_risk
+    assert ai._fast_path_answer(QuestionMatch(high_risk_keywords=["계약"])) is None
+
+    after = ai.get_fast_path_stats()
+    assert after["rule_matched"] == before["rule_matched"] + 1
+    assert after["prohibited"] == before["prohibited"] + 1
+
+
+def test_exchange_waits_for_the_thread_turn_and_schedules_a_summary_fold(monkeypatch):
+    saver = InMemorySaver()
+    folds = []
+
+    async def fake_get_checkpointer():
+        return saver
+
+    registered = []
+
+    async def fake_register(thread_id, workspace_id, asker_id):
+        registered.append(thread_id)
+
+    monkeypatch.setattr(ai, "get_checkpointer", fake_get_checkpointer)
+    monkeypatch.setattr(ai, "register_thread_turn", fake_register)
+    monkeypatch.setattr(ai, "schedule_summary_update", lambda graph, config: folds.append(config))
+    config = {"configurable": {"thread_id": "w1:u1"}}
+
+    async def run():
+        lock = memory.thread_turn_lock("w1:u1")
+        async with lock:  # a graph run in flight on the same thread
+            task = asyncio.create_task(ai._append_exchange(config, "w1", "u1", "질문", "답변"))
+            await asyncio.sleep(0.05)
+            assert saver.get_tuple(config) is None
+        await task
+
+    asyncio.run(run())
+
+    values = saver.get_tuple(config).checkpoint["channel_values"]
+    assert [m.content for m in values["messages"]] == ["질문", "답변"]
+    assert values["last_turn_at"] > 0
+    assert folds == [config]
+    assert registered == ["w1:u1"]  # in the registry before its first checkpoint
+
+
+def test_exchange_is_not_recorded_for_a_thread_that_cannot_be_registered(monkeypatch):
+    saver = InMemorySaver()
+
+    async def fake_get_checkpointer():
+        return saver
+
+    async def failing_register(thread_id, workspace_id, asker_id):
+        raise ConnectionError("db down")
+
+    monkeypatch.setattr(ai, "get_checkpointer", fake_get_checkpointer)
+    monkeypatch.setattr(ai, "register_thread_turn", failing_register)
+    config = {"configurable": {"thread_id": "w1:u2"}}
+
+    asyncio.run(ai._append_exchange(config, "w1", "u2", "질문", "답변"))
+
+    assert saver.get_tuple(config) is None  # no checkpoint GC could not find
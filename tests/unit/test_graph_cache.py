@@ -0,0 +1,22 @@
+"""get_compiled_graph()가 체크포인터별로 한 번만 컴파일되는지 검증."""
+
+from langgraph.checkpoint.memory import InMemorySaver
+
+from src.services.ai.graph import clear_compiled_graphs, get_compiled_graph
+
+
+def test_compiled_graph_is_reused_per_checkpointer():
+    clear_compiled_graphs()
+    saver = InMemorySaver()
+
+    first = get_compiled_graph(checkpointer=saver)
+    assert get_compiled_graph(checkpointer=saver) is first
+
+
+def test_different_checkpointers_get_different_graphs():
+    clear_compiled_graphs()
+
+    a = get_compiled_graph(checkpointer=InMemorySaver())
+    b = get_compiled_graph(checkpointer=InMemorySaver())
+    assert a is not b
+    assert get_compiled_graph(checkpointer=None) is get_compiled_graph(checkpointer=None)
@@ -0,0 +1,149 @@
+"""설치 토큰 캐시의 무효화(로컬 핸들러 디스패치) 검증 — Redis 없이 실행."""
+
+import asyncio
+import time
+
+from src.services.slack import installations
+
+
+def test_invalidation_drops_token_and_bumps_generation():
+    installations._tokens["T1"] = (installations.Installation("w1", "xoxb-1"), time.monotonic() + 60)
+    installations._tokens["T2"] = (installations.Installation("w2", "xoxb-2"), time.monotonic() + 60)
+    generation = installations._generation
+
+    # Redis publish fails without a server, but local handlers still run
+    installations.invalidate_installation("T1")
+
+    assert "T1" not in installations._tokens
+    assert "T2" in installations._tokens
+    assert installations._generation == generation + 1
+
+
+def test_wildcard_invalidation_clears_everything():
+    installations._tokens["T3"] = (installations.Installation("w3", "xoxb-3"), time.monotonic() + 60)
+
+    installations._drop("*")
+
+    assert installations._tokens == {}
+
+
+def test_workspace_context_round_trips_and_invalidates():
+    from src.services import workspace_context as wc
+
+    ctx = wc.WorkspaceContext(
+        workspace_id="w1", team_id="T1", decision_maker_id="U1",
+        decision_maker_name="대표", persona="간결함",
+        rules=[{"id": 1, "rule_text": "휴가는 팀장 승인"}], bot_token="xoxb-secret",
+    )
+    stored = ctx._to_hash()
+    assert "bot_token" not in stored  # the token never goes to Redis
+    assert wc.WorkspaceContext._from_hash(stored) == wc.dataclasses.replace(ctx, bot_token="")
+
+    wc._contexts["w1"] = (ctx, time.monotonic() + 60)
+    wc.invalidate_workspace_context("w1")
+    assert "w1" not in wc._contexts
+
+
+class _FakeRedis:
+    """Shared store for the sync and async clients, with the store script run in Python."""
+
+    def __init__(self):
+        self.values: dict = {}
+        self.hashes: dict = {}
+
+    # async client
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def register_script(self, lua):
+        async def store(keys, args):
+            if self.values.get(keys[1], "") != args[0]:
+                return 0
+            fields = args[2:]
+            self.hashes[keys[0]] = dict(zip(fields[::2], fields[1::2]))
+            return 1
+        return store
+
+    # sync client
+    def pipeline(self, transaction=True):
+        return self
+
+    def incr(self, key):
+        self.values[key] = str(int(self.values.get(key, 0)) + 1)
+
+    def expire(self, key, seconds):
+        pass
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+            self.hashes.pop(key, None)
+
+    def execute(self):
+        pass
+
+    def publish(self, channel, message):
+        pass
+
+
+def test_workspace_context_invalidation_drops_cached_decision_maker_name(monkeypatch):
+    from src.services import workspace_context as wc
+
+    redis = _FakeRedis()
+    redis.values["dm_name:w2"] = "대표"
+    redis.hashes["ws_ctx:w2"] = {"workspace_id": "w2"}
+    monkeypatch.setattr(wc.RedisManager, "get_cache", staticmethod(lambda: redis))
+
+    wc.invalidate_workspace_context("w2")
+
+    assert redis.values == {"ws_ctx_ver:w2": "1"}
+    assert redis.hashes == {}
+
+
+def _snapshot_loader(monkeypatch, redis, during_load):
+    from src.services import workspace_context as wc
+
+    async def fake_load(workspace_id, bot_token):
+        during_load()  # e.g. /slough-rule adds a rule while the old rules are read
+        return wc.WorkspaceContext(
+            workspace_id=workspace_id, team_id="T1", decision_maker_id="U1",
+            decision_maker_name="대표", persona="", rules=[{"id": 1, "rule_text": "옛 규칙"}],
+        ), "xoxb-1"
+
+    monkeypatch.setattr(wc.RedisManager, "get_cache", staticmethod(lambda: redis))
+    monkeypatch.setattr(wc.RedisManager, "get_async_cache", staticmethod(lambda: redis))
+    monkeypatch.setattr(wc, "_load", fake_load)
+    monkeypatch.setattr(wc, "_scripts", {})
+    wc._contexts.pop("w3", None)
+    return wc
+
+
+def test_snapshot_loaded_before_an_invalidation_is_not_stored(monkeypatch):
+    redis = _FakeRedis()
+    wc = _snapshot_loader(
+        monkeypatch, redis, lambda: wc.invalidate_workspace_context("w3"),
+    )
+
+    ctx = asyncio.run(wc.get_workspace_context_by_id("w3"))
+
+    assert ctx.rules == [{"id": 1, "rule_text": "옛 규칙"}]  # served once, as read
+    assert "ws_ctx:w3" not in redis.hashes
+    assert "w3" not in wc._contexts
+
+
+def test_invalidation_in_another_process_also_blocks_the_store(monkeypatch):
+    redis = _FakeRedis()
+    # Only the version bump: this process gets no pub/sub message in time
+    wc = _snapshot_loader(monkeypatch, redis, lambda: redis.incr("ws_ctx_ver:w3"))
+
+    asyncio.run(wc.get_workspace_context_by_id("w3"))
+    assert "ws_ctx:w3" not in redis.hashes
+
+    # The next load, with nothing racing it, is stored
+    wc._contexts.pop("w3", None)
+    wc = _snapshot_loader(monkeypatch, redis, lambda: None)
+    asyncio.run(wc.get_workspace_context_by_id("w3"))
+    assert redis.hashes["ws_ctx:w3"]["rules"] == '[{"id": 1, "rule_text": "옛 규칙"}]'
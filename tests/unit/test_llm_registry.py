@@ -0,0 +1,31 @@
+"""모델별 동시 실행 제한(세마포어) 검증 — API 호출 없이 실행."""
+
+import asyncio
+
+from src.config import settings
+from src.services.ai import llm
+
+
+def test_async_slot_caps_concurrency_per_model(monkeypatch):
+    monkeypatch.setattr(settings, "llm_model_concurrency", {"test-model": 2})
+    llm._async_slots.pop("test-model", None)
+    active = peak = 0
+
+    async def call():
+        nonlocal active, peak
+        async with llm._async_slot("test-model"):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    async def main():
+        await asyncio.gather(*(call() for _ in range(6)))
+
+    asyncio.run(main())
+    llm._async_slots.pop("test-model", None)  # bound to the finished loop
+
+    stats = llm.get_llm_stats()["test-model"]
+    assert peak == 2
+    assert stats["limit"] == 2
+    assert stats["calls"] >= 6 and stats["in_flight"] == 0 and stats["waiting"] == 0
@@ -0,0 +1,38 @@
+"""Aho-Corasick 매처와 워크스페이스별 질문 스크리닝 검증."""
+
+from src.utils.matcher import AhoCorasick
+from src.utils.question_matcher import get_question_matcher, scan_question
+
+
+def test_finds_overlapping_and_nested_patterns():
+    automaton = AhoCorasick(["he", "she", "his", "hers", ""])
+    assert automaton.find("ushers") == [0, 1, 3]
+    assert automaton.find("nothing") == []
+
+
+def test_matches_naive_substring_search():
+    patterns = ["계약", "계약 해지", "해지", "약 해", "ab", "bab", "abab"]
+    automaton = AhoCorasick(patterns)
+    for text in ["계약 해지 절차는?", "ababab", "계약서", "", "해"]:
+        expected = [i for i, p in enumerate(patterns) if p in text]
+        assert automaton.find(text) == expected
+
+
+def test_scan_returns_first_rule_and_safety_flags():
+    rules = [{"id": 1, "rule_text": "VPN"}, {"id": 2, "rule_text": "재택"}]
+    match = scan_question("ws-1", rules, "재택 중 vpn 연봉 협상 관련")
+
+    assert match.rule_text == "VPN"
+    assert match.high_risk_keywords == ["연봉"]
+    assert match.prohibited == ["연봉 협상"]
+    assert match.as_state()["is_high_risk"] is False  # prohibited wins
+
+
+def test_matcher_is_cached_until_rules_change():
+    rules = [{"id": 1, "rule_text": "휴가"}]
+    first = get_question_matcher("ws-2", rules)
+    assert get_question_matcher("ws-2", list(rules)) is first
+
+    changed = get_question_matcher("ws-2", rules + [{"id": 2, "rule_text": "출장"}])
+    assert changed is not first
+    assert changed.scan("출장 규정").rule_text == "출장"
@@ -0,0 +1,77 @@
+"""Memo: 정규화 키, LRU 한도, 동시 요청 병합(coalescing) 검증."""
+
+import asyncio
+
+from src.services.ai.memo import Memo
+
+
+class _DictMemo(Memo):
+    """Memo whose Redis tier is a plain dict (no Redis server needed)."""
+
+    def __init__(self, **kwargs):
+        super().__init__("test", encode=str, decode=str, **kwargs)
+        self.remote: dict[str, str] = {}
+
+    def _redis_get_many(self, keys):
+        return [self.remote.get(k) for k in keys]
+
+    def _redis_put_many(self, items):
+        self.remote.update(items)
+
+    async def _aredis_get_many(self, keys):
+        return self._redis_get_many(keys)
+
+    async def _aredis_put_many(self, items):
+        self._redis_put_many(items)
+
+
+def test_normalized_text_shares_one_entry():
+    memo = _DictMemo(maxsize=8, ttl_seconds=60)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return "v"
+
+    memo.get_or_compute("m", "휴가  정책은?", compute)
+    memo.get_or_compute("m", " 휴가 정책은? ", compute)
+    memo.get_or_compute("other-model", "휴가 정책은?", compute)
+
+    assert len(calls) == 2
+    assert memo.stats()["local_hits"] == 1
+
+
+def test_lru_is_bounded_and_falls_back_to_redis():
+    memo = _DictMemo(maxsize=2, ttl_seconds=60)
+    for text in ("a", "b", "c"):
+        memo.get_or_compute("m", text, lambda: "v")
+
+    assert memo.stats()["size"] == 2
+    memo.get_or_compute("m", "a", lambda: "recomputed")
+    assert memo.stats()["redis_hits"] == 1
+
+
+def test_concurrent_identical_misses_make_one_call():
+    memo = _DictMemo(maxsize=8, ttl_seconds=60)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "v"
+
+    async def run():
+        return await asyncio.gather(
+            *(memo.aget_or_compute("m", "q", compute) for _ in range(5)),
+            memo.aget_or_compute_many("m", ["q", "q2"], lambda texts: _batch(texts)),
+        )
+
+    async def _batch(texts):
+        calls.append(len(texts))
+        return [t.upper() for t in texts]
+
+    results = asyncio.run(run())
+
+    assert results[:5] == ["v"] * 5
+    assert results[5] == ["v", "Q2"]
+    assert calls == [1, 1]  # one single-key call, one batch call for "q2" only
@@ -0,0 +1,60 @@
+"""롤링 요약: 창 밖으로 밀려난 Q&A 쌍만 요약에 합쳐지는지 검증 (LLM 호출 없음)."""
+
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.services.ai import memory
+
+
+def _turns(n):
+    msgs = []
+    for i in range(n):
+        msgs += [HumanMessage(content=f"q{i}", id=f"h{i}"), AIMessage(content=f"a{i}", id=f"a{i}")]
+    return msgs
+
+
+def test_only_the_pair_leaving_the_window_is_summarized(monkeypatch):
+    calls = []
+
+    async def fake_summarize(messages, previous_summary=""):
+        calls.append(([m.content for m in messages], previous_summary))
+        return f"{previous_summary}+{len(messages)}"
+
+    monkeypatch.setattr(memory, "_summarize_messages", fake_summarize)
+
+    # Window not full yet — no summarization at all
+    summary, window, folded = asyncio.run(
+        memory.roll_summary(_turns(1) + [HumanMessage(content="q1", id="h1")], "")
+    )
+    assert (summary, folded, calls) == ("", [], [])
+    assert len(window) == 3
+
+    # Third question: only the first pair is folded into the existing summary
+    history = _turns(2) + [HumanMessage(content="q2", id="h2")]
+    summary, window, folded = asyncio.run(memory.roll_summary(history, "S"))
+    assert calls == [(["q0", "a0"], "S")]
+    assert summary == "S+2"
+    assert [m.id for m in folded] == ["h0", "a0"]
+    assert [m.content for m in window] == ["q1", "a1", "q2"]
+
+
+def test_failed_summary_keeps_messages(monkeypatch):
+    async def failing(messages, previous_summary=""):
+        return ""
+
+    monkeypatch.setattr(memory, "_summarize_messages", failing)
+    history = _turns(2) + [HumanMessage(content="q2")]
+    summary, window, folded = asyncio.run(memory.roll_summary(history, "S"))
+    assert (summary, folded) == ("S", [])
+    assert len(window) == len(history)
+
+
+def test_pending_fold_falls_back_to_a_longer_verbatim_window():
+    # Background fold has not run: three pairs + question are still in state
+    history = _turns(3) + [HumanMessage(content="q3")]
+    window = memory.recent_window(history)
+    assert [m.content for m in window] == ["q0", "a0", "q1", "a1", "q2", "a2", "q3"]
+
+    window = memory.recent_window(_turns(6) + [HumanMessage(content="q6")])
+    assert window[0].content == "q3"  # capped at the fallback size
@@ -0,0 +1,36 @@
+"""병렬 검색 브랜치 결과를 합치는 ``retrieved`` 리듀서 검증."""
+
+from src.services.ai.state import merge_hits
+
+
+def test_merge_keeps_best_score_per_document():
+    original = [("A", 0.6, "2026-01-01"), ("B", 0.4, "2026-01-01")]
+    rewrites = [("B", 0.55, "2026-01-02"), ("C", 0.32, "2026-01-03")]
+
+    merged = merge_hits(merge_hits([], original), rewrites)
+
+    assert merged == [
+        ("A", 0.6, "2026-01-01"),
+        ("B", 0.55, "2026-01-02"),
+        ("C", 0.32, "2026-01-03"),
+    ]
+    # 브랜치 완료 순서와 무관
+    assert merge_hits(merge_hits([], rewrites), original) == merged
+
+
+def test_none_resets_previous_turn():
+    assert merge_hits([("A", 0.6, "2026-01-01")], None) == []
+
+
+def test_adaptive_rewrite_thresholds():
+    """원 질문 검색이 충분히 강하면 재작성을 건너뛴다."""
+    from src.services.ai import nodes
+
+    strong = [("A", 0.6, "d"), ("B", 0.55, "d"), ("C", 0.52, "d")]
+    assert nodes._is_confident(strong)
+    assert not nodes._is_confident(strong[:2])  # hit count below rewrite_min_hits
+    assert not nodes._is_confident([("A", 0.45, "d")] * 3)  # top score too low
+    assert not nodes._is_confident([])
+
+    # 재작성으로만 찾은 top-k 문서 수 = recall 기여
+    assert nodes._added_hits(strong, [("B", 0.7, "d"), ("D", 0.4, "d")]) == 1
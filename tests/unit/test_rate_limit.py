@@ -0,0 +1,30 @@
+"""분산 RPM/TPM 리미터 — 우선순위 컨텍스트, 토큰 추정, Redis 장애 시 fail-open 검증."""
+
+import asyncio
+
+from src.services.ai import rate_limit
+
+
+def test_priority_context_restores_interactive_default():
+    assert rate_limit._priority.get() == rate_limit.INTERACTIVE
+    with rate_limit.llm_priority(rate_limit.BULK):
+        assert rate_limit._priority.get() == rate_limit.BULK
+    assert rate_limit._priority.get() == rate_limit.INTERACTIVE
+
+
+def test_estimate_errs_high_for_korean():
+    assert rate_limit.estimate_tokens(["hello world"]) == 3
+    assert rate_limit.estimate_tokens(["휴가 규정 알려줘"]) >= 6
+
+
+def test_fails_open_without_redis(monkeypatch):
+    # 테스트 환경에는 Redis 서버가 없다 — 호출은 지연 없이 통과해야 한다
+    monkeypatch.setattr(rate_limit.settings, "redis_port", 1)
+    monkeypatch.setattr(rate_limit.RedisManager, "_async_cache_client", None)
+
+    waited = asyncio.run(rate_limit.aacquire("gpt-4o-mini", 100))
+
+    stats = rate_limit.get_rate_limit_stats()["gpt-4o-mini"]["interactive"]
+    assert waited < 1.0
+    assert stats["failed_open"] >= 1
+    monkeypatch.setattr(rate_limit.RedisManager, "_async_cache_client", None)
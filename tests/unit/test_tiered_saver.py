@@ -0,0 +1,316 @@
+"""Redis 핫 티어 체크포인터: 핫 읽기, write-behind 병합, 미스 시 Postgres 폴백 검증.
+
+Redis 대신 dict, Postgres 대신 InMemorySaver를 사용한다.
+"""
+
+import asyncio
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+from src.config import settings
+from src.services.ai import tiered_saver
+from src.services.ai.graph import create_graph
+from src.services.ai.tiered_saver import TieredCheckpointSaver
+
+
+class _DictTier(TieredCheckpointSaver):
+    """Hot tier backed by a dict of the raw checkpoint tuples."""
+
+    def __init__(self, cold):
+        super().__init__(cold)
+        self.hot: dict = {}
+        self.deleted: dict = {}  # thread_id -> tombstone time
+
+    async def _read_hot(self, thread_id, ns):
+        return self.hot.get((thread_id, ns))
+
+    async def _write_hot(self, thread_id, ns, checkpoint, metadata, parent_id, writes, *, dirty):
+        from langgraph.checkpoint.base import CheckpointTuple
+
+        base = {"thread_id": thread_id, "checkpoint_ns": ns}
+        self.hot[(thread_id, ns)] = CheckpointTuple(
+            config={"configurable": {**base, "checkpoint_id": checkpoint["id"]}},
+            checkpoint=checkpoint,
+            metadata=metadata,
+            parent_config={"configurable": {**base, "checkpoint_id": parent_id}} if parent_id else None,
+            pending_writes=list(writes),
+        )
+        return True
+
+    async def _mark_clean(self, key):
+        pass
+
+    async def _mark_deleted(self, thread_id):
+        self.deleted[thread_id] = time.time()
+        self.hot.pop((thread_id, ""), None)
+
+    async def _deleted_since(self, thread_id, written_at):
+        return self.deleted.get(thread_id, 0.0) >= written_at
+
+
+def test_writes_are_coalesced_and_flushed_behind(monkeypatch):
+    monkeypatch.setattr(settings, "checkpoint_flush_delay_seconds", 0.05)
+    cold = InMemorySaver()
+    saver = _DictTier(cold)
+    graph = create_graph().compile(checkpointer=saver)
+    config = {"configurable": {"thread_id": "w:u"}}
+
+    async def run():
+        for i in range(3):
+            await graph.aupdate_state(
+                config,
+                {"messages": [HumanMessage(f"q{i}"), AIMessage(f"a{i}")], "context": ["doc"]},
+                as_node="generate",
+            )
+        # Not in Postgres yet, but readable from the hot tier
+        assert cold.get_tuple(config) is None
+        state = await graph.aget_state(config)
+        assert len(state.values["messages"]) == 6
+        assert "context" not in state.values  # transient fields are not kept
+
+        await asyncio.sleep(0.2)
+        assert saver.get_stats()["flushes"] == 1  # three writes, one flush
+        assert len(cold.get_tuple(config).checkpoint["channel_values"]["messages"]) == 6
+
+        # Hot copy evicted: read falls back to Postgres and re-warms Redis
+        saver.hot.clear()
+        state = await graph.aget_state(config)
+        assert len(state.values["messages"]) == 6
+        assert saver.hot
+
+    asyncio.run(run())
+
+
+def test_flush_writes_only_the_channels_changed_since_the_last_flush(monkeypatch):
+    monkeypatch.setattr(settings, "checkpoint_flush_delay_seconds", 0.01)
+    cold = InMemorySaver()
+    saver = _DictTier(cold)
+    graph = create_graph().compile(checkpointer=saver)
+    config = {"configurable": {"thread_id": "w:u"}}
+    flushed_versions = []
+    cold_aput = cold.aput
+
+    async def recording_aput(config, checkpoint, metadata, new_versions):
+        flushed_versions.append(set(new_versions))
+        return await cold_aput(config, checkpoint, metadata, new_versions)
+
+    monkeypatch.setattr(cold, "aput", recording_aput)
+
+    async def run():
+        await graph.aupdate_state(
+            config, {"messages": [HumanMessage("q0"), AIMessage("a0")]}, as_node="generate",
+        )
+        await asyncio.sleep(0.1)
+        await graph.aupdate_state(config, {"summary": "요약"}, as_node="generate")
+        await asyncio.sleep(0.1)
+
+    asyncio.run(run())
+    assert "messages" in flushed_versions[0]
+    assert "summary" in flushed_versions[1] and "messages" not in flushed_versions[1]
+    state = cold.get_tuple(config).checkpoint["channel_values"]
+    assert state["summary"] == "요약" and len(state["messages"]) == 2
+
+
+def test_deleting_a_thread_cancels_its_flush_in_flight(monkeypatch):
+    monkeypatch.setattr(settings, "checkpoint_flush_delay_seconds", 0.01)
+    cold = InMemorySaver()
+    saver = _DictTier(cold)
+    graph = create_graph().compile(checkpointer=saver)
+    config = {"configurable": {"thread_id": "w:u"}}
+    cold_aput = cold.aput
+
+    async def run():
+        started = asyncio.Event()
+
+        async def slow_aput(*args):
+            started.set()
+            await asyncio.sleep(0.2)
+            return await cold_aput(*args)
+
+        monkeypatch.setattr(cold, "aput", slow_aput)
+        await graph.aupdate_state(config, {"messages": [HumanMessage("q")]}, as_node="generate")
+        await started.wait()
+        await saver.adelete_thread("w:u")
+        await asyncio.sleep(0.3)
+
+    asyncio.run(run())
+    assert cold.get_tuple(config) is None
+    assert not saver._pending and not saver._flush_tasks
+
+
+def test_write_behind_is_dropped_for_a_thread_deleted_elsewhere(monkeypatch):
+    monkeypatch.setattr(settings, "checkpoint_flush_delay_seconds", 0.05)
+    cold = InMemorySaver()
+    saver = _DictTier(cold)
+    graph = create_graph().compile(checkpointer=saver)
+    config = {"configurable": {"thread_id": "w:u"}}
+
+    async def run():
+        await graph.aupdate_state(config, {"messages": [HumanMessage("q")]}, as_node="generate")
+        # e.g. clear_checkpoints in the worker: tombstone + Postgres delete
+        saver.deleted["w:u"] = time.time()
+        await asyncio.sleep(0.2)
+
+    asyncio.run(run())
+    assert cold.get_tuple(config) is None
+
+
+class _FakeRedis:
+    """Records the commands of transactional pipelines."""
+
+    def __init__(self):
+        self.commands = []
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def __getattr__(self, name):
+        def command(*args, **kwargs):
+            self.commands.append((name, args))
+        return command
+
+    async def execute(self):
+        pass
+
+
+def test_unflushed_hot_copy_has_no_ttl_until_flushed(monkeypatch):
+    redis = _FakeRedis()
+    monkeypatch.setattr(tiered_saver.RedisManager, "get_async_binary_cache", lambda: redis)
+    saver = TieredCheckpointSaver(InMemorySaver())
+    checkpoint = {"id": "c1", "channel_values": {}, "channel_versions": {}}
+
+    async def run():
+        await saver._write_hot("w:u", "", checkpoint, {}, None, [], dirty=True)
+        dirty = [name for name, _ in redis.commands]
+        redis.commands.clear()
+        await saver._mark_clean(("w:u", ""))
+        return dirty
+
+    dirty = asyncio.run(run())
+    assert "expire" not in dirty and "sadd" in dirty
+    assert ("expire", (tiered_saver.hot_key("w:u"), settings.checkpoint_hot_ttl_seconds)) in redis.commands
+    assert "srem" in [name for name, _ in redis.commands]
+
+
+class _SharedRedis:
+    """One binary Redis shared by several savers; ``down`` makes every command fail."""
+
+    def __init__(self):
+        self.hashes: dict = {}
+        self.values: dict = {}
+        self.sets: dict = {}
+        self.down = False
+
+    def check(self):
+        if self.down:
+            raise ConnectionError("Redis is down")
+
+    def pipeline(self, transaction=True):
+        return _SharedPipeline(self)
+
+    async def hgetall(self, key):
+        self.check()
+        return dict(self.hashes.get(key, {}))
+
+    async def get(self, key):
+        self.check()
+        return self.values.get(key)
+
+    def register_script(self, lua):
+        async def drop_stale(keys, args):
+            self.check()
+            checkpoint_id = self.hashes.get(keys[0], {}).get(b"checkpoint_id")
+            if checkpoint_id is not None and checkpoint_id.decode() > args[0]:
+                return 0
+            self.hashes.pop(keys[0], None)
+            self.sets.get(keys[1], set()).discard(args[1])
+            return 1
+        return drop_stale
+
+
+class _SharedPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.ops = []
+
+    def delete(self, key):
+        self.ops.append(lambda r: r.hashes.pop(key, None))
+
+    def hset(self, key, mapping):
+        encoded = {k.encode(): v.encode() if isinstance(v, str) else v for k, v in mapping.items()}
+        self.ops.append(lambda r: r.hashes.setdefault(key, {}).update(encoded))
+
+    def sadd(self, key, member):
+        self.ops.append(lambda r: r.sets.setdefault(key, set()).add(member))
+
+    def srem(self, key, member):
+        self.ops.append(lambda r: r.sets.get(key, set()).discard(member))
+
+    def set(self, key, value, ex=None):
+        self.ops.append(lambda r: r.values.__setitem__(key, value))
+
+    def expire(self, key, seconds):
+        pass
+
+    async def execute(self):
+        self.redis.check()
+        for op in self.ops:
+            op(self.redis)
+
+
+def test_write_through_drops_the_stale_hot_copy_for_other_processes(monkeypatch):
+    monkeypatch.setattr(settings, "checkpoint_flush_delay_seconds", 0.01)
+    redis = _SharedRedis()
+    monkeypatch.setattr(tiered_saver.RedisManager, "get_async_binary_cache", lambda: redis)
+    monkeypatch.setattr(tiered_saver, "_scripts", {})
+    cold = InMemorySaver()  # the Postgres both processes share
+    web, worker = TieredCheckpointSaver(cold), TieredCheckpointSaver(cold)
+    config = {"configurable": {"thread_id": "w:u"}}
+
+    async def run():
+        web_graph = create_graph().compile(checkpointer=web)
+        worker_graph = create_graph().compile(checkpointer=worker)
+        await web_graph.aupdate_state(
+            config, {"messages": [HumanMessage("q0"), AIMessage("a0")]}, as_node="generate",
+        )
+        await asyncio.sleep(0.05)  # flushed; the hot copy stays for later turns
+
+        redis.down = True
+        await web_graph.aupdate_state(
+            config, {"messages": [HumanMessage("q1"), AIMessage("a1")]}, as_node="generate",
+        )
+        assert web.get_stats()["write_through"] == 1
+        await asyncio.sleep(0.05)
+        # The delete keeps failing; meanwhile this process reads Postgres
+        assert ("w:u", "") in web._cold_only
+        assert len((await web_graph.aget_state(config)).values["messages"]) == 4
+
+        redis.down = False
+        await asyncio.sleep(0.3)  # next retry of the delete
+        assert not web._cold_only and not web._stale_tasks
+        assert tiered_saver.hot_key("w:u") not in redis.hashes
+        return (await worker_graph.aget_state(config)).values
+
+    values = asyncio.run(run())
+    # The worker missed the stale hot copy and read the write-through turn from Postgres
+    assert [m.content for m in values["messages"]] == ["q0", "a0", "q1", "a1"]
+
+
+def test_stale_drop_keeps_a_newer_hot_copy(monkeypatch):
+    redis = _SharedRedis()
+    monkeypatch.setattr(tiered_saver.RedisManager, "get_async_binary_cache", lambda: redis)
+    monkeypatch.setattr(tiered_saver, "_scripts", {})
+    saver = TieredCheckpointSaver(InMemorySaver())
+    key = tiered_saver.hot_key("w:u")
+
+    async def run():
+        redis.hashes[key] = {b"checkpoint_id": b"c2"}  # written after the write-through
+        assert await saver._drop_stale(("w:u", ""), "c1")
+        newer_kept = key in redis.hashes
+        redis.hashes[key] = {b"checkpoint_id": b"c1"}  # same checkpoint, missing the writes
+        await saver._drop_stale(("w:u", ""), "c1")
+        return newer_kept, key in redis.hashes
+
+    assert asyncio.run(run()) == (True, False)